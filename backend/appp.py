@@ -1,273 +1,245 @@
-from flask import Flask, request, jsonify
-from flask_sqlalchemy import SQLAlchemy
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, stream_with_context
 from flask_cors import CORS
-from config.config import SQLALCHEMY_DATABASE_URI, SQLALCHEMY_TRACK_MODIFICATIONS
 from datetime import datetime, timedelta
-from utils.session_manager import get_session
+from utils.session_manager import get_session, get_pool_stats, replica_engines
+from utils.request_session import db_session, read_only, init_request_session
 from utils.helpers import safe_close  # <-- import safe_close from helpers.py
-from models.employee import Employee
+from models.employee import Employee, normalize_email
 from models.department import Department
 from models.designation import Designation
 from models.timesheet import Timesheet
 from models.dailylogs import DailyLog
 from models.dailylogchanges import DailyLogChange
 from models.project import Project
+from services.daily_log_batch import save_daily_log_batch, DailyLogBatchError
+from services.departments import cascade_delete_department
+from services.org_cache import ORG_VERSION_KEY, get_org_graph, get_org_version
+from services.export import iter_export_rows, iter_ndjson, iter_csv
+from services.weekly_hours import weekly_hours_report
+from services.team_dashboard import team_dashboard
+from services.analytics import (
+    report_range, report_scope, utilization_report, project_distribution_report, weekday_heatmap_report
+)
+from services.hierarchy import MAX_CHAIN_DEPTH, load_subtree, nest_subtree
+from services.reassignment import reassign_managers, ReassignmentError
+import services.employee_closure  # keeps employee_closure in step with employee writes
+from utils.loader_profiles import with_profile
+from utils.query_budget import query_budget
+from utils.conditional import conditional_get
+from services.table_versions import timesheet_version_key
+from utils.cache import cached, invalidate_on_commit
+from utils.json_provider import init_json_provider
+from utils.sql_timing import init_sql_timing
+from utils.metrics import init_metrics, SAVE_BATCH_SIZE
+from utils.readiness import check_ready
+from utils.serialization import PROJECT, DEPARTMENT, DESIGNATION, DAILY_LOG, DAILY_LOG_CHANGE_HISTORY
+from utils.pagination import (
+    PaginationError, int_args, page_request_from_args, paginate_query, paginate_ids, page_response
+)
 from sqlalchemy.exc import IntegrityError
 import re
 
-app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
-
-app.config['SQLALCHEMY_DATABASE_URI'] = SQLALCHEMY_DATABASE_URI
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = SQLALCHEMY_TRACK_MODIFICATIONS
-db = SQLAlchemy(app)
+api = Blueprint("api", __name__)
 
 # ---------------- Employee Profile with Department & Designation ----------------
-@app.route("/api/employees/profile-with-hierarchy", methods=["GET"])
+@api.route("/api/employees/profile-with-hierarchy", methods=["GET"])
+@query_budget(5)
+@conditional_get(ORG_VERSION_KEY)
+@cached(["employees", "departments", "designations"])
 def get_employee_profile_with_hierarchy():
     email = request.args.get('email')
-    session = get_session()
-    try:
-        emp = session.query(Employee).filter(Employee.email.ilike(email)).first()
-        if not emp:
-            return jsonify({'error': 'Employee not found.'}), 404
-
-        # Manager hierarchy
-        hierarchy = []
-        current = emp
-        while current.manager:
-            manager = current.manager
-            hierarchy.append({
-                'id': manager.id,
-                'employee_name': manager.employee_name,
-                'email': manager.email,
-                'reports_to': manager.reports_to_id,
-                'designation': manager.designation.as_dict() if manager.designation else None
-            })
-            current = manager
-
-        # Department info
-        department = emp.department.as_dict() if emp.department else None
-        designation = emp.designation.as_dict() if emp.designation else None
-
-        return jsonify({
-            'employee': emp.as_dict(),
-            'manager_hierarchy': hierarchy,
-            'department': department,
-            'designation': designation
-        }), 200
-    finally:
-        safe_close(session)
+    graph = get_org_graph()
+    emp = graph.find_by_email(email)
+    if not emp:
+        return jsonify({'error': 'Employee not found.'}), 404
+
+    # Manager hierarchy
+    hierarchy = []
+    for manager_id in graph.manager_chain(emp['id']):
+        manager = graph.employees[manager_id]
+        hierarchy.append({
+            'id': manager['id'],
+            'employee_name': manager['employee_name'],
+            'email': manager['email'],
+            'reports_to': manager['reports_to_id'],
+            'designation': graph.designation_dict(manager['designation_id'])
+        })
+
+    response = jsonify({
+        'employee': graph.employee_dict(emp['id']),
+        'manager_hierarchy': hierarchy,
+        'department': graph.department_dict(emp['department_id']),
+        'designation': graph.designation_dict(emp['designation_id'])
+    })
+    response.headers['X-Org-Version'] = str(graph.version)
+    return response, 200
+
+@api.route("/api/org/version", methods=["GET"])
+@query_budget(1)
+def get_org_graph_version():
+    return jsonify({'version': get_org_version()}), 200
 
 # ---------------- Project List ----------------
-@app.route("/api/projects", methods=["GET"])
+@api.route("/api/projects", methods=["GET"])
+@query_budget(3)
+@read_only
+@conditional_get("projects")
+@cached(["projects"])
 def list_projects():
-    session = get_session()
+    session = db_session()
     try:
-        projects = session.query(Project).all()
-        return jsonify([p.as_dict() for p in projects]), 200
-    finally:
-        safe_close(session)
+        page = page_request_from_args(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    query = PROJECT.query(session)
+    name = request.args.get("name")
+    if name:
+        query = query.filter(Project.name.ilike(f"%{name}%"))
+    if page is None:
+        return jsonify(PROJECT.all(query)), 200
+    try:
+        projects, next_cursor, total = paginate_query(query, [Project.id], page)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page_response(PROJECT.all(projects), next_cursor, total)), 200
 
 # ---------------- Timesheet CRUD ----------------
-@app.route("/api/timesheets", methods=["POST"])
+@api.route("/api/timesheets", methods=["POST"])
+@query_budget(3)
 def add_timesheet():
-    session = get_session()
+    session = db_session()
+    data = request.get_json()
+    employee_id = data.get("employee_id")
+    start_date = data.get("start_date")
+    end_date = data.get("end_date")
+    if not employee_id or not start_date or not end_date:
+        return jsonify({"error": "employee_id, start_date, end_date required"}), 400
     try:
-        data = request.get_json()
-        employee_id = data.get("employee_id")
-        start_date = data.get("start_date")
-        end_date = data.get("end_date")
-        if not employee_id or not start_date or not end_date:
-            return jsonify({"error": "employee_id, start_date, end_date required"}), 400
-        # Only one timesheet per employee per week (start_date)
-        existing = session.query(Timesheet).filter_by(
-            employee_id=employee_id, start_date=start_date
-        ).first()
-        if existing:
-            return jsonify(existing.as_dict()), 200
-        ts = Timesheet(employee_id=employee_id, start_date=start_date, end_date=end_date)
-        session.add(ts)
-        session.commit()
-        return jsonify(ts.as_dict()), 201
-    except Exception as e:
-        session.rollback()
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
-
-@app.route("/api/timesheets/by-employee-week", methods=["GET"])
+        start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    # Only one timesheet per employee per week (start_date)
+    existing = with_profile(session.query(Timesheet), 'timesheet').filter_by(
+        employee_id=employee_id, start_date=start_date
+    ).first()
+    if existing:
+        return jsonify(existing.as_dict()), 200
+    # A new timesheet has no logs; initialising the collection avoids a lazy load.
+    ts = Timesheet(employee_id=employee_id, start_date=start_date, end_date=end_date, daily_logs=[])
+    session.add(ts)
+    session.flush()
+    invalidate_on_commit(session, "timesheets")
+    return jsonify(ts.as_dict()), 201
+
+@api.route("/api/timesheets/by-employee-week", methods=["GET"])
+@query_budget(2)
+@read_only
 def get_timesheet_by_week():
-    session = get_session()
-    try:
-        employee_id = request.args.get("employee_id")
-        start_date = request.args.get("start_date")
-        end_date = request.args.get("end_date")
-        ts = session.query(Timesheet).filter_by(
-            employee_id=employee_id, start_date=start_date, end_date=end_date
-        ).first()
-        if not ts:
-            return jsonify({"error": "Timesheet not found"}), 404
-        return jsonify(ts.as_dict()), 200
-    finally:
-        safe_close(session)
-
-@app.route("/api/timesheets/<int:timesheet_id>/daily-logs", methods=["GET"])
+    session = db_session()
+    employee_id = request.args.get("employee_id")
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    ts = with_profile(session.query(Timesheet), 'timesheet').filter_by(
+        employee_id=employee_id, start_date=start_date, end_date=end_date
+    ).first()
+    if not ts:
+        return jsonify({"error": "Timesheet not found"}), 404
+    return jsonify(ts.as_dict()), 200
+
+@api.route("/api/timesheets/<int:timesheet_id>/daily-logs", methods=["GET"])
+@query_budget(2)
+@read_only
+@conditional_get(lambda timesheet_id: [timesheet_version_key(timesheet_id)])
+@cached(lambda timesheet_id: [f"timesheet:{timesheet_id}", "daily_logs"])
 def logs_by_timesheet(timesheet_id):
-    session = get_session()
-    try:
-        logs = session.query(DailyLog).filter_by(timesheet_id=timesheet_id).all()
-        return jsonify([log.as_dict() for log in logs]), 200
-    finally:
-        safe_close(session)
+    logs = DAILY_LOG.query(db_session()).filter(DailyLog.timesheet_id == timesheet_id)
+    return jsonify(DAILY_LOG.all(logs)), 200
 
 # ---------------- Daily Logs: Save Multiple ----------------
 from datetime import datetime, time
 
-@app.route("/api/daily-logs/save", methods=["POST"])
+@api.route("/api/daily-logs/save", methods=["POST"])
+@query_budget(9)
 def save_daily_logs():
-    session = get_session()
+    logs = request.get_json()
+    if not logs or not isinstance(logs, list):
+        return jsonify({'error': 'Invalid or no logs provided. Expected a list.'}), 400
+    session = db_session()
     try:
-        logs = request.get_json()
-        if not logs or not isinstance(logs, list):
-            return jsonify({'error': 'Invalid or no logs provided. Expected a list.'}), 400
-        
-        saved_logs = []
-        for log_data in logs:
-            log_id = log_data.get('id')
-            timesheet_id = log_data.get('timesheet_id')
-            log_date = log_data.get('log_date')
-            project_id = log_data.get('project_id')
-            start_time_str = log_data.get('start_time')
-            end_time_str = log_data.get('end_time')
-            total_hours = log_data.get('total_hours')
-            task_description = log_data.get('task_description', '')
-
-            # Validate required fields
-            if not all([timesheet_id, log_date, project_id, start_time_str, end_time_str, total_hours]):
-                return jsonify({'error': 'Missing required fields in log data.'}), 400
-
-            # Parse date and time
-            try:
-                log_date_obj = datetime.strptime(log_date, '%Y-%m-%d').date()
-                start_time_obj = datetime.strptime(start_time_str, '%H:%M').time()
-                end_time_obj = datetime.strptime(end_time_str, '%H:%M').time()
-            except ValueError:
-                return jsonify({'error': 'Invalid date or time format. Expected YYYY-MM-DD and HH:MM.'}), 400
-
-            # Validate timesheet and project existence
-            timesheet = session.query(Timesheet).get(timesheet_id)
-            if not timesheet:
-                return jsonify({'error': f'Timesheet with id {timesheet_id} not found.'}), 404
-
-            project = session.query(Project).get(project_id)
-            if not project:
-                return jsonify({'error': f'Project with id {project_id} not found.'}), 404
-
-            if log_id:
-                # Update existing log
-                log = session.query(DailyLog).get(log_id)
-                if not log:
-                    return jsonify({'error': f'Daily log with id {log_id} not found.'}), 404
-
-                # Log change history if description or project_id changed
-                if log.task_description != task_description or log.project_id != project_id:
-                    change = DailyLogChange(
-                        daily_log_id=log.id,
-                        project_id=project_id,
-                        new_description=task_description,
-                        changed_at=datetime.utcnow()
-                    )
-                    session.add(change)
-
-                log.project_id = project_id
-                log.start_time = start_time_obj
-                log.end_time = end_time_obj
-                log.total_hours = total_hours
-                log.task_description = task_description
-                log.log_date = log_date_obj
-            else:
-                # Create new log
-                log = DailyLog(
-                    timesheet_id=timesheet_id,
-                    log_date=log_date_obj,
-                    project_id=project_id,
-                    start_time=start_time_obj,
-                    end_time=end_time_obj,
-                    total_hours=total_hours,
-                    task_description=task_description
-                )
-                session.add(log)
-
-            saved_logs.append({
-                'id': log.id,
-                'timesheet_id': log.timesheet_id,
-                'log_date': log.log_date.strftime('%Y-%m-%d'),
-                'project_id': log.project_id,
-                'start_time': log.start_time.strftime('%H:%M'),
-                'end_time': log.end_time.strftime('%H:%M'),
-                'total_hours': log.total_hours,
-                'task_description': log.task_description
-            })
-
-        session.commit()
-        return jsonify(saved_logs), 200
+        saved_logs = save_daily_log_batch(session, logs)
+    except DailyLogBatchError as e:
+        if e.conflicts:
+            return jsonify({'error': e.message, 'conflicts': e.conflicts}), e.status_code
+        return jsonify({'error': e.message}), e.status_code
     except IntegrityError as e:
-        session.rollback()
         return jsonify({'error': 'Database integrity error: ' + str(e)}), 400
-    except Exception as e:
-        session.rollback()
-        return jsonify({'error': str(e)}), 500
-    finally:
-        session.close()
+    timesheet_tags = {f"timesheet:{log['timesheet_id']}" for log in saved_logs}
+    invalidate_on_commit(session, "hours", *timesheet_tags)
+    SAVE_BATCH_SIZE.observe(len(logs))
+    return jsonify(saved_logs), 200
 
 
 # admin eendpoints 
 # 1. List all employees with department, designation, and manager hierarchy
-@app.route("/api/employees/with-details", methods=["GET"])
+@api.route("/api/employees/with-details", methods=["GET"])
+@query_budget(5)
+@conditional_get(ORG_VERSION_KEY)
+@cached(["employees", "departments", "designations"])
 def get_employees_with_details():
-    session = get_session()
     try:
-        manager_id = request.args.get("manager_id")
-        query = session.query(Employee)
-        if manager_id:
-            query = query.filter(Employee.reports_to_id == int(manager_id))
-        employees = query.all()
-        result = []
-        for emp in employees:
-            # Build manager hierarchy (above this employee)
-            hierarchy = []
-            current = emp
-            visited = set()
-            while current.reports_to_id and current.reports_to_id not in visited:
-                visited.add(current.reports_to_id)
-                manager = session.query(Employee).filter_by(id=current.reports_to_id).first()
-                if not manager:
-                    break
-                hierarchy.append({
-                    "id": manager.id,
-                    "employee_name": manager.employee_name,
-                    "email": manager.email,
-                    "designation": manager.designation.as_dict() if manager.designation else None,
-                    "department": manager.department.as_dict() if manager.department else None,
-                })
-                current = manager
-            result.append({
-                "id": emp.id,
-                "employee_name": emp.employee_name,
-                "email": emp.email,
-                "department": emp.department.as_dict() if emp.department else None,
-                "designation": emp.designation.as_dict() if emp.designation else None,
-                "reports_to": emp.reports_to_id,
-                "manager_hierarchy": hierarchy,
+        page = page_request_from_args(request.args)
+        manager_id, department_id, designation_id = int_args(
+            request.args, "manager_id", "department_id", "designation_id"
+        )
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    graph = get_org_graph()
+    if manager_id:
+        employee_ids = graph.subordinates.get(manager_id, [])
+    else:
+        employee_ids = graph.employees.keys()
+    employee_ids = sorted(
+        emp_id for emp_id in employee_ids
+        if (not department_id or graph.employees[emp_id]["department_id"] == department_id)
+        and (not designation_id or graph.employees[emp_id]["designation_id"] == designation_id)
+    )
+    if page is not None:
+        try:
+            employee_ids, next_cursor, total = paginate_ids(employee_ids, page)
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
+    result = []
+    for emp_id in employee_ids:
+        emp = graph.employees[emp_id]
+        # Build manager hierarchy (above this employee)
+        hierarchy = []
+        for ancestor_id in graph.manager_chain(emp_id):
+            manager = graph.employees[ancestor_id]
+            hierarchy.append({
+                "id": manager["id"],
+                "employee_name": manager["employee_name"],
+                "email": manager["email"],
+                "designation": graph.designation_dict(manager["designation_id"]),
+                "department": graph.department_dict(manager["department_id"]),
             })
-        return jsonify(result), 200
-    finally:
-        safe_close(session)
-
-@app.route("/api/employees", methods=["POST"])
+        result.append({
+            "id": emp["id"],
+            "employee_name": emp["employee_name"],
+            "email": emp["email"],
+            "department": graph.department_dict(emp["department_id"]),
+            "designation": graph.designation_dict(emp["designation_id"]),
+            "reports_to": emp["reports_to_id"],
+            "manager_hierarchy": hierarchy,
+        })
+    response = jsonify(result if page is None else page_response(result, next_cursor, total))
+    response.headers["X-Org-Version"] = str(graph.version)
+    return response, 200
+
+@api.route("/api/employees", methods=["POST"])
+@query_budget(7)
 def add_employee():
-    session = get_session()
+    session = db_session()
     try:
         data = request.get_json()
         name = data.get("employee_name")
@@ -285,7 +257,7 @@ def add_employee():
             return jsonify({"error": "Invalid email format"}), 400
 
         # Check if email already exists
-        if session.query(Employee).filter_by(email=email).first():
+        if session.query(Employee).filter_by(email_normalized=normalize_email(email)).first():
             return jsonify({"error": "Email already exists"}), 400
 
         # Validate designation and department existence
@@ -311,151 +283,407 @@ def add_employee():
             department_id=department_id
         )
         session.add(new_emp)
-        session.commit()
+        session.flush()
+        invalidate_on_commit(session, "employees")
 
         return jsonify({"message": "Employee added successfully"}), 201
 
     except IntegrityError:
-        session.rollback()
         return jsonify({"error": "Integrity error (possible foreign key constraint or duplicate)"}), 400
-    except Exception as e:
-        session.rollback()
-        return jsonify({"error": str(e)}), 500
-    finally:
-        safe_close(session)
+
+# ---------------- Employees: Bulk Manager Reassignment ----------------
+@api.route("/api/employees/reassign-managers", methods=["POST"])
+@query_budget(8)
+def reassign_employee_managers():
+    # Accepts [{"employee_id", "manager_id"}, ...] or {"moves": [...]}; all
+    # moves are validated together and applied in one transaction.
+    data = request.get_json(silent=True)
+    moves = data.get("moves") if isinstance(data, dict) else data
+    session = db_session()
+    try:
+        result = reassign_managers(session, moves)
+    except ReassignmentError as e:
+        return jsonify({"errors": e.errors}), e.status_code
+    if result["moved"]:
+        invalidate_on_commit(session, "employees")
+    return jsonify(result), 200
 
 # 6. Get change history for a daily log
-@app.route("/api/daily-logs/<int:log_id>/changes", methods=["GET"])
+@api.route("/api/daily-logs/<int:log_id>/changes", methods=["GET"])
+@query_budget(1)
+@read_only
 def get_daily_log_changes(log_id):
-    session = get_session()
+    changes = DAILY_LOG_CHANGE_HISTORY.query(db_session()).filter(
+        DailyLogChange.daily_log_id == log_id
+    ).order_by(DailyLogChange.changed_at.desc())
+    return jsonify(DAILY_LOG_CHANGE_HISTORY.all(changes)), 200
+
+# ---------------- Daily Logs: Payroll Export ----------------
+@api.route("/api/daily-logs/export", methods=["GET"])
+@query_budget(1)
+def export_daily_logs():
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    export_format = request.args.get("format", "ndjson").lower()
+    if not start_date or not end_date:
+        return jsonify({"error": "start_date and end_date query params required"}), 400
     try:
-        changes = session.query(DailyLogChange).filter_by(daily_log_id=log_id).order_by(DailyLogChange.changed_at.desc()).all()
-        return jsonify([
-            {
-                "id": c.id,
-                "project_id": c.project_id,
-                "new_description": c.new_description,
-                "changed_at": c.changed_at.strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            for c in changes
-        ]), 200
-    finally:
-        safe_close(session)
-
+        employee_id = int_args(request.args, "employee_id")
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    def generate():
+        # The session lives as long as the stream, not the view function.
+        session = get_session()
+        session.info["read_only"] = True
+        try:
+            rows = iter_export_rows(session, start, end, employee_id)
+            yield from (iter_csv(rows) if export_format == "csv" else iter_ndjson(rows))
+        finally:
+            safe_close(session)
+
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    filename = f"daily-logs-{start_date}-{end_date}.{export_format}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+
+# ---------------- Reports: Weekly Hours per Project ----------------
+@api.route("/api/reports/weekly-hours", methods=["GET"])
+@query_budget(5)
+@cached(["hours", "employees"])
+@read_only
+def weekly_hours():
+    """Per employee, week and project totals read from the weekly_project_hours rollup."""
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    if not start_date or not end_date:
+        return jsonify({"error": "start_date and end_date query params required"}), 400
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+    try:
+        employee_id, manager_id, project_id = int_args(request.args, "employee_id", "manager_id", "project_id")
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+
+    employee_ids = None
+    if manager_id:
+        employee_ids = sorted(report_scope(get_org_graph(), manager_id=manager_id))
+    if employee_id:
+        employee_ids = [employee_id] if employee_ids is None or employee_id in employee_ids else []
+    rows = weekly_hours_report(db_session(), start, end, employee_ids, project_id)
+    return jsonify(rows), 200
+
+
+# ---------------- Manager Team Dashboard ----------------
+@api.route("/api/managers/<int:manager_id>/team-dashboard", methods=["GET"])
+@query_budget(3)
+@cached(["hours", "timesheets", "employees"])
+@read_only
+def manager_team_dashboard(manager_id):
+    """Status and hours by project for every direct and indirect report in one week."""
+    week = request.args.get("week_start")
+    try:
+        day = datetime.strptime(week, "%Y-%m-%d").date() if week else datetime.utcnow().date()
+    except ValueError:
+        return jsonify({"error": "Invalid week_start format. Use YYYY-MM-DD."}), 400
+    dashboard = team_dashboard(db_session(), manager_id, day)
+    if dashboard is None:
+        return jsonify({"error": "Manager not found"}), 404
+    return jsonify(dashboard), 200
+
+
+
+# ---------------- Reports: Timesheet Analytics ----------------
+def _analytics_args():
+    """(start, end, department_id, manager_id, error) from the analytics query params."""
+    start_date = request.args.get("start_date")
+    end_date = request.args.get("end_date")
+    if not start_date or not end_date:
+        return None, None, None, None, "start_date and end_date query params required"
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        return None, None, None, None, "Invalid date format. Use YYYY-MM-DD."
+    try:
+        department_id, manager_id = int_args(request.args, "department_id", "manager_id")
+    except PaginationError as e:
+        return None, None, None, None, str(e)
+    return start, end, department_id, manager_id, report_range(start, end)
+
+@api.route("/api/reports/utilization", methods=["GET"])
+@query_budget(5)
+@cached(["hours", "employees"])
+@read_only
+def utilization():
+    """Logged hours, utilization and overtime per employee and department."""
+    start, end, department_id, manager_id, error = _analytics_args()
+    if error:
+        return jsonify({"error": error}), 400
+    graph = get_org_graph()
+    employee_ids = report_scope(graph, department_id, manager_id)
+    report = utilization_report(db_session(), graph, start, end, employee_ids, department_id, manager_id)
+    return jsonify(report), 200
+
+@api.route("/api/reports/project-distribution", methods=["GET"])
+@query_budget(6)
+@cached(["hours", "employees", "projects"])
+@read_only
+def project_distribution():
+    """Hours and share of the total per project, split by department."""
+    start, end, department_id, manager_id, error = _analytics_args()
+    if error:
+        return jsonify({"error": error}), 400
+    report = project_distribution_report(db_session(), get_org_graph(), start, end, department_id, manager_id)
+    return jsonify(report), 200
+
+@api.route("/api/reports/weekday-heatmap", methods=["GET"])
+@query_budget(1)
+@cached(["hours", "employees"])
+@read_only
+def weekday_heatmap():
+    """Hours worked per weekday and hour of day."""
+    start, end, department_id, manager_id, error = _analytics_args()
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(weekday_heatmap_report(db_session(), start, end, department_id, manager_id)), 200
+
+# ---------------- Employee Subtree ----------------
+SUBTREE_FIELDS = ("id", "employee_name", "email", "department_id", "designation_id", "reports_to_id")
+
+@api.route("/api/employees/<int:employee_id>/subtree", methods=["GET"])
+@query_budget(2)
+@read_only
+@conditional_get(ORG_VERSION_KEY)
+@cached(["employees"])
+def employee_subtree(employee_id):
+    """An employee and every direct and indirect report, nested or as a flat parent-pointer list.
+
+    Query params: max_depth (levels below the employee, default and cap
+    MAX_CHAIN_DEPTH), fields (comma separated, from SUBTREE_FIELDS) and
+    format (tree or flat).
+    """
+    try:
+        max_depth = int_args(request.args, "max_depth")
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    if max_depth is None and "max_depth" not in request.args:
+        max_depth = MAX_CHAIN_DEPTH
+    if max_depth is None or not 0 <= max_depth <= MAX_CHAIN_DEPTH:
+        return jsonify({"error": f"max_depth must be an integer between 0 and {MAX_CHAIN_DEPTH}"}), 400
+    fields = [f.strip() for f in request.args.get("fields", "id,employee_name,email").split(",") if f.strip()]
+    if not fields:
+        return jsonify({"error": f"fields must name at least one of: {', '.join(SUBTREE_FIELDS)}"}), 400
+    unknown = [f for f in fields if f not in SUBTREE_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(SUBTREE_FIELDS)}"}), 400
+    output = request.args.get("format", "tree")
+    if output not in ("tree", "flat"):
+        return jsonify({"error": "format must be tree or flat"}), 400
+
+    subtree = load_subtree(db_session(), employee_id, fields, max_depth)
+    rows = subtree["rows"]
+    if not rows:
+        return jsonify({"error": "Employee not found"}), 404
+    truncated = subtree["truncated_ids"]
+    result = {
+        "count": len(rows),
+        "max_depth": max_depth,
+        "truncated": bool(truncated),
+        "cycle_ids": subtree["cycle_ids"],
+    }
+    def project(row, keys):
+        item = {k: row[k] for k in keys}
+        if row["id"] in truncated:
+            item["has_more"] = True
+        return item
+
+    if output == "flat":
+        keys = list(dict.fromkeys(["id", *fields, "reports_to_id", "depth"]))
+        result["employees"] = [project(row, keys) for row in rows]
+    else:
+        result["root"] = nest_subtree(rows, lambda row: project(row, fields))
+    return jsonify(result), 200
 
 
 # --- Department CRUD ---
 
-@app.route("/api/departments", methods=["GET"])
+@api.route("/api/departments", methods=["GET"])
+@query_budget(3)
+@read_only
+@conditional_get("departments")
+@cached(["departments"])
 def get_departments():
-    session = get_session()
+    session = db_session()
     try:
-        departments = session.query(Department).all()
-        return jsonify([d.as_dict() for d in departments]), 200
-    finally:
-        safe_close(session)
+        page = page_request_from_args(request.args)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    query = DEPARTMENT.query(session)
+    name = request.args.get("name")
+    if name:
+        query = query.filter(Department.name.ilike(f"%{name}%"))
+    if page is None:
+        return jsonify(DEPARTMENT.all(query)), 200
+    try:
+        departments, next_cursor, total = paginate_query(query, [Department.id], page)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page_response(DEPARTMENT.all(departments), next_cursor, total)), 200
 
-@app.route("/api/departments", methods=["POST"])
+@api.route("/api/departments", methods=["POST"])
+@query_budget(3)
 def add_department():
-    session = get_session()
-    try:
-        data = request.get_json()
-        name = data.get("name")
-        if not name:
-            return jsonify({"error": "Department name required"}), 400
-        if session.query(Department).filter_by(name=name).first():
-            return jsonify({"error": "Department already exists"}), 400
-        dept = Department(name=name)
-        session.add(dept)
-        session.commit()
-        return jsonify(dept.as_dict()), 201
-    finally:
-        safe_close(session)
-
-@app.route("/api/departments/<int:dept_id>", methods=["PUT"])
+    session = db_session()
+    data = request.get_json()
+    name = data.get("name")
+    if not name:
+        return jsonify({"error": "Department name required"}), 400
+    if session.query(Department).filter_by(name=name).first():
+        return jsonify({"error": "Department already exists"}), 400
+    dept = Department(name=name)
+    session.add(dept)
+    session.flush()
+    invalidate_on_commit(session, "departments")
+    return jsonify(dept.as_dict()), 201
+
+@api.route("/api/departments/<int:dept_id>", methods=["PUT"])
+@query_budget(3)
 def update_department(dept_id):
-    session = get_session()
-    try:
-        data = request.get_json()
-        name = data.get("name")
-        dept = session.query(Department).get(dept_id)
-        if not dept:
-            return jsonify({"error": "Department not found"}), 404
-        dept.name = name
-        session.commit()
-        return jsonify(dept.as_dict()), 200
-    finally:
-        safe_close(session)
-
-@app.route("/api/departments/<int:dept_id>", methods=["DELETE"])
+    session = db_session()
+    data = request.get_json()
+    name = data.get("name")
+    dept = session.get(Department, dept_id)
+    if not dept:
+        return jsonify({"error": "Department not found"}), 404
+    dept.name = name
+    session.flush()
+    invalidate_on_commit(session, "departments", "employees")
+    return jsonify(dept.as_dict()), 200
+
+@api.route("/api/departments/<int:dept_id>", methods=["DELETE"])
+@query_budget(20)
 def delete_department(dept_id):
-    session = get_session()
-    try:
-        dept = session.query(Department).get(dept_id)
-        if not dept:
-            return jsonify({"error": "Department not found"}), 404
-        session.delete(dept)
-        session.commit()
-        return jsonify({"message": "Department deleted"}), 200
-    finally:
-        safe_close(session)
+    session = db_session()
+    if not cascade_delete_department(session, dept_id):
+        return jsonify({"error": "Department not found"}), 404
+    invalidate_on_commit(session, "departments", "designations", "employees", "timesheets", "daily_logs", "hours")
+    return jsonify({"message": "Department deleted"}), 200
 
 # --- Designation CRUD ---
 
-@app.route("/api/designations", methods=["GET"])
+@api.route("/api/designations", methods=["GET"])
+@query_budget(3)
+@read_only
+@conditional_get("designations")
+@cached(["designations"])
 def get_designations():
-    session = get_session()
+    session = db_session()
+    try:
+        page = page_request_from_args(request.args)
+        department_id = int_args(request.args, "department_id")
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    query = DESIGNATION.query(session)
+    if department_id:
+        query = query.filter(Designation.department_id == department_id)
+    title = request.args.get("title")
+    if title:
+        query = query.filter(Designation.title.ilike(f"%{title}%"))
+    if page is None:
+        return jsonify(DESIGNATION.all(query)), 200
     try:
-        designations = session.query(Designation).all()
-        return jsonify([d.as_dict() for d in designations]), 200
-    finally:
-        safe_close(session)
+        designations, next_cursor, total = paginate_query(query, [Designation.id], page)
+    except PaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page_response(DESIGNATION.all(designations), next_cursor, total)), 200
 
-@app.route("/api/designations", methods=["POST"])
+@api.route("/api/designations", methods=["POST"])
+@query_budget(3)
 def add_designation():
-    session = get_session()
-    try:
-        data = request.get_json()
-        title = data.get("title")
-        if not title:
-            return jsonify({"error": "Designation title required"}), 400
-        if session.query(Designation).filter_by(title=title).first():
-            return jsonify({"error": "Designation already exists"}), 400
-        des = Designation(title=title)
-        session.add(des)
-        session.commit()
-        return jsonify(des.as_dict()), 201
-    finally:
-        safe_close(session)
-
-@app.route("/api/designations/<int:des_id>", methods=["PUT"])
+    session = db_session()
+    data = request.get_json()
+    title = data.get("title")
+    if not title:
+        return jsonify({"error": "Designation title required"}), 400
+    if session.query(Designation).filter_by(title=title).first():
+        return jsonify({"error": "Designation already exists"}), 400
+    des = Designation(title=title)
+    session.add(des)
+    session.flush()
+    invalidate_on_commit(session, "designations")
+    return jsonify(des.as_dict()), 201
+
+@api.route("/api/designations/<int:des_id>", methods=["PUT"])
+@query_budget(3)
 def update_designation(des_id):
-    session = get_session()
-    try:
-        data = request.get_json()
-        title = data.get("title")
-        des = session.query(Designation).get(des_id)
-        if not des:
-            return jsonify({"error": "Designation not found"}), 404
-        des.title = title
-        session.commit()
-        return jsonify(des.as_dict()), 200
-    finally:
-        safe_close(session)
-
-@app.route("/api/designations/<int:des_id>", methods=["DELETE"])
+    session = db_session()
+    data = request.get_json()
+    title = data.get("title")
+    des = session.get(Designation, des_id)
+    if not des:
+        return jsonify({"error": "Designation not found"}), 404
+    des.title = title
+    session.flush()
+    invalidate_on_commit(session, "designations", "employees")
+    return jsonify(des.as_dict()), 200
+
+@api.route("/api/designations/<int:des_id>", methods=["DELETE"])
+@query_budget(4)
 def delete_designation(des_id):
-    session = get_session()
-    try:
-        des = session.query(Designation).get(des_id)
-        if not des:
-            return jsonify({"error": "Designation not found"}), 404
-        session.delete(des)
-        session.commit()
-        return jsonify({"message": "Designation deleted"}), 200
-    finally:
-        safe_close(session)
+    session = db_session()
+    des = session.get(Designation, des_id)
+    if not des:
+        return jsonify({"error": "Designation not found"}), 404
+    session.delete(des)
+    session.flush()
+    invalidate_on_commit(session, "designations", "employees")
+    return jsonify({"message": "Designation deleted"}), 200
+
+# ---------------- Health ----------------
+@api.route("/api/health/db-pool", methods=["GET"])
+@query_budget(0)
+def db_pool_health():
+    return jsonify({
+        "primary": get_pool_stats(),
+        "replicas": [get_pool_stats(replica) for replica in replica_engines],
+    }), 200
+
+@api.route("/api/health/ready", methods=["GET"])
+@query_budget(3)
+def readiness():
+    ok, checks = check_ready(current_app)
+    return jsonify({"ready": ok, "checks": checks}), 200 if ok else 503
+
+# ---------------- App Factory ----------------
+def create_app():
+    app = Flask(__name__)
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000", "expose_headers": ["X-Org-Version", "ETag"]}})
+    # Metrics first and request session last: after_request hooks run in
+    # reverse order, so latency and SQL timing include the commit.
+    init_metrics(app)
+    init_sql_timing(app)
+    init_request_session(app)
+    init_json_provider(app)
+    app.register_blueprint(api)
+    return app
 
 # ---------------- Run App ----------------
+# Development server only; production runs gunicorn -c gunicorn.conf.py (see wsgi.py).
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""Compare query plans and timings for hot lookups with and without the 0002 indexes.
+
+Seeds a scratch database with a synthetic org, runs each hot query with the
+secondary indexes dropped and again after recreating them, and prints the
+plan plus the mean time per execution.
+
+Usage (from backend/):
+    python benchmarks/query_plans.py
+    python benchmarks/query_plans.py --url mysql+pymysql://user:pw@host/tms_bench --employees 5000
+
+Never point --url at a real database: all tables are dropped and recreated.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, inspect, text
+from models.base import Base
+from models.employee import Employee, normalize_email
+from models.department import Department
+from models.designation import Designation
+from models.project import Project
+from models.timesheet import Timesheet
+from models.dailylogs import DailyLog
+from models.dailylogchanges import DailyLogChange
+
+import importlib
+hot_indexes = importlib.import_module('migrations.0002_hot_lookup_indexes')
+
+FIRST_WEEK = date(2025, 1, 6)
+
+# (label, SQL before the migration, SQL after it, params)
+HOT_QUERIES = [
+    ('timesheet by employee + week',
+     "SELECT * FROM timesheets WHERE employee_id = :emp AND start_date <= :day AND end_date >= :day",
+     None, {'emp': 7, 'day': FIRST_WEEK + timedelta(days=31)}),
+    ('daily logs of a timesheet',
+     "SELECT * FROM daily_logs WHERE timesheet_id = :ts ORDER BY log_date",
+     None, {'ts': 42}),
+    ('daily logs in a date range',
+     "SELECT * FROM daily_logs WHERE log_date BETWEEN :start AND :end",
+     None, {'start': FIRST_WEEK + timedelta(days=14), 'end': FIRST_WEEK + timedelta(days=15)}),
+    ('change history of a log',
+     "SELECT * FROM daily_log_changes WHERE daily_log_id = :log ORDER BY changed_at",
+     None, {'log': 99}),
+    ('direct reports',
+     "SELECT * FROM employees WHERE reports_to_id = :mgr",
+     None, {'mgr': 3}),
+    ('employee by email',
+     "SELECT * FROM employees WHERE LOWER(email) = :email",
+     "SELECT * FROM employees WHERE email_normalized = :email",
+     {'email': 'employee1234@example.com'}),
+]
+
+
+def seed(engine, employees, weeks, logs_per_week):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        conn.execute(insert(Department), [{'id': 1, 'name': 'Engineering'}])
+        conn.execute(insert(Designation), [{'id': 1, 'title': 'Engineer', 'department_id': 1}])
+        conn.execute(insert(Project), [{'id': i, 'name': f'Project {i}'} for i in range(1, 21)])
+        emp_rows = []
+        for i in range(1, employees + 1):
+            email = f'Employee{i}@example.com'
+            emp_rows.append({
+                'id': i, 'employee_name': f'Employee {i}', 'email': email,
+                'email_normalized': normalize_email(email), 'department_id': 1, 'designation_id': 1,
+                'reports_to_id': rng.randint(1, i - 1) if i > 1 else None,
+            })
+        conn.execute(insert(Employee), emp_rows)
+        ts_rows, log_rows, change_rows = [], [], []
+        for emp_id in range(1, employees + 1):
+            for w in range(weeks):
+                start = FIRST_WEEK + timedelta(weeks=w)
+                ts_id = len(ts_rows) + 1
+                ts_rows.append({'id': ts_id, 'employee_id': emp_id, 'start_date': start, 'end_date': start + timedelta(days=6)})
+                for d in range(logs_per_week):
+                    log_id = len(log_rows) + 1
+                    log_rows.append({
+                        'id': log_id, 'timesheet_id': ts_id, 'project_id': rng.randint(1, 20),
+                        'log_date': start + timedelta(days=d % 5), 'start_time': dtime(9), 'end_time': dtime(17),
+                        'total_hours': 8, 'task_description': 'work',
+                    })
+                    if log_id % 4 == 0:
+                        change_rows.append({'daily_log_id': log_id, 'project_id': 1, 'new_description': 'edit'})
+        conn.execute(insert(Timesheet), ts_rows)
+        conn.execute(insert(DailyLog), log_rows)
+        conn.execute(insert(DailyLogChange), change_rows)
+    print(f"Seeded {employees} employees, {len(ts_rows)} timesheets, {len(log_rows)} daily logs.")
+
+
+def drop_hot_indexes(engine):
+    names = [(table, name) for table, name, _ in hot_indexes.INDEXES]
+    names.append(('employees', 'ux_employees_email_normalized'))
+    with engine.begin() as conn:
+        for table, name in names:
+            if name in {ix['name'] for ix in inspect(conn).get_indexes(table)}:
+                if conn.dialect.name in ('mysql', 'mariadb'):
+                    conn.execute(text(f"DROP INDEX {name} ON {table}"))
+                else:
+                    conn.execute(text(f"DROP INDEX {name}"))
+
+
+def explain(conn, sql, params):
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = conn.execute(text(prefix + sql), params).all()
+    if conn.dialect.name == 'sqlite':
+        return [row[-1] for row in rows]
+    return [' | '.join(str(v) for v in row) for row in rows]
+
+
+def timed(conn, sql, params, repeat):
+    stmt = text(sql)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(stmt, params).all()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def report(engine, phase, repeat):
+    print(f"\n==== {phase} ====")
+    results = {}
+    with engine.connect() as conn:
+        for label, before_sql, after_sql, params in HOT_QUERIES:
+            sql = after_sql if phase == 'after' and after_sql else before_sql
+            plan = explain(conn, sql, params)
+            results[label] = timed(conn, sql, params, repeat)
+            print(f"\n{label}: {results[label]:.3f} ms")
+            for line in plan:
+                print(f"    {line}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='scratch database URL (default: temporary SQLite file)')
+    parser.add_argument('--employees', type=int, default=2000)
+    parser.add_argument('--weeks', type=int, default=12)
+    parser.add_argument('--logs-per-week', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    url = args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'query_plans.db')
+    engine = create_engine(url)
+    seed(engine, args.employees, args.weeks, args.logs_per_week)
+
+    drop_hot_indexes(engine)
+    before = report(engine, 'before', args.repeat)
+    with engine.begin() as conn:
+        hot_indexes.upgrade(conn)
+    after = report(engine, 'after', args.repeat)
+
+    print("\n==== summary (mean ms per query) ====")
+    for label, _, _, _ in HOT_QUERIES:
+        speedup = before[label] / after[label] if after[label] else float('inf')
+        print(f"{label:32} {before[label]:9.3f} -> {after[label]:9.3f}  ({speedup:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
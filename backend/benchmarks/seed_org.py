@@ -0,0 +1,189 @@
+"""Seed a scratch database with a synthetic org using bulk inserts.
+
+The org is a tree with a fixed fan-out (employee 1 at the top), and every
+employee gets one timesheet per week with ``logs_per_week`` daily logs.
+Ids are assigned here rather than by the database, so a benchmark can
+derive valid ids from the seed parameters alone (see ``OrgShape``).
+
+Usage (from backend/):
+    python benchmarks/seed_org.py --employees 10000 --weeks 104
+    python benchmarks/seed_org.py --url mysql+pymysql://user:pw@localhost/tms_bench --employees 100000
+
+Never point --url at a real database: all tables are dropped and recreated.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from models.base import Base
+from models.employee import Employee
+from models.department import Department
+from models.designation import Designation
+from models.project import Project
+from models.timesheet import Timesheet
+from models.dailylogs import DailyLog
+from models.dailylogchanges import DailyLogChange
+from models.table_version import TableVersion
+from models.weekly_hours import WeeklyProjectHours
+from services.table_versions import VERSIONED_TABLES
+from services.weekly_hours import rebuild_weekly_hours
+from services.employee_closure import rebuild_employee_closure
+
+CHUNK_SIZE = 10000
+FIRST_WEEK = date(2023, 1, 2)  # a Monday
+DEPARTMENTS = 12
+DESIGNATIONS_PER_DEPARTMENT = 4
+PROJECTS = 60
+# One change-history row for every Nth daily log.
+CHANGE_EVERY = 10
+
+
+class OrgShape:
+    """Seed parameters, and the ids and values they imply."""
+
+    def __init__(self, employees, weeks, logs_per_week=5, fanout=8):
+        self.employees = employees
+        self.weeks = weeks
+        self.logs_per_week = logs_per_week
+        self.fanout = fanout
+
+    @property
+    def timesheets(self):
+        return self.employees * self.weeks
+
+    @property
+    def logs(self):
+        return self.timesheets * self.logs_per_week
+
+    @property
+    def managers(self):
+        """Highest employee id that has at least one report."""
+        return (self.employees - 2) // self.fanout + 1 if self.employees > 1 else 0
+
+    def manager_of(self, employee_id):
+        return (employee_id - 2) // self.fanout + 1 if employee_id > 1 else None
+
+    def email(self, employee_id):
+        return f'employee{employee_id}@bench.example'
+
+    def timesheet_id(self, employee_id, week):
+        return (employee_id - 1) * self.weeks + week + 1
+
+    def week_start(self, timesheet_id):
+        return FIRST_WEEK + timedelta(weeks=(timesheet_id - 1) % self.weeks)
+
+    def log_ids(self, timesheet_id):
+        first = (timesheet_id - 1) * self.logs_per_week + 1
+        return range(first, first + self.logs_per_week)
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _employees(shape):
+    for emp_id in range(1, shape.employees + 1):
+        department_id = emp_id % DEPARTMENTS + 1
+        yield {
+            'id': emp_id,
+            'employee_name': f'Employee {emp_id}',
+            'email': shape.email(emp_id),
+            'email_normalized': shape.email(emp_id),
+            'department_id': department_id,
+            'designation_id': (department_id - 1) * DESIGNATIONS_PER_DEPARTMENT + emp_id % DESIGNATIONS_PER_DEPARTMENT + 1,
+            'reports_to_id': shape.manager_of(emp_id),
+        }
+
+
+def _timesheets(shape):
+    for emp_id in range(1, shape.employees + 1):
+        for week in range(shape.weeks):
+            start = FIRST_WEEK + timedelta(weeks=week)
+            yield {'id': shape.timesheet_id(emp_id, week), 'employee_id': emp_id,
+                   'start_date': start, 'end_date': start + timedelta(days=6)}
+
+
+def _daily_logs(shape):
+    for ts_id in range(1, shape.timesheets + 1):
+        start = shape.week_start(ts_id)
+        for n, log_id in enumerate(shape.log_ids(ts_id)):
+            hour = 9 + (n // 5) % 8
+            yield {
+                'id': log_id, 'timesheet_id': ts_id, 'project_id': log_id % PROJECTS + 1,
+                'log_date': start + timedelta(days=n % 5),
+                'start_time': dtime(hour), 'end_time': dtime(hour + 1),
+                'total_hours': 1, 'task_description': f'Task {log_id}',
+            }
+
+
+def _changes(shape):
+    for log_id in range(CHANGE_EVERY, shape.logs + 1, CHANGE_EVERY):
+        yield {'daily_log_id': log_id, 'project_id': log_id % PROJECTS + 1,
+               'new_description': f'Task {log_id} (edited)'}
+
+
+def seed_org(engine, shape, progress=print):
+    """Drop and recreate every table, then bulk insert the org described by ``shape``."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(Department), [{'id': d, 'name': f'Department {d}'} for d in range(1, DEPARTMENTS + 1)])
+        conn.execute(insert(Designation), [
+            {'id': (d - 1) * DESIGNATIONS_PER_DEPARTMENT + n, 'title': f'Grade {n}', 'department_id': d}
+            for d in range(1, DEPARTMENTS + 1) for n in range(1, DESIGNATIONS_PER_DEPARTMENT + 1)
+        ])
+        conn.execute(insert(Project), [{'id': p, 'name': f'Project {p}'} for p in range(1, PROJECTS + 1)])
+        conn.execute(insert(TableVersion), [{'table_name': name, 'version': 1} for name in VERSIONED_TABLES])
+        for model, rows, total in (
+            (Employee, _employees(shape), shape.employees),
+            (Timesheet, _timesheets(shape), shape.timesheets),
+            (DailyLog, _daily_logs(shape), shape.logs),
+            (DailyLogChange, _changes(shape), shape.logs // CHANGE_EVERY),
+        ):
+            done = 0
+            for chunk in _chunks(rows):
+                conn.execute(insert(model), chunk)
+                done += len(chunk)
+            progress(f"  {model.__tablename__}: {done}/{total}")
+        rebuild_weekly_hours(conn)
+        progress(f"  {WeeklyProjectHours.__tablename__}: rebuilt")
+        progress(f"  employee_closure: {rebuild_employee_closure(conn)} rows")
+    progress(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def add_shape_arguments(parser):
+    parser.add_argument('--employees', type=int, default=1000)
+    parser.add_argument('--weeks', type=int, default=52, help='weeks of timesheets per employee')
+    parser.add_argument('--logs-per-week', type=int, default=5)
+    parser.add_argument('--fanout', type=int, default=8, help='direct reports per manager')
+
+
+def shape_from_args(args):
+    return OrgShape(args.employees, args.weeks, args.logs_per_week, args.fanout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', required=True, help='scratch database URL')
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+    shape = shape_from_args(args)
+    print(f"Seeding {shape.employees} employees, {shape.timesheets} timesheets, {shape.logs} daily logs")
+    seed_org(create_engine(args.url), shape)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Compare the ORM + as_dict() + jsonify path with the row-converter + orjson path.
+
+Seeds a scratch SQLite database (or --url) with daily logs and times each
+path end to end, split into query, row -> dict and JSON encoding.
+
+Usage (from backend/):
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --logs 100000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from models.base import Base
+from models.employee import Employee
+from models.department import Department
+from models.designation import Designation
+from models.project import Project
+from models.timesheet import Timesheet
+from models.dailylogs import DailyLog
+import models.dailylogchanges
+from utils.json_provider import OrjsonProvider, orjson
+from utils.serialization import DAILY_LOG
+
+
+def seed(engine, logs):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    per_timesheet = 20
+    timesheets = (logs + per_timesheet - 1) // per_timesheet
+    with engine.begin() as conn:
+        conn.execute(insert(Department), [{'id': 1, 'name': 'Engineering'}])
+        conn.execute(insert(Designation), [{'id': 1, 'title': 'Engineer', 'department_id': 1}])
+        conn.execute(insert(Project), [{'id': i, 'name': f'Project {i}'} for i in range(1, 11)])
+        conn.execute(insert(Employee), [{'id': 1, 'employee_name': 'Bench', 'email': 'bench@example.com',
+                                         'department_id': 1, 'designation_id': 1}])
+        conn.execute(insert(Timesheet), [
+            {'id': i, 'employee_id': 1, 'start_date': date(2020, 1, 6) + timedelta(weeks=i), 'end_date': date(2020, 1, 12) + timedelta(weeks=i)}
+            for i in range(1, timesheets + 1)
+        ])
+        conn.execute(insert(DailyLog), [
+            {'timesheet_id': i // per_timesheet + 1, 'project_id': i % 10 + 1,
+             'log_date': date(2020, 1, 6) + timedelta(days=i // per_timesheet * 7 + i % 5),
+             'start_time': dtime(9), 'end_time': dtime(17), 'total_hours': 8,
+             'task_description': f'Task number {i} for the benchmark'}
+            for i in range(logs)
+        ])
+
+
+def run_orm(session, app):
+    started = time.perf_counter()
+    logs = session.query(DailyLog).all()
+    queried = time.perf_counter()
+    data = [log.as_dict() for log in logs]
+    converted = time.perf_counter()
+    body = app.json.response(data).get_data()
+    return body, (queried - started, converted - queried, time.perf_counter() - converted)
+
+
+def run_rows(session, app):
+    started = time.perf_counter()
+    rows = session.execute(DAILY_LOG.select()).all()
+    queried = time.perf_counter()
+    data = DAILY_LOG.all(rows)
+    converted = time.perf_counter()
+    body = app.json.response(data).get_data()
+    return body, (queried - started, converted - queried, time.perf_counter() - converted)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='scratch database URL (default: temporary SQLite file)')
+    parser.add_argument('--logs', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    url = args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'serialization.db')
+    engine = create_engine(url)
+    seed(engine, args.logs)
+    Session = sessionmaker(bind=engine)
+
+    stdlib_app = Flask('stdlib')
+    variants = [('orm + as_dict + stdlib json', run_orm, stdlib_app),
+                ('rows + converter + stdlib json', run_rows, stdlib_app)]
+    if orjson is not None:
+        orjson_app = Flask('orjson')
+        orjson_app.json = OrjsonProvider(orjson_app)
+        variants.append(('rows + converter + orjson', run_rows, orjson_app))
+    else:
+        print("orjson not installed; skipping the orjson variant.")
+
+    print(f"{args.logs} daily logs, best of {args.repeat} (seconds)\n")
+    print(f"{'path':34} {'query':>8} {'to dict':>8} {'encode':>8} {'total':>8}")
+    bodies = []
+    for label, run, app in variants:
+        best = None
+        for _ in range(args.repeat):
+            session = Session()
+            try:
+                with app.app_context():
+                    body, timings = run(session, app)
+            finally:
+                session.close()
+            if best is None or sum(timings) < sum(best):
+                best = timings
+        bodies.append(body)
+        print(f"{label:34} {best[0]:8.3f} {best[1]:8.3f} {best[2]:8.3f} {sum(best):8.3f}")
+
+    same = all(json.loads(body) == json.loads(bodies[0]) for body in bodies)
+    print(f"\nIdentical payloads: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Drive the Flask app with a weighted mix of real endpoints and report latency.
+
+Seeds a synthetic org (see seed_org.py) unless --no-seed is given, then
+sends requests through the Flask test client, in process and without
+network overhead. For each endpoint it reports p50/p95/p99 latency,
+throughput and SQL statements per request.
+
+Usage (from backend/):
+    python benchmarks/traffic_mix.py --employees 1000 --weeks 52 --requests 5000
+    python benchmarks/traffic_mix.py --url mysql+pymysql://user:pw@localhost/tms_bench --no-seed --employees 100000
+    python benchmarks/traffic_mix.py --mix save=1,profile=4 --no-cache
+
+With --no-seed the org-size options must match the ones used for seeding,
+since request ids are derived from them.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing models is safe here; the app and its engine are imported only
+# after DATABASE_URL has been set in main().
+from sqlalchemy import create_engine
+from seed_org import add_shape_arguments, seed_org, shape_from_args
+from utils.query_budget import QueryCounter
+
+DEFAULT_MIX = 'save=20,with_details=20,profile=40,changes=20'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+
+    def record(self, seconds, queries, status):
+        self.latencies.append(seconds)
+        self.queries.append(queries)
+        if status >= 400:
+            self.errors += 1
+
+    def summary(self, wall_seconds):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'throughput_rps': round(count / wall_seconds, 1) if wall_seconds else None,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'mean_queries': round(sum(self.queries) / count, 2),
+            'max_queries': max(self.queries),
+        }
+
+
+class RequestMix:
+    """Builds random but valid requests for each endpoint from the seeded org shape."""
+
+    def __init__(self, shape, rng):
+        self.shape = shape
+        self.rng = rng
+        self.added = Counter()
+
+    def profile(self):
+        emp_id = self.rng.randint(1, self.shape.employees)
+        return 'GET', f'/api/employees/profile-with-hierarchy?email={self.shape.email(emp_id)}', None
+
+    def with_details(self):
+        manager_id = self.rng.randint(1, max(1, self.shape.managers))
+        return 'GET', f'/api/employees/with-details?manager_id={manager_id}&limit=50', None
+
+    def changes(self):
+        log_id = self.rng.randint(1, self.shape.logs)
+        return 'GET', f'/api/daily-logs/{log_id}/changes', None
+
+    def save(self):
+        """Re-save one timesheet's week: edit every existing log and add one new log."""
+        ts_id = self.rng.randint(1, self.shape.timesheets)
+        start = self.shape.week_start(ts_id)
+        tag = self.rng.randint(1, 10 ** 6)
+        # Edits get one hour slot each from 06:00; new logs take the next free
+        # minute on the (unseeded) Saturday, so every save is free of overlaps.
+        logs = [{
+            'id': log_id, 'timesheet_id': ts_id, 'project_id': self.rng.randint(1, 60),
+            'log_date': start.isoformat(), 'start_time': f'{6 + n:02d}:00', 'end_time': f'{7 + n:02d}:00',
+            'total_hours': 1, 'task_description': f'Edited {tag}',
+        } for n, log_id in enumerate(self.shape.log_ids(ts_id))]
+        minute = self.added[ts_id] % (24 * 60 - 1)
+        self.added[ts_id] += 1
+        logs.append({
+            'timesheet_id': ts_id, 'project_id': self.rng.randint(1, 60),
+            'log_date': (start + timedelta(days=5)).isoformat(),
+            'start_time': f'{minute // 60:02d}:{minute % 60:02d}',
+            'end_time': f'{(minute + 1) // 60:02d}:{(minute + 1) % 60:02d}',
+            'total_hours': 0, 'task_description': f'New {tag}',
+        })
+        return 'POST', '/api/daily-logs/save', logs
+
+
+def parse_mix(text):
+    weights = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if not hasattr(RequestMix, name.strip()):
+            raise SystemExit(f"Unknown endpoint {name!r} in --mix")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def run(client, mix, weights, requests, warmup, rng):
+    names = list(weights)
+    name_weights = [weights[name] for name in names]
+    stats = {name: EndpointStats() for name in names}
+    for i in range(warmup + requests):
+        name = rng.choices(names, weights=name_weights)[0]
+        method, path, body = getattr(mix, name)()
+        with QueryCounter() as counter:
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            elapsed = time.perf_counter() - started
+        if i == warmup:
+            wall_started = time.perf_counter() - elapsed
+        if i >= warmup:
+            stats[name].record(elapsed, counter.count, response.status_code)
+    return stats, time.perf_counter() - wall_started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='scratch database URL (default: temporary SQLite file)')
+    parser.add_argument('--no-seed', action='store_true', help='reuse an already seeded --url')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'endpoint=weight list (default {DEFAULT_MIX})')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--random-seed', type=int, default=42)
+    parser.add_argument('--json', help='also write the report to this file')
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+
+    url = args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'traffic_mix.db')
+    if args.no_seed and not args.url:
+        raise SystemExit("--no-seed needs --url")
+    # The app builds its engine and cache from the environment at import time.
+    os.environ['DATABASE_URL'] = url
+    if args.no_cache:
+        os.environ['CACHE_BACKEND'] = 'none'
+
+    shape = shape_from_args(args)
+    if not args.no_seed:
+        print(f"Seeding {shape.employees} employees, {shape.timesheets} timesheets, {shape.logs} daily logs")
+        seed_org(create_engine(url), shape)
+
+    from appp import create_app
+    weights = parse_mix(args.mix)
+    rng = random.Random(args.random_seed)
+    stats, wall = run(create_app().test_client(), RequestMix(shape, rng), weights, args.requests, args.warmup, rng)
+
+    report = {name: s.summary(wall) for name, s in stats.items() if s.latencies}
+    total = sum(s['requests'] for s in report.values())
+    print(f"\n{total} requests in {wall:.2f}s ({total / wall:.1f} req/s overall)\n")
+    print(f"{'endpoint':14} {'reqs':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for name, s in report.items():
+        print(f"{name:14} {s['requests']:6} {s['errors']:6} {s['throughput_rps']:8} {s['p50_ms']:8} "
+              f"{s['p95_ms']:8} {s['p99_ms']:8} {s['mean_queries']:8}")
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump({'url': url.split('@')[-1], 'employees': shape.employees, 'weeks': shape.weeks,
+                       'wall_seconds': round(wall, 3), 'endpoints': report}, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Measure throughput as gunicorn workers are added.
+
+For each worker count, starts gunicorn with gunicorn.conf.py against a
+seeded database, waits for /api/health/ready, then keeps ``--clients``
+keep-alive connections busy for ``--seconds`` on a mix of read endpoints.
+Reports requests per second overall and per worker.
+
+Usage (from backend/):
+    python benchmarks/seed_org.py --url sqlite:////tmp/scaling.db --employees 2000 --weeks 12
+    python benchmarks/worker_scaling.py --url sqlite:////tmp/scaling.db --employees 2000 --workers 1,2,4
+"""
+import argparse
+import http.client
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _paths(employees, rng):
+    emp_id = rng.randint(1, employees)
+    return rng.choice([
+        f'/api/employees/profile-with-hierarchy?email=employee{emp_id}@bench.example',
+        f'/api/employees/with-details?manager_id={max(1, emp_id // 8)}&limit=50',
+        '/api/projects',
+        f'/api/daily-logs/{emp_id}/changes',
+    ])
+
+
+def _wait_ready(port, deadline):
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/health/ready')
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def _client(port, employees, stop, counts, index, seed):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    done = errors = 0
+    while not stop.is_set():
+        try:
+            conn.request('GET', _paths(employees, rng))
+            response = conn.getresponse()
+            response.read()
+            done += 1
+            errors += response.status >= 500
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    counts[index] = (done, errors)
+
+
+def measure(url, workers, threads, clients, seconds, employees, port):
+    env = dict(os.environ, DATABASE_URL=url, WEB_WORKERS=str(workers), WEB_THREADS=str(threads),
+               WEB_BIND=f'127.0.0.1:{port}', WEB_ACCESS_LOG='/dev/null')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        if not _wait_ready(port, time.monotonic() + 60):
+            server.terminate()
+            raise SystemExit(f"gunicorn did not become ready:\n{server.communicate()[1].decode()[-2000:]}")
+        stop = threading.Event()
+        counts = [None] * clients
+        pool = [threading.Thread(target=_client, args=(port, employees, stop, counts, i, i)) for i in range(clients)]
+        started = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in pool:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    done = sum(c[0] for c in counts)
+    errors = sum(c[1] for c in counts)
+    return done / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', required=True, help='database seeded with seed_org.py')
+    parser.add_argument('--employees', type=int, default=1000, help='as passed to seed_org.py')
+    parser.add_argument('--workers', default='1,2,4', help='comma separated worker counts')
+    parser.add_argument('--threads', type=int, default=4, help='threads per worker')
+    parser.add_argument('--clients', type=int, default=32, help='concurrent keep-alive connections')
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs; {args.threads} threads per worker, {args.clients} clients, {args.seconds:g}s each")
+    print(f"{'workers':>8} {'req/s':>10} {'req/s/worker':>13} {'speed-up':>9} {'errors':>7}")
+    baseline = None
+    for workers in [int(w) for w in args.workers.split(',')]:
+        rps, errors = measure(args.url, workers, args.threads, args.clients, args.seconds, args.employees, args.port)
+        baseline = baseline or rps
+        print(f"{workers:8} {rps:10.1f} {rps / workers:13.1f} {rps / baseline:8.2f}x {errors:7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Check the employee_closure table against employees.reports_to_id, and optionally rebuild it.
+
+Usage:
+    python check_employee_closure.py            # report differences; exit status 1 if any
+    python check_employee_closure.py --rebuild  # recompute the whole table
+
+Run after writes that bypassed the application (raw SQL, imports into
+employees). The rebuild runs in a single transaction.
+"""
+import argparse
+import sys
+from utils.session_manager import engine
+from services.employee_closure import check_employee_closure, rebuild_employee_closure
+
+# Import all models so relationships resolve
+import models.department
+import models.designation
+import models.project
+import models.timesheet
+import models.dailylogs
+import models.dailylogchanges
+
+SHOW = 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rebuild', action='store_true', help='recompute employee_closure from reports_to_id')
+    args = parser.parse_args()
+    if args.rebuild:
+        with engine.begin() as conn:
+            written = rebuild_employee_closure(conn)
+        print(f"Rebuilt employee_closure: {written} row(s).")
+        return
+
+    with engine.connect() as conn:
+        problems = check_employee_closure(conn)
+    if not any(problems.values()):
+        print("employee_closure is consistent.")
+        return
+    for kind, rows in problems.items():
+        if rows:
+            print(f"{kind}: {len(rows)} row(s) (ancestor_id, descendant_id, depth)")
+            for row in rows[:SHOW]:
+                print(f"  {row}")
+            if len(rows) > SHOW:
+                print(f"  ... {len(rows) - SHOW} more")
+    print("Run with --rebuild to fix.")
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,53 @@ MYSQL_PASSWORD=os.getenv('MYSQL_PASSWORD')
 MYSQL_DB=os.getenv('MYSQL_DB')
 MYSQL_PORT=int(os.getenv('MYSQL_PORT',3306))
 
-SQLALCHEMY_DATABASE_URI = (
+SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL') or (
     f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
 )
-SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+# Connection pool for the MySQL engine (see utils/session_manager.py)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+# Recycle below MySQL's wait_timeout so idle connections never "go away"
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+# Seconds an in-process org graph may be served before it is reloaded even
+# without a local write (other workers' writes are only seen after this).
+ORG_CACHE_TTL_SECONDS = int(os.getenv('ORG_CACHE_TTL_SECONDS', 300))
+
+# Read replicas for @read_only endpoints, comma separated SQLAlchemy URIs.
+# Empty means every query goes to the primary.
+SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+# After a write, the same client reads from the primary for this long.
+READ_AFTER_WRITE_SECONDS = int(os.getenv('READ_AFTER_WRITE_SECONDS', 10))
+# A replica that failed to connect is skipped for this long.
+REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+
+# Response cache for hot GET endpoints (utils/cache.py): memory, redis or none.
+# redis without CACHE_REDIS_URL uses an in-process fake of the Redis store.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory').lower()
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+CACHE_DEFAULT_TTL = int(os.getenv('CACHE_DEFAULT_TTL', 60))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+
+# JSON encoder for responses (utils/json_provider.py): auto uses orjson when
+# installed, orjson requires it, stdlib keeps Flask's default provider.
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto').lower()
+
+# Per-request SQL timing (utils/sql_timing.py): Server-Timing headers and a
+# log of requests slower than SLOW_REQUEST_MS with their SQL. Off by default.
+SQL_TIMING = os.getenv('SQL_TIMING', 'false').lower() in ('1', 'true', 'yes')
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 500))
+# Statements kept per request for the slow-request log.
+SLOW_REQUEST_MAX_STATEMENTS = int(os.getenv('SLOW_REQUEST_MAX_STATEMENTS', 50))
+
+# Prometheus-style /metrics (utils/metrics.py). Under gunicorn, point
+# METRICS_MULTIPROC_DIR at a directory shared by the node's workers so any
+# worker reports the sum; workers write their samples there every
+# METRICS_FLUSH_SECONDS.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_MULTIPROC_DIR = os.getenv('METRICS_MULTIPROC_DIR') or None
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', 5))
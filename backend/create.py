@@ -1,19 +1,6 @@
-from sqlalchemy import create_engine
-from config.config import SQLALCHEMY_DATABASE_URI
-from models.base import Base
+# Kept for existing setup docs: schema changes now go through migrate.py,
+# which creates the tables on a fresh database and upgrades existing ones.
+from migrate import upgrade
 
-# Import all your models so Base knows about them
-import models.employee
-import models.department
-import models.timesheet
-import models.designation
-import models.project
-import models.dailylogs
-import models.dailylogchanges
-
-engine = create_engine(SQLALCHEMY_DATABASE_URI)
-
-# This will create all tables in the database
-Base.metadata.create_all(engine)
-
-print("All tables created successfully!")
\ No newline at end of file
+applied = upgrade()
+print(f"Schema up to date ({len(applied)} migration(s) applied).")
@@ -0,0 +1,62 @@
+"""gunicorn settings for the TMS API; every value can be overridden from the environment.
+
+    gunicorn -c gunicorn.conf.py
+
+Sizing: each worker is a process with its own connection pool, so the
+database sees up to WEB_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+connections. Threads let a worker overlap requests waiting on the database.
+
+Deploying new code: with preload_app (the default) the app is imported
+once in the master, so ``kill -HUP <master pid>`` re-forks workers from the
+old code. Use ``kill -USR2 <master pid>`` to start a new master with the new
+code, then ``kill -TERM`` the old master once it is serving (old workers
+finish their requests, up to graceful_timeout), or restart the service.
+With WEB_PRELOAD=false each worker imports the app itself and HUP picks up
+new code, at the cost of slower worker starts.
+"""
+import multiprocessing
+import os
+import shutil
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+wsgi_app = 'wsgi:app'
+bind = os.getenv('WEB_BIND', '0.0.0.0:8000')
+
+workers = _env_int('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = _env_int('WEB_THREADS', 4)
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Import models, services and the app once in the master; workers share
+# those pages copy-on-write and start faster.
+preload_app = os.getenv('WEB_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+keepalive = _env_int('WEB_KEEPALIVE', 5)
+timeout = _env_int('WEB_TIMEOUT', 60)
+graceful_timeout = _env_int('WEB_GRACEFUL_TIMEOUT', 30)
+# Recycle workers now and then so slow leaks cannot build up; jitter keeps
+# them from restarting together.
+max_requests = _env_int('WEB_MAX_REQUESTS', 10000)
+max_requests_jitter = _env_int('WEB_MAX_REQUESTS_JITTER', 1000)
+
+accesslog = os.getenv('WEB_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('WEB_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be summed into /metrics.
+    multiproc_dir = os.getenv('METRICS_MULTIPROC_DIR')
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def post_fork(server, worker):
+    # Never reuse a pooled connection inherited from the master.
+    from utils.session_manager import engine, replica_engines
+    for bind in (engine, *replica_engines):
+        bind.dispose(close=False)
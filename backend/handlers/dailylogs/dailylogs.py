@@ -1,174 +1,171 @@
 from flask import request, jsonify
-from datetime import datetime
+from datetime import datetime, timedelta
 from models.dailylogs import DailyLog
 from models.dailylogschanges import DailyLogChange
-from utils.session_manager import get_session
-from utils.helpers import calculate_total_hours, format_timedelta_to_time, get_day_of_week, safe_close
+from utils.request_session import db_session, read_only
+from services.weekly_hours import log_minutes
+from utils.helpers import format_timedelta_to_time, get_day_of_week
+from utils.pagination import PaginationError, page_request_from_args, paginate_query, page_response
+
+def _worked(*spans):
+    """Total of the (in, out) spans that have both times, as a timedelta."""
+    return timedelta(minutes=sum(log_minutes(start, end) for start, end in spans if start and end))
 
 # Create daily log - POST /dailylogs
 def create_daily_log():
-    session = get_session()
-    try:
-        data = request.get_json()
-        required_fields = ['timesheet_id', 'log_date']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({'error': f'{field} is required'}), 400
-
-        try:
-            log_date = datetime.strptime(data['log_date'], "%Y-%m-%d").date()
-        except ValueError:
-            return jsonify({'error': 'Invalid log_date format. Use YYYY-MM-DD.'}), 400
+    session = db_session()
+    data = request.get_json()
+    required_fields = ['timesheet_id', 'log_date']
+    for field in required_fields:
+        if not data.get(field):
+            return jsonify({'error': f'{field} is required'}), 400
 
-        # Check for existing log for this timesheet and date
-        existing_log = session.query(DailyLog).filter_by(
-            timesheet_id=data['timesheet_id'],
-            log_date=log_date
-        ).first()
-        if existing_log:
-            return jsonify({'error': 'Daily log already exists for this date. Please update instead.'}), 409
-
-        day_of_week = get_day_of_week(log_date)
-
-        morning_in = data.get('morning_in')
-        morning_out = data.get('morning_out')
-        afternoon_in = data.get('afternoon_in')
-        afternoon_out = data.get('afternoon_out')
-
-        fmt = "%H:%M"
-        try:
-            morning_in = datetime.strptime(morning_in, fmt).time() if morning_in else None
-            morning_out = datetime.strptime(morning_out, fmt).time() if morning_out else None
-            afternoon_in = datetime.strptime(afternoon_in, fmt).time() if afternoon_in else None
-            afternoon_out = datetime.strptime(afternoon_out, fmt).time() if afternoon_out else None
-        except ValueError:
-            return jsonify({'error': 'Invalid time format. Use HH:MM.'}), 400
-
-        total_td = calculate_total_hours(morning_in, morning_out, afternoon_in, afternoon_out)
-        total_time_str = format_timedelta_to_time(total_td)
-
-        log = DailyLog(
-            timesheet_id=data['timesheet_id'],
-            log_date=log_date,
-            day_of_week=day_of_week,
-            morning_in=morning_in,
-            morning_out=morning_out,
-            afternoon_in=afternoon_in,
-            afternoon_out=afternoon_out,
-            total_hours=total_time_str,
-            description=data.get('description')
-        )
-        session.add(log)
-        session.commit()
-        return jsonify(log.as_dict()), 201
-    except Exception as e:
-       session.rollback()
-       print("Error in create_daily_log:", e)  # <--- Add this line
-       return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    try:
+        log_date = datetime.strptime(data['log_date'], "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({'error': 'Invalid log_date format. Use YYYY-MM-DD.'}), 400
+
+    # Check for existing log for this timesheet and date
+    existing_log = session.query(DailyLog).filter_by(
+        timesheet_id=data['timesheet_id'],
+        log_date=log_date
+    ).first()
+    if existing_log:
+        return jsonify({'error': 'Daily log already exists for this date. Please update instead.'}), 409
+
+    day_of_week = get_day_of_week(log_date)
+
+    morning_in = data.get('morning_in')
+    morning_out = data.get('morning_out')
+    afternoon_in = data.get('afternoon_in')
+    afternoon_out = data.get('afternoon_out')
+
+    fmt = "%H:%M"
+    try:
+        morning_in = datetime.strptime(morning_in, fmt).time() if morning_in else None
+        morning_out = datetime.strptime(morning_out, fmt).time() if morning_out else None
+        afternoon_in = datetime.strptime(afternoon_in, fmt).time() if afternoon_in else None
+        afternoon_out = datetime.strptime(afternoon_out, fmt).time() if afternoon_out else None
+    except ValueError:
+        return jsonify({'error': 'Invalid time format. Use HH:MM.'}), 400
+
+    total_td = _worked((morning_in, morning_out), (afternoon_in, afternoon_out))
+    total_time_str = format_timedelta_to_time(total_td)
+
+    log = DailyLog(
+        timesheet_id=data['timesheet_id'],
+        log_date=log_date,
+        day_of_week=day_of_week,
+        morning_in=morning_in,
+        morning_out=morning_out,
+        afternoon_in=afternoon_in,
+        afternoon_out=afternoon_out,
+        total_hours=total_time_str,
+        description=data.get('description')
+    )
+    session.add(log)
+    session.flush()
+    return jsonify(log.as_dict()), 201
 
 # Update daily log - PUT /dailylogs/<id>
 def update_daily_log(log_id):
-    session = get_session()
-    try:
-        log = session.query(DailyLog).get(log_id)
-        if not log:
-            return jsonify({'error': 'Daily log not found'}), 404
-
-        data = request.get_json()
-        old_description = log.description
+    session = db_session()
+    log = session.query(DailyLog).get(log_id)
+    if not log:
+        return jsonify({'error': 'Daily log not found'}), 404
 
-        if 'log_date' in data:
-            try:
-                log.log_date = datetime.strptime(data['log_date'], "%Y-%m-%d").date()
-                log.day_of_week = get_day_of_week(log.log_date)
-            except ValueError:
-                return jsonify({'error': 'Invalid log_date format. Use YYYY-MM-DD.'}), 400
+    data = request.get_json()
+    old_description = log.description
 
-        fmt = "%H:%M"
+    if 'log_date' in data:
         try:
-            if 'morning_in' in data:
-                log.morning_in = datetime.strptime(data['morning_in'], fmt).time() if data['morning_in'] else None
-            if 'morning_out' in data:
-                log.morning_out = datetime.strptime(data['morning_out'], fmt).time() if data['morning_out'] else None
-            if 'afternoon_in' in data:
-                log.afternoon_in = datetime.strptime(data['afternoon_in'], fmt).time() if data['afternoon_in'] else None
-            if 'afternoon_out' in data:
-                log.afternoon_out = datetime.strptime(data['afternoon_out'], fmt).time() if data['afternoon_out'] else None
+            log.log_date = datetime.strptime(data['log_date'], "%Y-%m-%d").date()
+            log.day_of_week = get_day_of_week(log.log_date)
         except ValueError:
-            return jsonify({'error': 'Invalid time format. Use HH:MM.'}), 400
-
-        # Recalculate total hours
-        total_td = calculate_total_hours(log.morning_in, log.morning_out, log.afternoon_in, log.afternoon_out)
-        log.total_hours = format_timedelta_to_time(total_td)
-
-        if 'description' in data:
-            if data['description'] != old_description:
-                # Save change in DailyLogChange
-                change = DailyLogChange(
-                    daily_log_id=log.id,
-                    new_description=data['description']
-                )
-                session.add(change)
-            log.description = data['description']
-
-        session.commit()
-        return jsonify(log.as_dict()), 200
-    except Exception as e:
-        session.rollback()
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+            return jsonify({'error': 'Invalid log_date format. Use YYYY-MM-DD.'}), 400
+
+    fmt = "%H:%M"
+    try:
+        if 'morning_in' in data:
+            log.morning_in = datetime.strptime(data['morning_in'], fmt).time() if data['morning_in'] else None
+        if 'morning_out' in data:
+            log.morning_out = datetime.strptime(data['morning_out'], fmt).time() if data['morning_out'] else None
+        if 'afternoon_in' in data:
+            log.afternoon_in = datetime.strptime(data['afternoon_in'], fmt).time() if data['afternoon_in'] else None
+        if 'afternoon_out' in data:
+            log.afternoon_out = datetime.strptime(data['afternoon_out'], fmt).time() if data['afternoon_out'] else None
+    except ValueError:
+        return jsonify({'error': 'Invalid time format. Use HH:MM.'}), 400
+
+    # Recalculate total hours
+    total_td = _worked((log.morning_in, log.morning_out), (log.afternoon_in, log.afternoon_out))
+    log.total_hours = format_timedelta_to_time(total_td)
+
+    if 'description' in data:
+        if data['description'] != old_description:
+            # Save change in DailyLogChange
+            change = DailyLogChange(
+                daily_log_id=log.id,
+                new_description=data['description']
+            )
+            session.add(change)
+        log.description = data['description']
+
+    session.flush()
+    return jsonify(log.as_dict()), 200
 
 # Get all daily logs - GET /dailylogs
+@read_only
 def get_daily_logs():
-    session = get_session()
+    session = db_session()
     try:
-        logs = session.query(DailyLog).all()
-        return jsonify([log.as_dict() for log in logs]), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+        page = page_request_from_args(request.args)
+        query = session.query(DailyLog)
+        timesheet_id = request.args.get('timesheet_id', type=int)
+        if timesheet_id:
+            query = query.filter(DailyLog.timesheet_id == timesheet_id)
+        project_id = request.args.get('project_id', type=int)
+        if project_id:
+            query = query.filter(DailyLog.project_id == project_id)
+        try:
+            date_from = request.args.get('date_from')
+            date_to = request.args.get('date_to')
+            if date_from:
+                query = query.filter(DailyLog.log_date >= datetime.strptime(date_from, "%Y-%m-%d").date())
+            if date_to:
+                query = query.filter(DailyLog.log_date <= datetime.strptime(date_to, "%Y-%m-%d").date())
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD.'}), 400
+        if page is None:
+            return jsonify([log.as_dict() for log in query.all()]), 200
+        logs, next_cursor, total = paginate_query(query, [DailyLog.log_date, DailyLog.id], page)
+        return jsonify(page_response([log.as_dict() for log in logs], next_cursor, total)), 200
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
 
 # Get daily log by ID - GET /dailylogs/<id>
+@read_only
 def get_daily_log(log_id):
-    session = get_session()
-    try:
-        log = session.query(DailyLog).get(log_id)
-        if not log:
-            return jsonify({'error': 'Daily log not found'}), 404
-        return jsonify(log.as_dict()), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    session = db_session()
+    log = session.query(DailyLog).get(log_id)
+    if not log:
+        return jsonify({'error': 'Daily log not found'}), 404
+    return jsonify(log.as_dict()), 200
 
 
 # Delete daily log - DELETE /dailylogs/<id>
 def delete_daily_log(log_id):
-    session = get_session()
-    try:
-        log = session.query(DailyLog).get(log_id)
-        if not log:
-            return jsonify({'error': 'Daily log not found'}), 404
-        session.delete(log)
-        session.commit()
-        return jsonify({'message': 'Daily log deleted successfully.'}), 200
-    except Exception as e:
-        session.rollback()
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    session = db_session()
+    log = session.query(DailyLog).get(log_id)
+    if not log:
+        return jsonify({'error': 'Daily log not found'}), 404
+    session.delete(log)
+    session.flush()
+    return jsonify({'message': 'Daily log deleted successfully.'}), 200
 
 # Get daily logs by timesheet - GET /timesheets/<timesheet_id>/dailylogs
+@read_only
 def get_daily_logs_by_timesheet(timesheet_id):
-    session = get_session()
-    try:
-        logs = session.query(DailyLog).filter_by(timesheet_id=timesheet_id).all()
-        return jsonify([log.as_dict() for log in logs]), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
\ No newline at end of file
+    session = db_session()
+    logs = session.query(DailyLog).filter_by(timesheet_id=timesheet_id).all()
+    return jsonify([log.as_dict() for log in logs]), 200
\ No newline at end of file
@@ -1,334 +1,282 @@
 from flask import request, jsonify
-from models.employee import Employee
+from models.employee import Employee, normalize_email
 from models.timesheet import Timesheet
 from models.dailylogs import DailyLog
-from utils.session_manager import get_session
-from utils.helpers import is_valid_email, safe_close
+from utils.request_session import db_session, read_only
+from utils.cache import invalidate_on_commit
+from utils.helpers import is_valid_email
+from utils.loader_profiles import with_profile
+from services.org_cache import get_org_graph
+from services.hierarchy import get_subtree, nest_subtree
+from services.employee_closure import HierarchyCycleError
+from services.reassignment import reassign_managers
 from datetime import datetime, timedelta
 
+
+def _graph_summary(graph, employee_id):
+    emp = graph.employees[employee_id]
+    return {
+        'id': emp['id'],
+        'employee_name': emp['employee_name'],
+        'email': emp['email'],
+        'reports_to': emp['reports_to_id']
+    }
+
 # Create employee
 def create_employee():
-    session = get_session()
-    try:
-        data = request.get_json()
-        name = data.get('employee_name')
-        email = data.get('email')
-        reports_to = data.get('reports_to')
-        manager_name = data.get('manager_name')
+    session = db_session()
+    data = request.get_json()
+    name = data.get('employee_name')
+    email = data.get('email')
+    reports_to = data.get('reports_to')
+    manager_name = data.get('manager_name')
 
-        if not name or not email:
-            return jsonify({'error': 'employee_name and email are required.'}), 400
-        if not is_valid_email(email):
-            return jsonify({'error': 'Invalid email format'}), 422
+    if not name or not email:
+        return jsonify({'error': 'employee_name and email are required.'}), 400
+    if not is_valid_email(email):
+        return jsonify({'error': 'Invalid email format'}), 422
 
-        manager_id = None
-        if manager_name:
-            manager = session.query(Employee).filter_by(employee_name=manager_name).first()
-            if not manager:
-                return jsonify({'error': 'Manager not found.'}), 404
-            manager_id = manager.id
-        elif reports_to:
-            if str(reports_to).lower() == 'self':
-                return jsonify({'error': 'Employee cannot report to themselves.'}), 400
-            manager = session.query(Employee).get(reports_to)
-            if not manager:
-                return jsonify({'error': 'Manager not found.'}), 404
-            manager_id = manager.id
+    manager_id = None
+    if manager_name:
+        manager = session.query(Employee).filter_by(employee_name=manager_name).first()
+        if not manager:
+            return jsonify({'error': 'Manager not found.'}), 404
+        manager_id = manager.id
+    elif reports_to:
+        if str(reports_to).lower() == 'self':
+            return jsonify({'error': 'Employee cannot report to themselves.'}), 400
+        manager = session.query(Employee).get(reports_to)
+        if not manager:
+            return jsonify({'error': 'Manager not found.'}), 404
+        manager_id = manager.id
 
-        new_employee = Employee(employee_name=name, email=email, reports_to=manager_id)
-        session.add(new_employee)
-        session.commit()
+    new_employee = Employee(employee_name=name, email=email, reports_to=manager_id)
+    session.add(new_employee)
+    session.flush()
+    invalidate_on_commit(session, 'employees')
 
-        return jsonify({
-            'id': new_employee.id,
-            'employee_name': new_employee.employee_name,
-            'email': new_employee.email,
-            'reports_to': new_employee.reports_to
-        }), 201
-    except Exception as e:
-        session.rollback()
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    return jsonify({
+        'id': new_employee.id,
+        'employee_name': new_employee.employee_name,
+        'email': new_employee.email,
+        'reports_to': new_employee.reports_to
+    }), 201
 
 # Get all employees
+@read_only
 def get_employees():
-    session = get_session()
-    try:
-        employees = session.query(Employee).all()
-        return jsonify([{
-            'id': emp.id,
-            'employee_name': emp.employee_name,
-            'email': emp.email,
-            'reports_to': emp.reports_to
-        } for emp in employees]), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    session = db_session()
+    employees = session.query(Employee).all()
+    return jsonify([{
+        'id': emp.id,
+        'employee_name': emp.employee_name,
+        'email': emp.email,
+        'reports_to': emp.reports_to
+    } for emp in employees]), 200
 
 # Get employee by email
+@read_only
 def get_employee_by_email():
-    session = get_session()
-    try:
-        email = request.args.get('email')
-        if not email:
-            return jsonify({'error': 'email query param required.'}), 400
-        emp = session.query(Employee).filter_by(email=email).first()
-        if not emp:
-            return jsonify({'error': 'Employee not found.'}), 404
-        return jsonify({
-            'id': emp.id,
-            'employee_name': emp.employee_name,
-            'email': emp.email,
-            'reports_to': emp.reports_to
-        }), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    session = db_session()
+    email = request.args.get('email')
+    if not email:
+        return jsonify({'error': 'email query param required.'}), 400
+    emp = session.query(Employee).filter_by(email_normalized=normalize_email(email)).first()
+    if not emp:
+        return jsonify({'error': 'Employee not found.'}), 404
+    return jsonify({
+        'id': emp.id,
+        'employee_name': emp.employee_name,
+        'email': emp.email,
+        'reports_to': emp.reports_to
+    }), 200
 
 # Update employee by email
 def update_employee_by_email():
-    session = get_session()
-    try:
-        email = request.args.get('email')
-        if not email:
-            return jsonify({'error': 'email query param required.'}), 400
-        emp = session.query(Employee).filter_by(email=email).first()
-        if not emp:
-            return jsonify({'error': 'Employee not found.'}), 404
+    session = db_session()
+    email = request.args.get('email')
+    if not email:
+        return jsonify({'error': 'email query param required.'}), 400
+    emp = session.query(Employee).filter_by(email_normalized=normalize_email(email)).first()
+    if not emp:
+        return jsonify({'error': 'Employee not found.'}), 404
 
-        data = request.get_json()
-        new_email = data.get('email', emp.email)
-        if new_email and not is_valid_email(new_email):
-            return jsonify({'error': 'Invalid email format'}), 422
+    data = request.get_json()
+    new_email = data.get('email', emp.email)
+    if new_email and not is_valid_email(new_email):
+        return jsonify({'error': 'Invalid email format'}), 422
 
-        emp.employee_name = data.get('employee_name', emp.employee_name)
-        emp.email = new_email
+    emp.employee_name = data.get('employee_name', emp.employee_name)
+    emp.email = new_email
 
-        reports_to_email = data.get('reports_to_email')
-        manager_name = data.get('manager_name')
+    reports_to_email = data.get('reports_to_email')
+    manager_name = data.get('manager_name')
 
-        if reports_to_email:
-            manager = session.query(Employee).filter_by(email=reports_to_email).first()
-            if not manager or manager.id == emp.id:
-                return jsonify({'error': 'Invalid manager'}), 400
-            emp.reports_to = manager.id
-        elif manager_name:
-            manager = session.query(Employee).filter_by(employee_name=manager_name).first()
-            if not manager or manager.id == emp.id:
-                return jsonify({'error': 'Invalid manager'}), 400
-            emp.reports_to = manager.id
+    if reports_to_email:
+        manager = session.query(Employee).filter_by(email_normalized=normalize_email(reports_to_email)).first()
+        if not manager or manager.id == emp.id:
+            return jsonify({'error': 'Invalid manager'}), 400
+        emp.reports_to_id = manager.id
+    elif manager_name:
+        manager = session.query(Employee).filter_by(employee_name=manager_name).first()
+        if not manager or manager.id == emp.id:
+            return jsonify({'error': 'Invalid manager'}), 400
+        emp.reports_to_id = manager.id
 
-        session.commit()
-        return jsonify({
-            'id': emp.id,
-            'employee_name': emp.employee_name,
-            'email': emp.email,
-            'reports_to': emp.reports_to
-        }), 200
-    except Exception as e:
-        session.rollback()
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    try:
+        session.flush()
+    except HierarchyCycleError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'id': emp.id,
+        'employee_name': emp.employee_name,
+        'email': emp.email,
+        'reports_to': emp.reports_to_id
+    }), 200
 
 # Delete employee by email
 def delete_employee_by_email():
-    session = get_session()
-    try:
-        email = request.args.get('email')
-        if not email:
-            return jsonify({'error': 'email query param required.'}), 400
-        emp = session.query(Employee).filter_by(email=email).first()
-        if not emp:
-            return jsonify({'error': 'Employee not found.'}), 404
+    session = db_session()
+    email = request.args.get('email')
+    if not email:
+        return jsonify({'error': 'email query param required.'}), 400
+    emp = session.query(Employee).filter_by(email_normalized=normalize_email(email)).first()
+    if not emp:
+        return jsonify({'error': 'Employee not found.'}), 404
 
-        # Set subordinates' manager to None
-        subordinates = session.query(Employee).filter(Employee.reports_to == emp.id).all()
-        for sub in subordinates:
-            sub.reports_to = None
+    # Set subordinates' manager to None in one statement
+    subordinate_ids = [sub_id for (sub_id,) in session.query(Employee.id).filter(Employee.reports_to_id == emp.id)]
+    if subordinate_ids:
+        reassign_managers(session, [{'employee_id': sub_id, 'manager_id': None} for sub_id in subordinate_ids])
 
-        session.delete(emp)
-        session.commit()
-        return jsonify({'message': 'Employee deleted successfully. Subordinates updated.'}), 200
-    except Exception as e:
-        session.rollback()
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    session.delete(emp)
+    session.flush()
+    return jsonify({'message': 'Employee deleted successfully. Subordinates updated.'}), 200
 
 # Get subordinates
 def get_subordinates(manager_id):
-    session = get_session()
     try:
-        manager = session.query(Employee).get(manager_id)
+        graph = get_org_graph()
+        manager = graph.employees.get(manager_id)
         if not manager:
             return jsonify({'error': 'Manager not found.'}), 404
 
-        subordinates = manager.subordinates
         return jsonify({
-            'manager_id': manager.id,
-            'manager_name': manager.employee_name,
-            'subordinates': [{
-                'id': sub.id,
-                'employee_name': sub.employee_name,
-                'email': sub.email,
-                'reports_to': sub.reports_to
-            } for sub in subordinates]
+            'manager_id': manager['id'],
+            'manager_name': manager['employee_name'],
+            'subordinates': [_graph_summary(graph, sub_id) for sub_id in graph.subordinates.get(manager_id, [])]
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
 
 # Get employees without manager
+@read_only
 def get_employees_without_manager():
-    session = get_session()
-    try:
-        employees = session.query(Employee).filter(Employee.reports_to == None).all()
-        return jsonify([{
-            'id': emp.id,
-            'employee_name': emp.employee_name,
-            'email': emp.email,
-            'reports_to': emp.reports_to
-        } for emp in employees]), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
+    session = db_session()
+    employees = session.query(Employee).filter(Employee.reports_to == None).all()
+    return jsonify([{
+        'id': emp.id,
+        'employee_name': emp.employee_name,
+        'email': emp.email,
+        'reports_to': emp.reports_to
+    } for emp in employees]), 200
 
 # Get manager hierarchy
 def get_manager_hierarchy_by_email():
-    session = get_session()
     try:
         email = request.args.get('email')
         if not email:
             return jsonify({'error': 'email query param required.'}), 400
-        emp = session.query(Employee).filter_by(email=email).first()
+        graph = get_org_graph()
+        emp = graph.find_by_email(email)
         if not emp:
             return jsonify({'error': 'Employee not found.'}), 404
 
-        hierarchy = []
-        current = emp
-        while current.reports_to:
-            manager = session.query(Employee).get(current.reports_to)
-            if not manager:
-                break
-            hierarchy.append({
-                'id': manager.id,
-                'employee_name': manager.employee_name,
-                'email': manager.email,
-                'reports_to': manager.reports_to
-            })
-            current = manager
+        hierarchy = [_graph_summary(graph, manager_id) for manager_id in graph.manager_chain(emp['id'])]
 
         return jsonify({
-            'employee_id': emp.id,
-            'employee_name': emp.employee_name,
-            'manager_hierarchy': hierarchy
+            'employee_id': emp['id'],
+            'employee_name': emp['employee_name'],
+            'manager_hierarchy': hierarchy,
+            'org_version': graph.version
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
 
 # Get employee tree
+@read_only
 def get_employee_tree(employee_id):
-    session = get_session()
     try:
-        root = session.query(Employee).get(employee_id)
-        if not root:
+        rows = get_subtree(db_session(), employee_id)
+        if not rows:
             return jsonify({'error': 'Employee not found.'}), 404
 
-        def build_tree(emp):
-            return {
-                'id': emp.id,
-                'employee_name': emp.employee_name,
-                'email': emp.email,
-                'reports_to': emp.reports_to,
-                'subordinates': [build_tree(sub) for sub in emp.subordinates]
-            }
-
-        tree = build_tree(root)
+        tree = nest_subtree(rows, lambda row: {
+            'id': row['id'],
+            'employee_name': row['employee_name'],
+            'email': row['email'],
+            'reports_to': row['reports_to_id']
+        })
         return jsonify(tree), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
 
 # Get employee dashboard
+@read_only
 def get_employee_dashboard():
-    session = get_session()
-    try:
-        email = request.args.get('email')
-        week_starting = request.args.get('week_starting')  # e.g., "5/16/2022"
-        if not email:
-            return jsonify({'error': 'email query param required.'}), 400
+    session = db_session()
+    email = request.args.get('email')
+    week_starting = request.args.get('week_starting')  # e.g., "5/16/2022"
+    if not email:
+        return jsonify({'error': 'email query param required.'}), 400
 
-        emp = session.query(Employee).filter_by(email=email).first()
-        if not emp:
-            return jsonify({'error': 'Employee not found.'}), 404
+    emp = session.query(Employee).filter_by(email_normalized=normalize_email(email)).first()
+    if not emp:
+        return jsonify({'error': 'Employee not found.'}), 404
 
-        # Manager hierarchy
-        hierarchy = []
-        current = emp
-        while current.reports_to:
-            manager = session.query(Employee).get(current.reports_to)
-            if not manager:
-                break
-            hierarchy.append({
-                'id': manager.id,
-                'employee_name': manager.employee_name,
-                'email': manager.email,
-                'reports_to': manager.reports_to
-            })
-            current = manager
+    # Manager hierarchy
+    graph = get_org_graph()
+    hierarchy = [_graph_summary(graph, manager_id) for manager_id in graph.manager_chain(emp.id)]
 
-        # Parse week_starting date
-        timesheets_data = []
-        daily_logs_data = []
-        if week_starting:
-            try:
-                week_start = datetime.strptime(week_starting, '%m/%d/%Y')
-                week_end = week_start + timedelta(days=6)
-                timesheets = session.query(Timesheet).filter(
-                    Timesheet.employee_id == emp.id,
-                    Timesheet.week_starting >= week_start,
-                    Timesheet.week_starting <= week_end
-                ).all()
-                timesheet_ids = [ts.id for ts in timesheets]
-                timesheets_data = [ts.as_dict() for ts in timesheets]
-                if timesheet_ids:
-                    logs = session.query(DailyLog).filter(
-                        DailyLog.timesheet_id.in_(timesheet_ids),
-                        DailyLog.log_date >= week_start,
-                        DailyLog.log_date <= week_end
-                    ).all()
-                    daily_logs_data = [log.as_dict() for log in logs] 
-            except ValueError:
-                return jsonify({'error': 'Invalid week_starting format. Use MM/DD/YYYY.'}), 400
-        else:
-            timesheets = session.query(Timesheet).filter_by(employee_id=emp.id).all()
+    # Parse week_starting date
+    timesheets_data = []
+    daily_logs_data = []
+    if week_starting:
+        try:
+            week_start = datetime.strptime(week_starting, '%m/%d/%Y')
+            week_end = week_start + timedelta(days=6)
+            timesheets = with_profile(session.query(Timesheet), 'timesheet').filter(
+                Timesheet.employee_id == emp.id,
+                Timesheet.week_starting >= week_start,
+                Timesheet.week_starting <= week_end
+            ).all()
             timesheet_ids = [ts.id for ts in timesheets]
             timesheets_data = [ts.as_dict() for ts in timesheets]
             if timesheet_ids:
-                logs = session.query(DailyLog).filter(DailyLog.timesheet_id.in_(timesheet_ids)).all()
-                daily_logs_data = [log.as_dict() for log in logs]
+                logs = session.query(DailyLog).filter(
+                    DailyLog.timesheet_id.in_(timesheet_ids),
+                    DailyLog.log_date >= week_start,
+                    DailyLog.log_date <= week_end
+                ).all()
+                daily_logs_data = [log.as_dict() for log in logs] 
+        except ValueError:
+            return jsonify({'error': 'Invalid week_starting format. Use MM/DD/YYYY.'}), 400
+    else:
+        timesheets = with_profile(session.query(Timesheet), 'timesheet').filter_by(employee_id=emp.id).all()
+        timesheet_ids = [ts.id for ts in timesheets]
+        timesheets_data = [ts.as_dict() for ts in timesheets]
+        if timesheet_ids:
+            logs = session.query(DailyLog).filter(DailyLog.timesheet_id.in_(timesheet_ids)).all()
+            daily_logs_data = [log.as_dict() for log in logs]
 
-        return jsonify({
-            'employee': {
-                'id': emp.id,
-                'employee_name': emp.employee_name,
-                'email': emp.email,
-                'reports_to': emp.reports_to
-            },
-            'manager_hierarchy': hierarchy,
-            'timesheets': timesheets_data,
-            'daily_logs': daily_logs_data
-        }), 200
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
-    finally:
-        safe_close(session)
\ No newline at end of file
+    return jsonify({
+        'employee': {
+            'id': emp.id,
+            'employee_name': emp.employee_name,
+            'email': emp.email,
+            'reports_to': emp.reports_to
+        },
+        'manager_hierarchy': hierarchy,
+        'timesheets': timesheets_data,
+        'daily_logs': daily_logs_data
+    }), 200
\ No newline at end of file
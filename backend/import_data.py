@@ -0,0 +1,321 @@
+"""Bulk import legacy data from CSV or NDJSON files.
+
+Usage:
+    python import_data.py path/to/export/                  # ids from the files are kept
+    python import_data.py path/to/export/ --id-mode allocate
+    python import_data.py path/to/export/ --chunk-size 10000 --restart
+
+The directory holds one file per table, named after it with a .csv,
+.ndjson or .jsonl extension. Files may be missing:
+
+    departments, designations, projects, employees, timesheets,
+    daily_logs, daily_log_changes
+
+Columns are the model column names. Every row needs an ``id``, and
+references use the ids of the files.
+
+--id-mode keep        insert the file ids as they are (the database must not
+                      already use them)
+--id-mode allocate    give each imported table a fresh block of ids after the
+                      current maximum and rewrite references to imported rows;
+                      references to tables not in the import are kept as is
+
+Rows go in chunked executemany batches, one transaction per chunk. Progress
+is recorded in ``import_checkpoints`` in the same transaction, so a crashed
+or interrupted import resumes after the last committed chunk. Afterwards the
+employee closure and weekly hours rollup are rebuilt, and the table versions
+and those of the timesheets that received logs are bumped.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import date, datetime, time as dtime
+from sqlalchemy import Column, Integer, MetaData, String, Table, bindparam, func, insert, select, text, update
+from sqlalchemy.exc import DBAPIError
+from utils.session_manager import engine
+from models.department import Department
+from models.designation import Designation
+from models.project import Project
+from models.employee import Employee, normalize_email
+from models.timesheet import Timesheet
+from models.dailylogs import DailyLog
+from models.dailylogchanges import DailyLogChange
+from services.org_cache import ORG_VERSION_KEY
+from services.table_versions import VERSIONED_TABLES, bump_table_versions, timesheet_version_key
+from services.weekly_hours import rebuild_weekly_hours
+from services.employee_closure import rebuild_employee_closure
+
+DEFAULT_CHUNK_SIZE = 5000
+EXTENSIONS = ('.csv', '.ndjson', '.jsonl')
+
+# Load order, model and {column: referenced table}.
+ENTITIES = [
+    ('departments', Department, {}),
+    ('designations', Designation, {'department_id': 'departments'}),
+    ('projects', Project, {}),
+    ('employees', Employee, {'department_id': 'departments', 'designation_id': 'designations'}),
+    ('timesheets', Timesheet, {'employee_id': 'employees'}),
+    ('daily_logs', DailyLog, {'timesheet_id': 'timesheets', 'project_id': 'projects'}),
+    ('daily_log_changes', DailyLogChange, {'daily_log_id': 'daily_logs', 'project_id': 'projects'}),
+]
+# Managers can appear after their reports in the file, so reports_to_id is
+# set in a second pass once every employee row exists.
+MANAGER_STAGE = 'employees.reports_to_id'
+
+_metadata = MetaData()
+import_checkpoints = Table(
+    'import_checkpoints', _metadata,
+    Column('source', String(255), primary_key=True),
+    Column('stage', String(64), primary_key=True),
+    Column('rows_done', Integer, nullable=False),
+    Column('id_base', Integer, nullable=False),
+)
+
+
+class RowError(Exception):
+    """A row that cannot be imported; the message names the file and line."""
+
+
+def find_file(source_dir, name):
+    for ext in EXTENSIONS:
+        path = os.path.join(source_dir, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def iter_records(path):
+    """Yield ``(line_number, dict)`` from a CSV or NDJSON file."""
+    with open(path, newline='', encoding='utf-8') as fh:
+        if path.endswith('.csv'):
+            for line_no, record in enumerate(csv.DictReader(fh), start=2):
+                yield line_no, record
+        else:
+            for line_no, line in enumerate(fh, start=1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+
+
+def _parse_time(value):
+    return dtime.fromisoformat(value if value.count(':') > 1 else value + ':00')
+
+
+def _converters(model):
+    converters = {}
+    for column in model.__table__.columns:
+        python_type = column.type.python_type
+        if python_type is int:
+            converters[column.key] = int
+        elif python_type is date:
+            converters[column.key] = date.fromisoformat
+        elif python_type is datetime:
+            converters[column.key] = datetime.fromisoformat
+        elif python_type is dtime:
+            converters[column.key] = _parse_time
+        else:
+            converters[column.key] = str
+    return converters
+
+
+class Importer:
+    def __init__(self, bind, source_dir, id_mode='keep', chunk_size=DEFAULT_CHUNK_SIZE, log=print):
+        self.engine = bind
+        self.source_dir = source_dir
+        self.source = os.path.abspath(source_dir)
+        self.id_mode = id_mode
+        self.chunk_size = chunk_size
+        self.log = log
+        self.id_maps = {}  # table -> {file id: database id}, allocate mode only
+        self.imported = []
+        # Timesheets with daily_logs rows in this run; rows a resume skips
+        # are still converted, so they count too.
+        self.timesheet_ids = set()
+
+    # ---------------- checkpoints ----------------
+
+    def checkpoint(self, conn, stage):
+        row = conn.execute(
+            select(import_checkpoints.c.rows_done, import_checkpoints.c.id_base)
+            .where(import_checkpoints.c.source == self.source, import_checkpoints.c.stage == stage)
+        ).first()
+        return (row.rows_done, row.id_base) if row else (None, None)
+
+    def save_checkpoint(self, conn, stage, rows_done, id_base):
+        updated = conn.execute(
+            update(import_checkpoints)
+            .where(import_checkpoints.c.source == self.source, import_checkpoints.c.stage == stage)
+            .values(rows_done=rows_done)
+        )
+        if updated.rowcount == 0:
+            conn.execute(insert(import_checkpoints).values(
+                source=self.source, stage=stage, rows_done=rows_done, id_base=id_base,
+            ))
+
+    def restart(self):
+        with self.engine.begin() as conn:
+            _metadata.create_all(conn, checkfirst=True)
+            conn.execute(import_checkpoints.delete().where(import_checkpoints.c.source == self.source))
+
+    # ---------------- rows ----------------
+
+    def _id_base(self, conn, name, model):
+        """Allocate mode: the id just below this table's block, fixed on first run."""
+        _, id_base = self.checkpoint(conn, name)
+        if id_base is None:
+            id_base = conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar() if self.id_mode == 'allocate' else 0
+        return id_base
+
+    def _build_id_map(self, path, id_base):
+        id_map = {}
+        for index, (line_no, record) in enumerate(iter_records(path), start=1):
+            id_map[int(record['id'])] = id_base + index
+        return id_map
+
+    def _convert(self, name, path, line_no, record, converters, references):
+        row = {}
+        for key, value in record.items():
+            if key not in converters:
+                continue
+            if value is None or value == '':
+                row[key] = None
+                continue
+            try:
+                row[key] = converters[key](value) if not isinstance(value, (int, float)) or converters[key] is str else value
+            except ValueError as e:
+                raise RowError(f"{path}:{line_no}: bad value for {key}: {value!r} ({e})")
+        if 'id' not in row or row['id'] is None:
+            raise RowError(f"{path}:{line_no}: every row needs an id")
+        if self.id_mode == 'allocate':
+            row['id'] = self.id_maps[name][row['id']]
+            for key, target in references.items():
+                if row.get(key) is not None and target in self.id_maps:
+                    try:
+                        row[key] = self.id_maps[target][row[key]]
+                    except KeyError:
+                        raise RowError(f"{path}:{line_no}: {key} {row[key]} is not in the {target} file")
+        if name == 'employees':
+            row['email_normalized'] = normalize_email(row.get('email'))
+            row.pop('reports_to_id', None)
+        elif name == 'daily_logs' and row.get('timesheet_id') is not None:
+            self.timesheet_ids.add(row['timesheet_id'])
+        return row
+
+    def _run_stage(self, stage, path, rows, execute):
+        """Apply ``rows`` in chunks, skipping those already committed for ``stage``."""
+        with self.engine.begin() as conn:
+            done, id_base = self.checkpoint(conn, stage)
+        done = done or 0
+        total = sum(1 for _ in iter_records(path))
+        if done >= total:
+            self.log(f"{stage}: already imported ({total} rows)")
+            return
+        if done:
+            self.log(f"{stage}: resuming after row {done} of {total}")
+        started = time.perf_counter()
+        chunk = []
+        position = 0
+        for row in rows:
+            position += 1
+            if position <= done:
+                continue
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size or position == total:
+                try:
+                    with self.engine.begin() as conn:
+                        execute(conn, chunk)
+                        self.save_checkpoint(conn, stage, position, id_base or 0)
+                except DBAPIError as e:
+                    raise RowError(f"{path}: {stage} rows {position - len(chunk) + 1}-{position}: {e.orig}")
+                rate = (position - done) / max(time.perf_counter() - started, 1e-9) * 60
+                self.log(f"{stage}: {position}/{total} rows ({rate:,.0f} rows/min)")
+                chunk = []
+
+    def import_entity(self, name, model, references):
+        path = find_file(self.source_dir, name)
+        if path is None:
+            return
+        with self.engine.begin() as conn:
+            id_base = self._id_base(conn, name, model)
+            # Record the id block before the first chunk so a resume reuses it.
+            if self.checkpoint(conn, name)[0] is None:
+                self.save_checkpoint(conn, name, 0, id_base)
+        if self.id_mode == 'allocate':
+            self.id_maps[name] = self._build_id_map(path, id_base)
+
+        converters = _converters(model)
+        rows = (self._convert(name, path, line_no, record, converters, references)
+                for line_no, record in iter_records(path))
+        self._run_stage(name, path, rows, lambda conn, chunk: conn.execute(insert(model), chunk))
+        if name == 'employees':
+            self._import_managers(path)
+        self.imported.append(model.__tablename__)
+
+    def _import_managers(self, path):
+        def manager_rows():
+            for line_no, record in iter_records(path):
+                emp_id, manager_id = int(record['id']), record.get('reports_to_id')
+                manager_id = int(manager_id) if manager_id not in (None, '') else None
+                if self.id_mode == 'allocate':
+                    emp_id = self.id_maps['employees'][emp_id]
+                    if manager_id is not None:
+                        manager_id = self.id_maps['employees'].get(manager_id, manager_id)
+                yield {'emp_id': emp_id, 'manager_id': manager_id}
+
+        table = Employee.__table__
+        stmt = update(table).where(table.c.id == bindparam('emp_id')).values(reports_to_id=bindparam('manager_id'))
+        self._run_stage(MANAGER_STAGE, path, manager_rows(), lambda conn, chunk: conn.execute(stmt, chunk))
+
+    def finish(self):
+        if not self.imported:
+            return
+        with self.engine.begin() as conn:
+            if conn.dialect.name == 'postgresql':
+                # Explicit ids leave serial sequences behind the imported rows.
+                for table in self.imported:
+                    conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                    ))
+            if 'employees' in self.imported:
+                self.log("Rebuilding employee_closure ...")
+                rebuild_employee_closure(conn)
+            if 'daily_logs' in self.imported or 'timesheets' in self.imported:
+                self.log("Rebuilding weekly_project_hours ...")
+                rebuild_weekly_hours(conn)
+            versions = [t for t in self.imported if t in VERSIONED_TABLES]
+            if {'employees', 'departments', 'designations'} & set(self.imported):
+                versions.append(ORG_VERSION_KEY)
+            versions.extend(timesheet_version_key(timesheet_id) for timesheet_id in self.timesheet_ids)
+            bump_table_versions(conn, versions)
+
+    def run(self):
+        with self.engine.begin() as conn:
+            _metadata.create_all(conn, checkfirst=True)
+        for name, model, references in ENTITIES:
+            self.import_entity(name, model, references)
+        self.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source_dir', help='directory with <table>.csv / .ndjson files')
+    parser.add_argument('--id-mode', choices=('keep', 'allocate'), default='keep')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--restart', action='store_true', help='forget checkpoints for this source first')
+    args = parser.parse_args()
+
+    importer = Importer(engine, args.source_dir, args.id_mode, args.chunk_size)
+    if args.restart:
+        importer.restart()
+    started = time.perf_counter()
+    try:
+        importer.run()
+    except RowError as e:
+        raise SystemExit(f"Import stopped: {e}\nFix the file and re-run; committed chunks are kept.")
+    print(f"Import finished in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == '__main__':
+    main()
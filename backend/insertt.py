@@ -9,6 +9,8 @@ from models.timesheet import Timesheet
 from models.dailylogs import DailyLog
 from models.project import Project
 from models.dailylogchanges import DailyLogChange
+import services.weekly_hours  # keeps weekly_project_hours in sync with the seeded logs
+import services.employee_closure  # and employee_closure with the seeded managers
 
 fake = Faker()
 session = get_session()
@@ -0,0 +1,82 @@
+"""Apply pending schema migrations from ``migrations/``.
+
+Usage:
+    python migrate.py            # upgrade to the latest version
+    python migrate.py --status   # list applied and pending migrations
+
+Each migration is a module ``migrations/NNNN_description.py`` exposing
+``upgrade(conn)``. Applied versions are recorded in ``schema_migrations``.
+Migrations are written to be idempotent so they are safe on databases that
+were created earlier with ``Base.metadata.create_all``.
+"""
+import argparse
+import importlib
+import os
+import re
+from datetime import datetime
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+from utils.session_manager import engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+_metadata = MetaData()
+schema_migrations = Table(
+    'schema_migrations', _metadata,
+    Column('version', String(32), primary_key=True),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def discover_migrations():
+    """Return ``[(version, module_name)]`` sorted by version."""
+    found = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = re.match(r'^(\d{4})_\w+\.py$', filename)
+        if match:
+            found.append((match.group(1), filename[:-3]))
+    return sorted(found)
+
+
+def applied_versions(conn):
+    _metadata.create_all(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def upgrade(bind=engine):
+    """Apply every pending migration, each in its own transaction."""
+    applied = []
+    for version, module_name in discover_migrations():
+        with bind.begin() as conn:
+            if version in applied_versions(conn):
+                continue
+            module = importlib.import_module(f'migrations.{module_name}')
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+        applied.append(module_name)
+    return applied
+
+
+def status(bind=engine):
+    with bind.begin() as conn:
+        done = applied_versions(conn)
+    return [(module_name, version in done) for version, module_name in discover_migrations()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--status', action='store_true', help='show migration status and exit')
+    args = parser.parse_args()
+    if args.status:
+        for module_name, done in status():
+            print(f"{'applied' if done else 'pending'}  {module_name}")
+        return
+    applied = upgrade()
+    if applied:
+        for module_name in applied:
+            print(f"Applied {module_name}")
+    else:
+        print("Schema is up to date.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""Bootstrap: create any missing table from the current models.
+
+This is not a snapshot of the schema create.py used to build. On an empty
+database it creates every table, index and column the models define today,
+so the later migrations find their work already done and only backfill
+data; each of them checks before creating anything. On a database made by
+the old create.py the existing tables are left alone and the later
+migrations add what they lack.
+"""
+from models.base import Base
+
+# Every model, so the tables created do not depend on what was imported first.
+import models.employee
+import models.department
+import models.timesheet
+import models.designation
+import models.project
+import models.dailylogs
+import models.dailylogchanges
+import models.weekly_hours
+import models.table_version
+import models.employee_closure
+
+
+def upgrade(conn):
+    # checkfirst skips tables that already exist on databases made by create.py
+    Base.metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,48 @@
+"""Secondary indexes on hot filter columns and a normalized email column.
+
+Adds:
+  * daily_logs (timesheet_id, log_date) and (log_date)
+  * daily_log_changes (daily_log_id, changed_at)
+  * employees (reports_to_id)
+  * employees.email_normalized = LOWER(TRIM(email)) with a unique index, so
+    email lookups are an index seek instead of an ILIKE scan
+"""
+from sqlalchemy import inspect, text
+
+INDEXES = [
+    ('daily_logs', 'ix_daily_logs_timesheet_date', ['timesheet_id', 'log_date']),
+    ('daily_logs', 'ix_daily_logs_log_date', ['log_date']),
+    ('daily_log_changes', 'ix_daily_log_changes_log_changed', ['daily_log_id', 'changed_at']),
+    ('employees', 'ix_employees_reports_to', ['reports_to_id']),
+]
+
+
+def _create_index(conn, table, name, columns, unique=False):
+    existing = {ix['name'] for ix in inspect(conn).get_indexes(table)}
+    if name not in existing:
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+def upgrade(conn):
+    for table, name, columns in INDEXES:
+        _create_index(conn, table, name, columns)
+
+    columns = {col['name'] for col in inspect(conn).get_columns('employees')}
+    if 'email_normalized' not in columns:
+        conn.execute(text("ALTER TABLE employees ADD COLUMN email_normalized VARCHAR(100)"))
+    conn.execute(text(
+        "UPDATE employees SET email_normalized = LOWER(TRIM(email)) WHERE email_normalized IS NULL"
+    ))
+
+    duplicates = conn.execute(text(
+        "SELECT email_normalized, COUNT(*) FROM employees GROUP BY email_normalized HAVING COUNT(*) > 1"
+    )).all()
+    if duplicates:
+        listed = ', '.join(f'{email} ({count})' for email, count in duplicates)
+        raise RuntimeError(f"Resolve case-insensitive duplicate emails before migrating: {listed}")
+
+    if conn.dialect.name in ('mysql', 'mariadb'):
+        # SQLite cannot alter column nullability; the model enforces it there.
+        conn.execute(text("ALTER TABLE employees MODIFY email_normalized VARCHAR(100) NOT NULL"))
+    _create_index(conn, 'employees', 'ux_employees_email_normalized', ['email_normalized'], unique=True)
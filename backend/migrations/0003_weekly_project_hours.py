@@ -0,0 +1,8 @@
+"""Weekly per-project hours rollup, backfilled from existing daily logs."""
+from models.weekly_hours import WeeklyProjectHours
+from services.weekly_hours import rebuild_weekly_hours
+
+
+def upgrade(conn):
+    WeeklyProjectHours.__table__.create(conn, checkfirst=True)
+    rebuild_weekly_hours(conn)
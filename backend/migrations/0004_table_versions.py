@@ -0,0 +1,12 @@
+"""Per-table version stamps for ETags on reference-data endpoints."""
+from sqlalchemy import select
+from models.table_version import TableVersion
+from services.table_versions import VERSIONED_TABLES
+
+
+def upgrade(conn):
+    TableVersion.__table__.create(conn, checkfirst=True)
+    existing = set(conn.execute(select(TableVersion.table_name)).scalars())
+    missing = [{'table_name': name, 'version': 1} for name in VERSIONED_TABLES if name not in existing]
+    if missing:
+        conn.execute(TableVersion.__table__.insert(), missing)
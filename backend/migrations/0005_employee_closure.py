@@ -0,0 +1,8 @@
+"""Closure table of the reporting hierarchy, built from employees.reports_to_id."""
+from models.employee_closure import EmployeeClosure
+from services.employee_closure import rebuild_employee_closure
+
+
+def upgrade(conn):
+    EmployeeClosure.__table__.create(conn, checkfirst=True)
+    rebuild_employee_closure(conn)
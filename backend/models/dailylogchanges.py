@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from models.base import Base
 from datetime import datetime
@@ -15,6 +15,8 @@ class DailyLogChange(Base):
     daily_log = relationship("DailyLog", back_populates="daily_log_changes")
     project = relationship("Project", back_populates="daily_log_changes")
 
+    __table_args__ = (Index('ix_daily_log_changes_log_changed', 'daily_log_id', 'changed_at'),)
+
     def as_dict(self):
         return {
             "id": self.id,
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Time, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, Time, Date, Index
 from sqlalchemy.orm import relationship
 from models.base import Base
 from models.dailylogchanges import DailyLogChange  # Move import to the top
@@ -24,6 +24,11 @@ class DailyLog(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index('ix_daily_logs_timesheet_date', 'timesheet_id', 'log_date'),
+        Index('ix_daily_logs_log_date', 'log_date'),
+    )
+
     def as_dict(self):
         return {
             "id": self.id,
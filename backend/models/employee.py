@@ -1,19 +1,36 @@
 # models/employee.py
 
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 from models.base import Base
 
+
+def normalize_email(email):
+    """Canonical form used for case-insensitive email lookups."""
+    return email.strip().lower() if email else email
+
+
+def _default_email_normalized(context):
+    # Covers Core/bulk inserts that only supply ``email``.
+    return normalize_email(context.get_current_parameters().get('email'))
+
+
 class Employee(Base):
     __tablename__ = 'employees'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     employee_name = Column(String(100), nullable=False)
     email = Column(String(100), nullable=False)
+    email_normalized = Column(String(100), nullable=False, default=_default_email_normalized)
     department_id = Column(Integer, ForeignKey('departments.id', ondelete='CASCADE'))
     designation_id = Column(Integer, ForeignKey('designations.id', ondelete='SET NULL'))
     reports_to_id = Column(Integer, ForeignKey('employees.id'), nullable=True)  # 👈 Manager field
 
+    __table_args__ = (
+        Index('ux_employees_email_normalized', 'email_normalized', unique=True),
+        Index('ix_employees_reports_to', 'reports_to_id'),
+    )
+
     department = relationship("Department", back_populates="employees")
     designation = relationship("Designation", back_populates="employees")
     timesheets = relationship("Timesheet", back_populates="employee", cascade="all, delete-orphan")
@@ -21,8 +38,13 @@ class Employee(Base):
 
     manager = relationship("Employee", remote_side=[id], backref="subordinates")  # 👈 Self-relationship
 
+    @validates('email')
+    def _sync_email_normalized(self, key, email):
+        self.email_normalized = normalize_email(email)
+        return email
+
     def as_dict(self):
-        data = {col.name: getattr(self, col.name) for col in self.__table__.columns}
+        data = {col.name: getattr(self, col.name) for col in self.__table__.columns if col.name != 'email_normalized'}
         if self.manager:
             data['reports_to'] = self.manager.employee_name
         return data
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, ForeignKey, Integer, Index
+from models.base import Base
+
+
+class EmployeeClosure(Base):
+    """One row per (manager at any level, report) pair of the reporting hierarchy.
+
+    Every employee also has a ``depth`` 0 row for itself, so a subtree is all
+    rows with ``ancestor_id = root`` and a manager chain is all rows with
+    ``descendant_id = employee``. Maintained by ``services/employee_closure.py``;
+    never written directly.
+    """
+    __tablename__ = 'employee_closure'
+
+    ancestor_id = Column(Integer, ForeignKey('employees.id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    descendant_id = Column(Integer, ForeignKey('employees.id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (Index('ix_employee_closure_descendant', 'descendant_id', 'depth'),)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String
+from models.base import Base
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped in the same transaction as each write.
+
+    Used to build ETags for cacheable GET endpoints; see services/table_versions.py.
+    """
+    __tablename__ = 'table_versions'
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Date, Index
+from models.base import Base
+
+# ``project_id`` of logs without a project; part of the primary key, so not NULL.
+NO_PROJECT = 0
+
+
+class WeeklyProjectHours(Base):
+    """Per employee, week (Monday) and project totals derived from ``daily_logs``.
+
+    Maintained by ``services/weekly_hours.py``; never written directly. No
+    foreign keys, since rows are rebuilt from the logs and may briefly outlive
+    a deleted employee or project within a flush.
+    """
+    __tablename__ = 'weekly_project_hours'
+
+    employee_id = Column(Integer, primary_key=True, autoincrement=False)
+    week_start = Column(Date, primary_key=True)
+    project_id = Column(Integer, primary_key=True, autoincrement=False)
+    total_minutes = Column(Integer, nullable=False, default=0)
+    log_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index('ix_weekly_project_hours_week', 'week_start'),)
+
+    def as_dict(self):
+        return {
+            "employee_id": self.employee_id,
+            "week_start": self.week_start.isoformat(),
+            "project_id": None if self.project_id == NO_PROJECT else self.project_id,
+            "total_hours": round(self.total_minutes / 60, 2),
+            "log_count": self.log_count,
+        }
@@ -0,0 +1,32 @@
+"""Rebuild the weekly_project_hours rollup from daily_logs.
+
+Usage:
+    python rebuild_weekly_hours.py                   # every employee
+    python rebuild_weekly_hours.py --employee 12 34  # only these employees
+
+Run after backfills or any write that bypassed the application (raw SQL,
+imports into daily_logs). Runs in a single transaction.
+"""
+import argparse
+from utils.session_manager import engine
+from services.weekly_hours import rebuild_weekly_hours
+
+# Import all models so relationships resolve
+import models.employee
+import models.department
+import models.designation
+import models.project
+import models.dailylogchanges
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--employee', type=int, nargs='+', help='limit the rebuild to these employee ids')
+    args = parser.parse_args()
+    with engine.begin() as conn:
+        written = rebuild_weekly_hours(conn, args.employee)
+    print(f"Rebuilt weekly_project_hours: {written} row(s).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+from collections import namedtuple
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import select
+from models.dailylogs import DailyLog
+from models.employee import Employee
+from models.employee_closure import EmployeeClosure
+from models.project import Project
+from models.timesheet import Timesheet
+
+# Rows fetched per round trip and aggregated as one set of columns.
+ANALYTICS_CHUNK = 5000
+# Reports cover at most this many days so one request stays bounded.
+MAX_REPORT_DAYS = 366
+
+STANDARD_DAY_MINUTES = 8 * 60
+STANDARD_WEEK_MINUTES = 40 * 60
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+# Stands in for a NULL project or department id in the integer columns.
+NO_ID = 0
+
+# One chunk of daily logs as int64 ndarrays, one per column. ``day`` holds
+# date ordinals and ``start`` minutes after midnight.
+LogColumns = namedtuple('LogColumns', 'employee_id department_id project_id day start minutes')
+
+
+def _minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def _int_column(values, convert=None):
+    if convert is not None:
+        values = map(convert, values)
+    return np.fromiter(values, dtype=np.int64)
+
+
+def _id_column(values):
+    return np.fromiter((NO_ID if value is None else value for value in values), dtype=np.int64)
+
+
+def _id_or_none(value):
+    return None if value == NO_ID else value
+
+
+def iter_log_columns(session, start_date, end_date, department_id=None, manager_id=None):
+    """Yield the logs dated in ``[start_date, end_date]`` as :data:`LogColumns` chunks.
+
+    Rows come from a server-side cursor ``ANALYTICS_CHUNK`` at a time and
+    each chunk is transposed into ndarrays; minutes worked are computed on
+    the whole chunk at once, wrapping past midnight like
+    ``weekly_hours.log_minutes``. NULL project and department ids are
+    ``NO_ID``. ``manager_id`` limits the logs to that manager's direct and
+    indirect reports through the closure table.
+    """
+    stmt = (
+        select(Timesheet.employee_id, Employee.department_id, DailyLog.project_id, DailyLog.log_date,
+               DailyLog.start_time, DailyLog.end_time)
+        .join(Timesheet, Timesheet.id == DailyLog.timesheet_id)
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .where(DailyLog.log_date >= start_date, DailyLog.log_date <= end_date)
+    )
+    if department_id is not None:
+        stmt = stmt.where(Employee.department_id == department_id)
+    if manager_id is not None:
+        stmt = stmt.join(EmployeeClosure, EmployeeClosure.descendant_id == Employee.id).where(
+            EmployeeClosure.ancestor_id == manager_id, EmployeeClosure.depth > 0
+        )
+    result = session.execute(stmt.execution_options(stream_results=True, yield_per=ANALYTICS_CHUNK))
+    for rows in result.partitions():
+        employee_ids, department_ids, project_ids, dates, starts, ends = zip(*rows)
+        start = _int_column(starts, _minute_of_day)
+        yield LogColumns(
+            _int_column(employee_ids), _id_column(department_ids), _id_column(project_ids),
+            _int_column(dates, date.toordinal), start,
+            (_int_column(ends, _minute_of_day) - start) % DAY_MINUTES,
+        )
+
+
+def _group_sum(keys, *values):
+    """Sum ``values`` over the distinct rows of the 2-D int array ``keys``.
+
+    Returns the sorted distinct keys and one int64 array of sums per value.
+    Each column is replaced by its rank among the column's distinct values
+    and the ranks are combined into one int64 code per row, which sorts far
+    faster than ``np.unique(keys, axis=0)``.
+    """
+    codes = np.zeros(len(keys), dtype=np.int64)
+    for column in keys.T:
+        distinct, ranks = np.unique(column, return_inverse=True)
+        codes = codes * len(distinct) + ranks.reshape(-1)
+    _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    return (keys[first], *(
+        np.bincount(inverse, weights=value, minlength=len(first)).astype(np.int64) for value in values
+    ))
+
+
+def _reduce_chunks(parts, width, count):
+    """Combine per-chunk :func:`_group_sum` results into one."""
+    if not parts:
+        return (np.empty((0, width), dtype=np.int64), *(np.empty(0, dtype=np.int64) for _ in range(count)))
+    return _group_sum(*(np.concatenate(column) for column in zip(*parts)))
+
+
+def _totals_by(ids, *values):
+    """``{id: (sum, ...)}`` of ``values`` per distinct entry of ``ids``."""
+    unique, *sums = _group_sum(ids.reshape(-1, 1), *values)
+    return {key: totals for key, *totals in zip(unique[:, 0].tolist(), *(s.tolist() for s in sums))}
+
+
+def working_days(start_date, end_date):
+    """Monday to Friday dates in ``[start_date, end_date]``."""
+    days = (end_date - start_date).days + 1
+    full_weeks, rest = divmod(max(days, 0), 7)
+    first = start_date.weekday()
+    return full_weeks * 5 + sum(1 for i in range(rest) if (first + i) % 7 < 5)
+
+
+def _hours(minutes):
+    return round(minutes / 60, 2)
+
+
+def _ratio(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _week(ordinals):
+    # date(1, 1, 1) is a Monday with ordinal 1, so this groups Monday to Sunday.
+    return (ordinals - 1) // 7
+
+
+def report_scope(graph, department_id=None, manager_id=None):
+    """Employee ids a report covers: a department, a manager's reports, both, or everyone."""
+    if manager_id is not None:
+        employee_ids, pending = set(), list(graph.subordinates.get(manager_id, []))
+        while pending:
+            employee_id = pending.pop()
+            if employee_id not in employee_ids and employee_id != manager_id:
+                employee_ids.add(employee_id)
+                pending.extend(graph.subordinates.get(employee_id, []))
+    else:
+        employee_ids = set(graph.employees)
+    if department_id is not None:
+        employee_ids = {
+            employee_id for employee_id in employee_ids
+            if graph.employees[employee_id]['department_id'] == department_id
+        }
+    return employee_ids
+
+
+def report_range(start_date, end_date):
+    """Validate a report's date range; returns an error message or None."""
+    if end_date < start_date:
+        return 'end_date must not be before start_date.'
+    if end_date - start_date >= timedelta(days=MAX_REPORT_DAYS):
+        return f'Reports cover at most {MAX_REPORT_DAYS} days.'
+    return None
+
+
+# ---------------- Utilization and overtime ----------------
+
+def utilization_report(session, graph, start_date, end_date, employee_ids, department_id=None, manager_id=None):
+    """Logged hours against a standard working week for every employee in ``employee_ids``.
+
+    An employee works overtime on a day logged beyond ``STANDARD_DAY_MINUTES``
+    and in a week logged beyond ``STANDARD_WEEK_MINUTES``; overtime hours
+    are the daily excess. Employees with no logs are listed at zero.
+    Departments aggregate their employees.
+    """
+    parts = [
+        _group_sum(np.column_stack((chunk.employee_id, chunk.day)), chunk.minutes)
+        for chunk in iter_log_columns(session, start_date, end_date, department_id, manager_id)
+    ]
+    days, minutes = _reduce_chunks(parts, 2, 1)
+    day_employees = days[:, 0]
+    over = np.maximum(minutes - STANDARD_DAY_MINUTES, 0)
+    per_employee = _totals_by(day_employees, minutes, np.ones_like(minutes), over, over > 0)
+    weeks, week_minutes = _group_sum(np.column_stack((day_employees, _week(days[:, 1]))), minutes)
+    overtime_weeks = _totals_by(weeks[:, 0], week_minutes > STANDARD_WEEK_MINUTES)
+
+    standard = working_days(start_date, end_date) * STANDARD_DAY_MINUTES
+    employees = []
+    departments = {}
+    total_logged = total_overtime = with_overtime = 0
+    for employee_id in sorted(employee_ids):
+        emp = graph.employees.get(employee_id, {})
+        logged, days_logged, overtime, overtime_days = per_employee.get(employee_id, (0, 0, 0, 0))
+        department = departments.setdefault(emp.get('department_id'), {'employees': 0, 'logged': 0, 'overtime': 0})
+        department['employees'] += 1
+        department['logged'] += logged
+        department['overtime'] += overtime
+        total_logged += logged
+        total_overtime += overtime
+        with_overtime += overtime > 0
+        employees.append({
+            'id': employee_id,
+            'employee_name': emp.get('employee_name'),
+            'department_id': emp.get('department_id'),
+            'logged_hours': _hours(logged),
+            'days_logged': days_logged,
+            'utilization': _ratio(logged, standard),
+            'overtime_hours': _hours(overtime),
+            'overtime_days': overtime_days,
+            'overtime_weeks': overtime_weeks.get(employee_id, (0,))[0],
+        })
+
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'working_days': working_days(start_date, end_date),
+        'standard_hours': _hours(standard),
+        'employees': employees,
+        'departments': [{
+            'department_id': dept_id,
+            'department_name': (graph.departments.get(dept_id) or {}).get('name'),
+            'employees': totals['employees'],
+            'logged_hours': _hours(totals['logged']),
+            'utilization': _ratio(totals['logged'], standard * totals['employees']),
+            'overtime_hours': _hours(totals['overtime']),
+        } for dept_id, totals in sorted(departments.items(), key=lambda item: item[0] or 0)],
+        'totals': {
+            'employees': len(employees),
+            'logged_hours': _hours(total_logged),
+            'utilization': _ratio(total_logged, standard * len(employees)),
+            'overtime_hours': _hours(total_overtime),
+            'employees_with_overtime': with_overtime,
+        },
+    }
+
+
+# ---------------- Project distribution ----------------
+
+def project_distribution_report(session, graph, start_date, end_date, department_id=None, manager_id=None):
+    """Hours per project with each project's share of the total and its split by department."""
+    parts = [
+        _group_sum(
+            np.column_stack((chunk.project_id, chunk.department_id, chunk.employee_id)),
+            chunk.minutes, np.ones_like(chunk.minutes),
+        )
+        for chunk in iter_log_columns(session, start_date, end_date, department_id, manager_id)
+    ]
+    # Totals per (project, department, employee); everything below is summed from them.
+    keys, minutes, log_counts = _reduce_chunks(parts, 3, 2)
+    projects = _totals_by(keys[:, 0], minutes, log_counts)
+    member_projects = _group_sum(keys[:, [0, 2]])[0][:, 0]
+    members = dict(zip(*(column.tolist() for column in np.unique(member_projects, return_counts=True))))
+    by_department, department_minutes = _group_sum(keys[:, :2], minutes)
+    departments = {}
+    for (project_id, dept_id), worked in zip(by_department.tolist(), department_minutes.tolist()):
+        dept_id = _id_or_none(dept_id)
+        departments.setdefault(project_id, []).append({
+            'department_id': dept_id,
+            'department_name': (graph.departments.get(dept_id) or {}).get('name'),
+            'total_hours': _hours(worked),
+        })
+
+    project_ids = [project_id for project_id in projects if project_id != NO_ID]
+    names = dict(session.execute(
+        select(Project.id, Project.name).where(Project.id.in_(project_ids))
+    ).all()) if project_ids else {}
+    total = int(minutes.sum())
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'total_hours': _hours(total),
+        'projects': [{
+            'project_id': _id_or_none(project_id),
+            'project_name': names.get(project_id),
+            'total_hours': _hours(worked),
+            'share': _ratio(worked, total),
+            'log_count': count,
+            'employees': members[project_id],
+            'departments': sorted(departments[project_id], key=lambda d: -d['total_hours']),
+        } for project_id, (worked, count) in sorted(projects.items(), key=lambda item: -item[1][0])],
+    }
+
+
+# ---------------- Weekday heatmap ----------------
+
+def weekday_heatmap_report(session, start_date, end_date, department_id=None, manager_id=None):
+    """Hours worked per weekday and hour of day; overnight logs continue into the next weekday.
+
+    Each log covers a span of the minutes of the week, Monday 00:00 being
+    minute 0 and Sunday wrapping to Monday. Spans are added as +1/-1 steps
+    to a difference array whose running sum is the number of logs open at
+    each minute; the minutes are then summed per hour.
+    """
+    steps = np.zeros(WEEK_MINUTES + 1, dtype=np.int64)
+    for chunk in iter_log_columns(session, start_date, end_date, department_id, manager_id):
+        begin = (chunk.day - 1) % 7 * DAY_MINUTES + chunk.start
+        end = begin + chunk.minutes
+        wrapped = end > WEEK_MINUTES
+        steps += np.bincount(begin, minlength=WEEK_MINUTES + 1)
+        steps -= np.bincount(np.minimum(end, WEEK_MINUTES), minlength=WEEK_MINUTES + 1)
+        steps[0] += np.count_nonzero(wrapped)
+        steps -= np.bincount(end[wrapped] - WEEK_MINUTES, minlength=WEEK_MINUTES + 1)
+    grid = np.cumsum(steps[:WEEK_MINUTES]).reshape(7, 24, 60).sum(axis=2).tolist()
+    return {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'weekdays': [{
+            'weekday': name,
+            'total_hours': _hours(sum(hours)),
+            'hours': [_hours(minutes) for minutes in hours],
+        } for name, hours in zip(WEEKDAYS, grid)],
+        'total_hours': _hours(sum(map(sum, grid))),
+    }
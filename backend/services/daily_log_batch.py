@@ -0,0 +1,271 @@
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import and_, insert, or_, update, select
+from models.timesheet import Timesheet
+from models.project import Project
+from models.dailylogs import DailyLog
+from models.dailylogchanges import DailyLogChange
+from services.table_versions import mark_versions_changed, timesheet_version_key
+from services.weekly_hours import WeeklyDeltas, apply_weekly_deltas, log_minutes
+
+
+class DailyLogBatchError(Exception):
+    """Raised when a posted batch of daily logs fails validation.
+
+    ``conflicts`` lists every overlapping pair when the batch is rejected
+    for overlapping time ranges.
+    """
+
+    def __init__(self, message, status_code=400, conflicts=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.conflicts = conflicts or []
+
+
+def _parse_row(log_data):
+    """Validate a single posted log and return it with parsed date/time values."""
+    timesheet_id = log_data.get('timesheet_id')
+    log_date = log_data.get('log_date')
+    project_id = log_data.get('project_id')
+    start_time_str = log_data.get('start_time')
+    end_time_str = log_data.get('end_time')
+
+    # total_hours is accepted for compatibility but recomputed from the times.
+    if not all([timesheet_id, log_date, project_id, start_time_str, end_time_str]):
+        raise DailyLogBatchError('Missing required fields in log data.')
+
+    try:
+        log_date_obj = datetime.strptime(log_date, '%Y-%m-%d').date()
+        start_time_obj = datetime.strptime(start_time_str, '%H:%M').time()
+        end_time_obj = datetime.strptime(end_time_str, '%H:%M').time()
+    except ValueError:
+        raise DailyLogBatchError('Invalid date or time format. Expected YYYY-MM-DD and HH:MM.')
+    if start_time_obj == end_time_obj:
+        raise DailyLogBatchError('end_time must differ from start_time.')
+
+    try:
+        log_id = int(log_data['id']) if log_data.get('id') else None
+        timesheet_id = int(timesheet_id)
+        project_id = int(project_id)
+    except (TypeError, ValueError):
+        raise DailyLogBatchError('id, timesheet_id and project_id must be integers.')
+
+    return {
+        'id': log_id,
+        'timesheet_id': timesheet_id,
+        'log_date': log_date_obj,
+        'project_id': project_id,
+        'start_time': start_time_obj,
+        'end_time': end_time_obj,
+        'total_hours': _whole_hours(start_time_obj, end_time_obj),
+        'task_description': log_data.get('task_description', ''),
+    }
+
+
+def _whole_hours(start_time, end_time):
+    # daily_logs.total_hours is an integer column; round to the nearest hour.
+    return (log_minutes(start_time, end_time) + 30) // 60
+
+
+def _interval(log_date, start_time, end_time):
+    """``[start, end)`` in absolute minutes (date ordinal * 1440 plus minute of day).
+
+    An overnight log simply ends on the next date, so it is compared with
+    that date's logs as well.
+    """
+    start = log_date.toordinal() * 24 * 60 + start_time.hour * 60 + start_time.minute
+    return start, start + log_minutes(start_time, end_time)
+
+
+def find_overlaps(entries):
+    """Return ``(earlier, later)`` pairs of overlapping entries on one timesheet.
+
+    ``entries`` are dicts with ``start``/``end`` minutes (see :func:`_interval`)
+    and a ``batch`` flag. After sorting by start, an entry overlaps the
+    running entry with the furthest end if it starts before that end; each
+    entry is compared once, so a timesheet costs O(n log n) instead of O(n²).
+    Pairs of two stored rows are left alone so old data cannot block a save
+    that does not touch it.
+    """
+    overlaps = []
+    reach = None
+    for entry in sorted(entries, key=lambda e: (e['start'], e['end'])):
+        if reach is not None and entry['start'] < reach['end'] and (entry['batch'] or reach['batch']):
+            overlaps.append((reach, entry))
+        if reach is None or entry['end'] > reach['end']:
+            reach = entry
+    return overlaps
+
+
+def _describe(entry):
+    described = {'index': entry['index']} if entry['batch'] else {}
+    if entry['id']:
+        described['id'] = entry['id']
+    described['log_date'] = entry['log_date'].strftime('%Y-%m-%d')
+    described['start_time'] = entry['start_time'].strftime('%H:%M')
+    described['end_time'] = entry['end_time'].strftime('%H:%M')
+    return described
+
+
+def _check_overlaps(batch_entries, stored_rows):
+    """Raise with every overlap between the batch and the stored logs around the days it touches.
+
+    ``batch_entries`` carry the final values of every posted row; stored rows
+    that the batch updates are replaced by them before the sweep.
+    """
+    replaced = {entry['id'] for entry in batch_entries if entry['id']}
+    entries = list(batch_entries)
+    for row in stored_rows:
+        if row['id'] not in replaced:
+            entries.append(dict(row, batch=False, index=None))
+    for entry in entries:
+        entry['start'], entry['end'] = _interval(entry['log_date'], entry['start_time'], entry['end_time'])
+
+    timesheet = itemgetter('timesheet_id')
+    conflicts = []
+    for timesheet_id, group in groupby(sorted(entries, key=timesheet), key=timesheet):
+        conflicts.extend({
+            'timesheet_id': timesheet_id,
+            'log_date': later['log_date'].strftime('%Y-%m-%d'),
+            'log': _describe(later),
+            'overlaps': _describe(earlier),
+        } for earlier, later in find_overlaps(list(group)))
+    if conflicts:
+        raise DailyLogBatchError(
+            f'{len(conflicts)} daily log time range(s) overlap another log on the same timesheet.', 409, conflicts
+        )
+
+
+def _existing_ids(session, column, ids):
+    if not ids:
+        return set()
+    return set(session.execute(select(column).where(column.in_(ids))).scalars())
+
+
+def save_daily_log_batch(session, logs):
+    """Insert/update a list of posted daily logs using set-based statements.
+
+    Referenced timesheets, projects and existing logs are prefetched with one
+    ``IN (...)`` query each, the diff is computed in memory and the writes are
+    issued as executemany batches. ``total_hours`` is recomputed from the
+    times, and the batch is rejected with every conflict listed if any log
+    overlaps another on the same timesheet, overnight logs included. The
+    caller owns the transaction.
+    """
+    rows = [_parse_row(log_data) for log_data in logs]
+
+    timesheet_ids = {r['timesheet_id'] for r in rows}
+    timesheet_employees = dict(session.execute(
+        select(Timesheet.id, Timesheet.employee_id).where(Timesheet.id.in_(timesheet_ids))
+    ).all())
+    project_ids = _existing_ids(session, Project.id, {r['project_id'] for r in rows})
+    log_ids = {r['id'] for r in rows if r['id']}
+    # One query returns the logs being updated and every stored log on the
+    # timesheet days the batch touches, plus the day either side for
+    # overnight logs, for the overlap sweep.
+    dates = [r['log_date'] for r in rows]
+    touched_days = and_(
+        DailyLog.timesheet_id.in_(timesheet_ids),
+        DailyLog.log_date.between(min(dates) - timedelta(days=1), max(dates) + timedelta(days=1)),
+    )
+    result = session.execute(
+        select(DailyLog.id, DailyLog.timesheet_id, DailyLog.project_id, DailyLog.task_description,
+               DailyLog.log_date, DailyLog.start_time, DailyLog.end_time)
+        .where(or_(DailyLog.id.in_(log_ids), touched_days) if log_ids else touched_days)
+    )
+    stored = [row._asdict() for row in result]
+    existing = {row['id']: dict(row) for row in stored if row['id'] in log_ids}
+
+    inserts, updates, changes, saved_logs, batch_entries = [], {}, [], [], []
+    deltas = WeeklyDeltas()
+    now = datetime.utcnow()
+    for index, row in enumerate(rows):
+        if row['timesheet_id'] not in timesheet_employees:
+            raise DailyLogBatchError(f"Timesheet with id {row['timesheet_id']} not found.", 404)
+        if row['project_id'] not in project_ids:
+            raise DailyLogBatchError(f"Project with id {row['project_id']} not found.", 404)
+
+        values = {k: v for k, v in row.items() if k not in ('id', 'timesheet_id')}
+        if row['id']:
+            current = existing.get(row['id'])
+            if current is None:
+                raise DailyLogBatchError(f"Daily log with id {row['id']} not found.", 404)
+            if current['timesheet_id'] != row['timesheet_id']:
+                raise DailyLogBatchError(
+                    f"Daily log {row['id']} belongs to timesheet {current['timesheet_id']}, "
+                    f"not {row['timesheet_id']}; logs cannot move between timesheets."
+                )
+
+            # Log change history if description or project_id changed
+            if current['task_description'] != row['task_description'] or current['project_id'] != row['project_id']:
+                changes.append({
+                    'daily_log_id': row['id'],
+                    'project_id': row['project_id'],
+                    'new_description': row['task_description'],
+                    'changed_at': now,
+                })
+            deltas.add(timesheet_employees[row['timesheet_id']], current['log_date'], current['project_id'],
+                       current['start_time'], current['end_time'], sign=-1)
+            current.update(values)
+            updates[row['id']] = dict(values, id=row['id'])
+            saved = dict(row)
+        else:
+            inserts.append(dict(values, timesheet_id=row['timesheet_id']))
+            saved = dict(row)
+        deltas.add(timesheet_employees[saved['timesheet_id']], row['log_date'], row['project_id'],
+                   row['start_time'], row['end_time'])
+        saved_logs.append(saved)
+        batch_entries.append(dict(saved, batch=True, index=index))
+
+    _check_overlaps(batch_entries, stored)
+
+    if updates:
+        session.execute(update(DailyLog), list(updates.values()))
+    if inserts:
+        new_ids = _insert_logs(session, inserts)
+        pending = iter(new_ids)
+        for saved in saved_logs:
+            if not saved['id']:
+                saved['id'] = next(pending)
+    if changes:
+        session.execute(insert(DailyLogChange), changes)
+    apply_weekly_deltas(session, deltas)
+    mark_versions_changed(session, {timesheet_version_key(saved['timesheet_id']) for saved in saved_logs})
+
+    return [{
+        'id': saved['id'],
+        'timesheet_id': saved['timesheet_id'],
+        'log_date': saved['log_date'].strftime('%Y-%m-%d'),
+        'project_id': saved['project_id'],
+        'start_time': saved['start_time'].strftime('%H:%M'),
+        'end_time': saved['end_time'].strftime('%H:%M'),
+        'total_hours': saved['total_hours'],
+        'task_description': saved['task_description'],
+    } for saved in saved_logs]
+
+
+_INSERT_KEY = ('timesheet_id', 'log_date', 'project_id', 'start_time', 'end_time', 'task_description')
+
+
+def _insert_logs(session, inserts):
+    """Bulk insert new logs, returning their ids where the dialect allows it.
+
+    Ordered RETURNING forces SQLAlchemy back to one INSERT per row, so ids are
+    matched to rows by content instead; identical rows are interchangeable.
+    """
+    if not session.get_bind().dialect.insert_executemany_returning:
+        # MySQL has no RETURNING; ids are only known after commit, as before.
+        session.execute(insert(DailyLog), inserts)
+        return [None] * len(inserts)
+
+    key_columns = [getattr(DailyLog, name) for name in _INSERT_KEY]
+    result = session.execute(insert(DailyLog).returning(DailyLog.id, *key_columns), inserts)
+    ids_by_key = {}
+    for row in result:
+        ids_by_key.setdefault(tuple(row[1:]), []).append(row.id)
+    return [
+        (ids_by_key.get(tuple(values[name] for name in _INSERT_KEY)) or [None]).pop()
+        for values in inserts
+    ]
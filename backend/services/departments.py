@@ -0,0 +1,76 @@
+from sqlalchemy import delete, select, update
+from models.dailylogchanges import DailyLogChange
+from models.dailylogs import DailyLog
+from models.department import Department
+from models.designation import Designation
+from models.employee import Employee
+from models.timesheet import Timesheet
+from models.weekly_hours import WeeklyProjectHours
+from services.employee_closure import refresh_closure_subtrees, remove_employees_from_closure
+from services.org_cache import invalidate_org_graph_on_commit
+from services.table_versions import mark_versions_changed, timesheet_version_key
+
+# Employee ids per ``reports_to_id IN (...)`` statement.
+DELETE_CHUNK = 1000
+
+
+def cascade_delete_department(session, department_id):
+    """Delete a department with its designations, employees, timesheets and logs in the caller's transaction.
+
+    The ORM cascade would load every dependent row and delete it one by one.
+    Here each table is cleared with a single set-based DELETE keyed on the
+    department, children first, so the number of statements does not grow
+    with the department. Employees elsewhere who report to a deleted
+    employee, or hold one of the deleted designations, are detached first,
+    and the closure is rewritten below the detached employees.
+    Returns False when the department does not exist.
+    """
+    department = session.get(Department, department_id)
+    if department is None:
+        return False
+    members = select(Employee.id).where(Employee.department_id == department_id)
+    employee_ids = session.scalars(members).all()
+    timesheet_ids = session.scalars(select(Timesheet.id).where(Timesheet.employee_id.in_(members))).all()
+    # Reports outside the department lose their manager; their subtrees'
+    # closure rows still link them to the managers above it.
+    detached_ids = session.scalars(
+        select(Employee.id).where(Employee.reports_to_id.in_(members), Employee.id.not_in(members))
+    ).all()
+
+    # Chunked id lists rather than a subquery: MySQL cannot update employees
+    # while selecting from it.
+    for i in range(0, len(employee_ids), DELETE_CHUNK):
+        session.execute(
+            update(Employee).where(Employee.reports_to_id.in_(employee_ids[i:i + DELETE_CHUNK]))
+            .values(reports_to_id=None).execution_options(synchronize_session=False)
+        )
+    session.execute(
+        update(Employee)
+        .where(Employee.designation_id.in_(select(Designation.id).where(Designation.department_id == department_id)))
+        .values(designation_id=None).execution_options(synchronize_session=False)
+    )
+    logs = select(DailyLog.id).join(Timesheet, Timesheet.id == DailyLog.timesheet_id).where(
+        Timesheet.employee_id.in_(members)
+    )
+    for stmt in (
+        delete(DailyLogChange).where(DailyLogChange.daily_log_id.in_(logs)),
+        delete(DailyLog).where(DailyLog.timesheet_id.in_(select(Timesheet.id).where(Timesheet.employee_id.in_(members)))),
+        delete(Timesheet).where(Timesheet.employee_id.in_(members)),
+        delete(WeeklyProjectHours).where(WeeklyProjectHours.employee_id.in_(members)),
+    ):
+        session.execute(stmt.execution_options(synchronize_session=False))
+    remove_employees_from_closure(session, employee_ids)
+    for stmt in (
+        delete(Employee).where(Employee.department_id == department_id),
+        delete(Designation).where(Designation.department_id == department_id),
+        delete(Department).where(Department.id == department_id),
+    ):
+        session.execute(stmt.execution_options(synchronize_session=False))
+    if detached_ids:
+        reports_to = dict(session.execute(select(Employee.id, Employee.reports_to_id)).all())
+        refresh_closure_subtrees(session, detached_ids, reports_to)
+
+    session.expunge(department)
+    mark_versions_changed(session, {timesheet_version_key(timesheet_id) for timesheet_id in timesheet_ids})
+    invalidate_org_graph_on_commit(session)
+    return True
@@ -0,0 +1,204 @@
+from sqlalchemy import Integer, delete, event, inspect, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from models.employee import Employee
+from models.employee_closure import EmployeeClosure
+
+REBUILD_BATCH_SIZE = 5000
+# Keeps IN lists well below every driver's parameter limit.
+_IN_CHUNK = 1000
+
+
+class HierarchyCycleError(ValueError):
+    """Raised when a manager change would make an employee report to itself."""
+
+    def __init__(self, employee_id, manager_id):
+        super().__init__(f"Employee {employee_id} cannot report to {manager_id}, who is in their own reporting line.")
+        self.employee_id = employee_id
+        self.manager_id = manager_id
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for i in range(0, len(ids), _IN_CHUNK):
+        yield ids[i:i + _IN_CHUNK]
+
+
+def closure_rows(reports_to, employee_ids=None):
+    """Closure rows for ``{employee_id: manager_id}``, including depth-0 self rows.
+
+    ``employee_ids`` limits the result to those descendants. Chains stop at
+    the first repeated id or an unknown manager, so existing cycles produce a
+    finite (if odd) closure instead of looping.
+    """
+    rows = []
+    for employee_id in (reports_to if employee_ids is None else employee_ids):
+        rows.append({'ancestor_id': employee_id, 'descendant_id': employee_id, 'depth': 0})
+        seen = {employee_id}
+        current = reports_to[employee_id]
+        depth = 1
+        while current is not None and current not in seen and current in reports_to:
+            rows.append({'ancestor_id': current, 'descendant_id': employee_id, 'depth': depth})
+            seen.add(current)
+            current = reports_to[current]
+            depth += 1
+    return rows
+
+
+def _reports_to(executor):
+    # Core columns, so migrations can run this without every model imported.
+    employees = Employee.__table__
+    return dict(executor.execute(select(employees.c.id, employees.c.reports_to_id)).all())
+
+
+def rebuild_employee_closure(executor):
+    """Recompute the whole closure from ``employees.reports_to_id``; returns rows written."""
+    reports_to = _reports_to(executor)
+    rows = closure_rows(reports_to)
+    closure = EmployeeClosure.__table__
+    executor.execute(delete(closure))
+    for i in range(0, len(rows), REBUILD_BATCH_SIZE):
+        executor.execute(insert(closure), rows[i:i + REBUILD_BATCH_SIZE])
+    return len(rows)
+
+
+def check_employee_closure(executor):
+    """Compare the stored closure with one computed from ``reports_to_id``.
+
+    Returns ``{'missing': [...], 'extra': [...], 'wrong_depth': [...]}`` of
+    ``(ancestor_id, descendant_id, depth)`` tuples; all empty means consistent.
+    For ``wrong_depth`` the stored depth is reported.
+    """
+    reports_to = _reports_to(executor)
+    expected = {(r['ancestor_id'], r['descendant_id']): r['depth'] for r in closure_rows(reports_to)}
+    closure = EmployeeClosure.__table__
+    stored = {
+        (row.ancestor_id, row.descendant_id): row.depth
+        for row in executor.execute(select(closure.c.ancestor_id, closure.c.descendant_id, closure.c.depth))
+    }
+    return {
+        'missing': sorted((a, d, depth) for (a, d), depth in expected.items() if (a, d) not in stored),
+        'extra': sorted((a, d, depth) for (a, d), depth in stored.items() if (a, d) not in expected),
+        'wrong_depth': sorted(
+            (a, d, depth) for (a, d), depth in stored.items() if (a, d) in expected and expected[(a, d)] != depth
+        ),
+    }
+
+
+# ---------------- Incremental maintenance ----------------
+
+def add_employee_to_closure(executor, employee_id, manager_id):
+    """Closure rows for a new employee, who has no reports of its own yet.
+
+    One ``INSERT ... SELECT``: the depth-0 self row plus the manager's
+    ancestors one level further down. There is no subtree to look up.
+    """
+    closure = EmployeeClosure.__table__
+    employee = literal(employee_id, Integer)
+    rows = select(employee, employee, literal(0, Integer))
+    if manager_id is not None:
+        rows = union_all(rows, select(closure.c.ancestor_id, employee, closure.c.depth + 1)
+                         .where(closure.c.descendant_id == manager_id))
+    executor.execute(insert(closure).from_select(['ancestor_id', 'descendant_id', 'depth'], rows))
+
+
+def move_employee_in_closure(executor, employee_id, manager_id, detach=True):
+    """Re-parent ``employee_id`` and its whole subtree under ``manager_id`` (None for no manager).
+
+    Drops the links between the subtree and its old managers, then links
+    every new manager to every subtree member. Raises
+    :class:`HierarchyCycleError` if ``manager_id`` is inside the subtree.
+    """
+    closure = EmployeeClosure.__table__
+    subtree = executor.execute(
+        select(closure.c.descendant_id, closure.c.depth).where(closure.c.ancestor_id == employee_id)
+    ).all()
+    subtree_ids = [row.descendant_id for row in subtree]
+    if manager_id is not None and manager_id in subtree_ids:
+        raise HierarchyCycleError(employee_id, manager_id)
+
+    if detach:
+        old_managers = executor.execute(
+            select(closure.c.ancestor_id).where(closure.c.descendant_id == employee_id, closure.c.depth > 0)
+        ).scalars().all()
+        for managers in _chunks(old_managers):
+            for members in _chunks(subtree_ids):
+                executor.execute(delete(closure).where(
+                    closure.c.ancestor_id.in_(managers), closure.c.descendant_id.in_(members)
+                ))
+    if manager_id is None:
+        return
+    new_managers = executor.execute(
+        select(closure.c.ancestor_id, closure.c.depth).where(closure.c.descendant_id == manager_id)
+    ).all()
+    rows = [
+        {'ancestor_id': manager.ancestor_id, 'descendant_id': member.descendant_id,
+         'depth': manager.depth + member.depth + 1}
+        for manager in new_managers for member in subtree
+    ]
+    for i in range(0, len(rows), REBUILD_BATCH_SIZE):
+        executor.execute(insert(closure), rows[i:i + REBUILD_BATCH_SIZE])
+
+
+def refresh_closure_subtrees(executor, moved_ids, reports_to):
+    """Recompute the closure below ``moved_ids`` after a set-based manager change.
+
+    ``reports_to`` is the complete ``{employee_id: manager_id}`` map after the
+    change. Only chains that pass through a moved employee can differ, and
+    those are exactly the moved employees' current subtrees, so their rows are
+    deleted and rewritten with a handful of set-based statements. Returns the
+    number of employees whose chains were rewritten.
+    """
+    closure = EmployeeClosure.__table__
+    affected = set(moved_ids)
+    for ids in _chunks(moved_ids):
+        affected.update(executor.execute(
+            select(closure.c.descendant_id).where(closure.c.ancestor_id.in_(ids))
+        ).scalars())
+    for ids in _chunks(affected):
+        executor.execute(delete(closure).where(closure.c.descendant_id.in_(ids)))
+    rows = closure_rows(reports_to, sorted(affected))
+    for i in range(0, len(rows), REBUILD_BATCH_SIZE):
+        executor.execute(insert(closure), rows[i:i + REBUILD_BATCH_SIZE])
+    return len(affected)
+
+
+def remove_employees_from_closure(executor, employee_ids):
+    closure = EmployeeClosure.__table__
+    for ids in _chunks(employee_ids):
+        executor.execute(delete(closure).where(closure.c.descendant_id.in_(ids)))
+        executor.execute(delete(closure).where(closure.c.ancestor_id.in_(ids)))
+
+
+def _managers_first(employees):
+    """Order new employees so a manager created in the same flush comes before its reports."""
+    pending = {emp.id: emp for emp in employees}
+    ordered = []
+    while pending:
+        ready = [emp for emp in pending.values() if emp.reports_to_id not in pending]
+        if not ready:  # a cycle among the new rows; attach them in id order
+            ready = sorted(pending.values(), key=lambda emp: emp.id)[:1]
+        for emp in ready:
+            ordered.append(emp)
+            del pending[emp.id]
+    return ordered
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_employee_closure(session, flush_context):
+    added = [obj for obj in session.new if isinstance(obj, Employee)]
+    removed = [obj for obj in session.deleted if isinstance(obj, Employee)]
+    moved = [
+        obj for obj in session.dirty
+        if isinstance(obj, Employee) and inspect(obj).attrs.reports_to_id.history.has_changes()
+    ]
+    if not (added or removed or moved):
+        return
+
+    connection = session.connection()
+    for obj in _managers_first(added):
+        add_employee_to_closure(connection, obj.id, obj.reports_to_id)
+    for obj in sorted(moved, key=lambda emp: emp.id):
+        if obj not in removed:
+            move_employee_in_closure(connection, obj.id, obj.reports_to_id)
+    if removed:
+        remove_employees_from_closure(connection, [obj.id for obj in removed])
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from sqlalchemy import select
+from models.dailylogs import DailyLog
+from models.timesheet import Timesheet
+from models.employee import Employee
+from models.project import Project
+
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    'log_id', 'log_date', 'start_time', 'end_time', 'total_hours', 'task_description',
+    'project_id', 'project_name', 'timesheet_id', 'timesheet_start', 'timesheet_end',
+    'employee_id', 'employee_name', 'email', 'department_id',
+]
+
+
+def _export_statement(start_date, end_date, employee_id=None):
+    stmt = (
+        select(
+            DailyLog.id.label('log_id'), DailyLog.log_date, DailyLog.start_time, DailyLog.end_time,
+            DailyLog.total_hours, DailyLog.task_description, DailyLog.project_id,
+            Project.name.label('project_name'), DailyLog.timesheet_id,
+            Timesheet.start_date.label('timesheet_start'), Timesheet.end_date.label('timesheet_end'),
+            Employee.id.label('employee_id'), Employee.employee_name, Employee.email, Employee.department_id,
+        )
+        .join(Timesheet, Timesheet.id == DailyLog.timesheet_id)
+        .join(Employee, Employee.id == Timesheet.employee_id)
+        .outerjoin(Project, Project.id == DailyLog.project_id)
+        .where(DailyLog.log_date >= start_date, DailyLog.log_date <= end_date)
+        .order_by(DailyLog.log_date, DailyLog.id)
+    )
+    if employee_id:
+        stmt = stmt.where(Employee.id == employee_id)
+    return stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+
+
+def _plain(row):
+    data = row._asdict()
+    for key in ('log_date', 'timesheet_start', 'timesheet_end'):
+        data[key] = data[key].isoformat()
+    for key in ('start_time', 'end_time'):
+        data[key] = data[key].strftime('%H:%M')
+    return data
+
+
+def iter_export_rows(session, start_date, end_date, employee_id=None):
+    """Yield joined daily-log rows as dicts from a server-side cursor."""
+    result = session.execute(_export_statement(start_date, end_date, employee_id))
+    for row in result:
+        yield _plain(row)
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + '\n'
+
+
+def iter_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        # Emit ~64KB chunks rather than one tiny chunk per row.
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
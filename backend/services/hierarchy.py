@@ -0,0 +1,87 @@
+import logging
+from sqlalchemy import select
+from models.employee import Employee
+from models.employee_closure import EmployeeClosure
+
+# Upper bound on reporting-chain length; also stops runaway recursion on cycles.
+MAX_CHAIN_DEPTH = 64
+
+hierarchy_log = logging.getLogger('tms.hierarchy')
+
+
+# ---------------- Subtrees (manager -> all direct and indirect reports) ----------------
+
+def _subtree_rows(session, root_id, columns, max_depth):
+    emp = Employee.__table__
+    columns = list(dict.fromkeys(['id', 'reports_to_id', *columns]))
+    query = (
+        select(*[emp.c[name] for name in columns], EmployeeClosure.depth)
+        .join(EmployeeClosure, EmployeeClosure.descendant_id == emp.c.id)
+        .where(EmployeeClosure.ancestor_id == root_id, EmployeeClosure.depth <= max_depth)
+        .order_by(EmployeeClosure.depth, emp.c.id)
+    )
+    return [row._asdict() for row in session.execute(query)]
+
+
+def get_subtree(session, root_id, columns=('id', 'employee_name', 'email', 'reports_to_id'),
+                max_depth=MAX_CHAIN_DEPTH):
+    """Return ``root_id`` and everyone below it as dicts with a ``depth`` key.
+
+    One indexed lookup on ``employee_closure``. The root has depth 0 and rows
+    are ordered by depth, then id. Returns ``[]`` when ``root_id`` does not exist.
+    """
+    return load_subtree(session, root_id, columns, max_depth, probe=False)['rows']
+
+
+def load_subtree(session, root_id, columns=('id', 'employee_name', 'email', 'reports_to_id'),
+                 max_depth=MAX_CHAIN_DEPTH, probe=True):
+    """Like :func:`get_subtree`, plus what the walk ran into.
+
+    Returns ``{'rows', 'cycle_ids', 'truncated_ids'}``: ``cycle_ids`` are
+    employees whose ``reports_to_id`` closes a loop inside the subtree,
+    ``truncated_ids`` are employees at ``max_depth`` that have reports of
+    their own. The latter is found by reading one level deeper in the same
+    query (``probe``).
+    """
+    rows, truncated_ids = [], set()
+    for row in _subtree_rows(session, root_id, columns, max_depth + 1 if probe else max_depth):
+        if row['depth'] > max_depth:
+            truncated_ids.add(row['reports_to_id'])
+        else:
+            rows.append(row)
+    depths = {row['id']: row['depth'] for row in rows}
+    # A manager inside the subtree that is not one level up can only be a loop back.
+    cycle_ids = [
+        row['id'] for row in rows
+        if row['reports_to_id'] in depths and depths[row['reports_to_id']] != row['depth'] - 1
+    ]
+    return {'rows': rows, 'cycle_ids': cycle_ids, 'truncated_ids': truncated_ids}
+
+
+def nest_subtree(rows, make_node=dict, children_key='subordinates'):
+    """Nest depth-ordered subtree rows into ``{..., children_key: [...]}`` dicts.
+
+    Built in one pass without recursion: every row's manager appears before
+    it, so each node is appended to its already created parent. A row whose
+    manager is not in the subtree (a closure row out of step with
+    ``reports_to_id``) is logged and attached to the root. Returns the root
+    node, or None for no rows.
+    """
+    nodes = {}
+    root = None
+    for row in rows:
+        node = make_node(row)
+        node[children_key] = []
+        nodes[row['id']] = node
+        if root is None:
+            root = node
+            continue
+        parent = nodes.get(row['reports_to_id'])
+        if parent is None:
+            hierarchy_log.warning(
+                "Employee %s is in the closure subtree but reports to %s, who is not; check employee_closure.",
+                row['id'], row['reports_to_id'],
+            )
+            parent = root
+        parent[children_key].append(node)
+    return root
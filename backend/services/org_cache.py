@@ -0,0 +1,162 @@
+import threading
+import time
+from itertools import chain
+from flask import g, has_request_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from config.config import ORG_CACHE_TTL_SECONDS
+from models.employee import Employee, normalize_email
+from models.department import Department
+from models.designation import Designation
+from services.hierarchy import MAX_CHAIN_DEPTH
+from services.table_versions import get_table_versions, mark_versions_changed
+from utils.request_session import db_session
+from utils.session_manager import get_session
+from utils.helpers import safe_close
+
+_ORG_MODELS = (Employee, Department, Designation)
+# table_versions row bumped with every org write, so all worker processes
+# agree on the version and reload their graph when it moves.
+ORG_VERSION_KEY = 'org'
+
+
+class OrgGraph:
+    """Immutable snapshot of employees, departments and designations with adjacency maps."""
+
+    def __init__(self, employees, departments, designations, version):
+        self.employees = employees
+        self.departments = departments
+        self.designations = designations
+        self.version = version
+        self.subordinates = {}
+        self.by_email = {}
+        for emp in employees.values():
+            self.subordinates.setdefault(emp['reports_to_id'], []).append(emp['id'])
+            self.by_email[emp['email_normalized']] = emp['id']
+
+    def find_by_email(self, email):
+        emp_id = self.by_email.get(normalize_email(email))
+        return self.employees.get(emp_id)
+
+    def manager_chain(self, employee_id):
+        """Ancestor ids, nearest manager first, cut at the first repeated id."""
+        seen = {employee_id}
+        result = []
+        current = self.employees.get(employee_id, {}).get('reports_to_id')
+        while current is not None and current not in seen and len(result) < MAX_CHAIN_DEPTH:
+            if current not in self.employees:
+                break
+            seen.add(current)
+            result.append(current)
+            current = self.employees[current]['reports_to_id']
+        return result
+
+    def department_dict(self, department_id):
+        dept = self.departments.get(department_id)
+        return dict(dept) if dept else None
+
+    def designation_dict(self, designation_id):
+        des = self.designations.get(designation_id)
+        return {'id': des['id'], 'title': des['title']} if des else None
+
+    def employee_dict(self, employee_id):
+        """Same shape as ``Employee.as_dict``."""
+        emp = self.employees[employee_id]
+        data = {k: v for k, v in emp.items() if k != 'email_normalized'}
+        manager = self.employees.get(emp['reports_to_id'])
+        if manager:
+            data['reports_to'] = manager['employee_name']
+        return data
+
+
+_lock = threading.Lock()
+_graph = None
+_loaded_at = 0.0
+
+
+def _load(session, version):
+    def rows(model):
+        return {row.id: row._asdict() for row in session.execute(select(*model.__table__.columns))}
+
+    return OrgGraph(rows(Employee), rows(Department), rows(Designation), version)
+
+
+def _stored_version(session):
+    return get_table_versions(session, [ORG_VERSION_KEY])[ORG_VERSION_KEY]
+
+
+def _graph_at(version):
+    """The cached graph, reloaded first if it is older than ``version`` or past its TTL."""
+    global _graph, _loaded_at
+
+    def current(graph):
+        return (graph is not None and graph.version >= version
+                and time.monotonic() - _loaded_at < ORG_CACHE_TTL_SECONDS)
+
+    graph = _graph
+    if current(graph):
+        return graph
+    with _lock:
+        if current(_graph):
+            return _graph
+        session = get_session()
+        try:
+            _graph = _load(session, version)
+        finally:
+            safe_close(session)
+        _loaded_at = time.monotonic()
+        return _graph
+
+
+def get_org_graph():
+    """Return the current org graph, loading it on first use or when the org changed.
+
+    The stored org version is read once per request (one primary-key lookup)
+    and the graph is reloaded when another process has committed a newer one.
+    """
+    if has_request_context():
+        if 'org_graph' not in g:
+            g.org_graph = _graph_at(get_org_version())
+        return g.org_graph
+    return _graph_at(get_org_version())
+
+
+def get_org_version():
+    """The committed org version, shared by every worker process."""
+    if has_request_context():
+        return _stored_version(db_session())
+    session = get_session()
+    try:
+        return _stored_version(session)
+    finally:
+        safe_close(session)
+
+
+def invalidate_org_graph():
+    """Drop this process's cached graph; the stored version is bumped by the commit itself."""
+    global _graph
+    with _lock:
+        _graph = None
+
+
+def invalidate_org_graph_on_commit(session):
+    """Drop the cached graph once ``session`` commits; for set-based writes the flush listener cannot see."""
+    session.info['org_graph_dirty'] = True
+    mark_versions_changed(session, [ORG_VERSION_KEY])
+
+
+@event.listens_for(Session, 'after_flush')
+def _flag_org_changes(session, flush_context):
+    if any(isinstance(obj, _ORG_MODELS) for obj in chain(session.new, session.dirty, session.deleted)):
+        invalidate_org_graph_on_commit(session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    if session.info.pop('org_graph_dirty', False):
+        invalidate_org_graph()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop('org_graph_dirty', None)
@@ -0,0 +1,123 @@
+from sqlalchemy import case, select, update
+from models.employee import Employee
+from services.employee_closure import refresh_closure_subtrees
+from services.org_cache import invalidate_org_graph_on_commit
+
+# Moves accepted per request; larger reorgs are split by the client.
+MAX_MOVES = 1000
+# Rows per ``UPDATE ... SET reports_to_id = CASE id ...`` statement.
+UPDATE_CHUNK = 500
+
+
+class ReassignmentError(Exception):
+    """Raised when a batch of manager changes is rejected; ``errors`` lists every problem found."""
+
+    def __init__(self, errors, status_code=400):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+        self.status_code = status_code
+
+
+def _parse_moves(moves):
+    parsed, errors = [], []
+    if not isinstance(moves, list) or not moves:
+        raise ReassignmentError(['Expected a non-empty list of moves.'])
+    if len(moves) > MAX_MOVES:
+        raise ReassignmentError([f'At most {MAX_MOVES} moves per request.'])
+    for index, move in enumerate(moves):
+        if not isinstance(move, dict) or 'employee_id' not in move or 'manager_id' not in move:
+            errors.append(f'Move {index}: employee_id and manager_id are required (manager_id may be null).')
+            continue
+        try:
+            employee_id = int(move['employee_id'])
+            manager_id = None if move['manager_id'] is None else int(move['manager_id'])
+        except (TypeError, ValueError):
+            errors.append(f'Move {index}: employee_id and manager_id must be integers.')
+            continue
+        parsed.append((index, employee_id, manager_id))
+    if errors:
+        raise ReassignmentError(errors)
+    return parsed
+
+
+def find_cycles(reports_to, start_ids):
+    """Return the cycles reachable from ``start_ids`` in ``{employee_id: manager_id}``.
+
+    Walks up from each start and stops at an employee already cleared by an
+    earlier walk, so every employee is visited at most once overall.
+    """
+    cleared = set()
+    cycles = []
+    for start in start_ids:
+        path, position = [], {}
+        current = start
+        while current is not None and current not in cleared and current not in position:
+            position[current] = len(path)
+            path.append(current)
+            current = reports_to.get(current)
+        if current is not None and current in position:
+            cycles.append(path[position[current]:])
+        cleared.update(path)
+    return cycles
+
+
+def reassign_managers(session, moves):
+    """Apply a batch of ``{'employee_id', 'manager_id'}`` moves in the caller's transaction.
+
+    The whole org's manager links are read in one query and the batch is
+    validated against them: unknown ids, an employee moved twice, and cycles
+    in the resulting hierarchy are all reported together. Valid batches are
+    written with set-based UPDATEs and the closure is refreshed below the
+    moved employees. Returns ``{'moved': [...], 'unchanged': [...], 'affected': n}``.
+    """
+    parsed = _parse_moves(moves)
+    employees = {
+        row.id: row for row in session.execute(select(Employee.id, Employee.employee_name, Employee.reports_to_id))
+    }
+    errors, seen = [], {}
+    for index, employee_id, manager_id in parsed:
+        if employee_id not in employees:
+            errors.append(f'Move {index}: employee {employee_id} not found.')
+        if manager_id is not None and manager_id not in employees:
+            errors.append(f'Move {index}: manager {manager_id} not found.')
+        if employee_id == manager_id:
+            errors.append(f'Move {index}: employee {employee_id} cannot report to themselves.')
+        if employee_id in seen:
+            errors.append(f'Move {index}: employee {employee_id} is already moved by move {seen[employee_id]}.')
+        seen.setdefault(employee_id, index)
+    if errors:
+        raise ReassignmentError(errors)
+
+    reports_to = {emp_id: row.reports_to_id for emp_id, row in employees.items()}
+    new_managers = {employee_id: manager_id for _, employee_id, manager_id in parsed}
+    reports_to.update(new_managers)
+    cycles = find_cycles(reports_to, list(new_managers))
+    if cycles:
+        raise ReassignmentError([
+            'Cycle: ' + ' -> '.join(str(emp_id) for emp_id in cycle + cycle[:1]) for cycle in cycles
+        ])
+
+    moved = [employee_id for employee_id, manager_id in new_managers.items()
+             if employees[employee_id].reports_to_id != manager_id]
+    moved_set = set(moved)
+    for i in range(0, len(moved), UPDATE_CHUNK):
+        chunk = moved[i:i + UPDATE_CHUNK]
+        session.execute(
+            update(Employee).where(Employee.id.in_(chunk))
+            .values(reports_to_id=case({emp_id: new_managers[emp_id] for emp_id in chunk}, value=Employee.id))
+            .execution_options(synchronize_session=False)
+        )
+    affected = refresh_closure_subtrees(session, moved, reports_to) if moved else 0
+    if moved:
+        invalidate_org_graph_on_commit(session)
+
+    return {
+        'moved': [{
+            'employee_id': employee_id,
+            'employee_name': employees[employee_id].employee_name,
+            'from_manager_id': employees[employee_id].reports_to_id,
+            'to_manager_id': new_managers[employee_id],
+        } for employee_id in moved],
+        'unchanged': [employee_id for employee_id in new_managers if employee_id not in moved_set],
+        'affected': affected,
+    }
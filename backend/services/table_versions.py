@@ -0,0 +1,119 @@
+from itertools import chain
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models.dailylogs import DailyLog
+from models.table_version import TableVersion
+from models.timesheet import Timesheet
+
+# Tables whose GET endpoints answer conditional requests.
+VERSIONED_TABLES = ('projects', 'departments', 'designations')
+
+
+def timesheet_version_key(timesheet_id):
+    """Daily logs are versioned per timesheet, so a save only touches its own row and ETags."""
+    return f'timesheet:{timesheet_id}'
+
+
+def get_table_versions(session, tables):
+    """``{table_name: version}`` for ``tables`` in one query; unknown tables are 0.
+
+    Besides table names, ``tables`` may hold other version keys such as
+    :func:`timesheet_version_key`.
+    """
+    rows = session.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+    )
+    versions = dict.fromkeys(tables, 0)
+    versions.update(dict(rows.all()))
+    return versions
+
+
+def mark_versions_changed(session, keys):
+    """Bump the version ``keys`` once ``session`` commits (not on rollback)."""
+    if keys:
+        session.info.setdefault('changed_tables', set()).update(keys)
+
+
+def mark_tables_changed(session, tables):
+    """Record writes the listeners below cannot see (e.g. raw SQL via ``text()``)."""
+    mark_versions_changed(session, {table for table in tables if table in VERSIONED_TABLES})
+
+
+def _upsert_statement(dialect_name):
+    table = TableVersion.__table__
+    if dialect_name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        return mysql_insert(table).on_duplicate_key_update(version=table.c.version + 1)
+    if dialect_name in ('sqlite', 'postgresql'):
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert(table).on_conflict_do_update(
+            index_elements=['table_name'], set_={'version': table.c.version + 1}
+        )
+    return None
+
+
+def bump_table_versions(executor, tables):
+    """Increment the version of each of ``tables``; ``executor`` is a Session or Connection.
+
+    One upsert executemany for all keys, so a missing row is created without
+    racing a concurrent writer.
+    """
+    rows = [{'table_name': table, 'version': 1} for table in sorted(tables)]
+    if not rows:
+        return
+    dialect = executor.dialect if isinstance(executor, Connection) else executor.get_bind().dialect
+    stmt = _upsert_statement(dialect.name)
+    if stmt is not None:
+        executor.execute(stmt, rows)
+        return
+    for row in rows:
+        result = executor.execute(
+            update(TableVersion).where(TableVersion.table_name == row['table_name'])
+            .values(version=TableVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            executor.execute(insert(TableVersion).values(**row))
+
+
+def _version_keys(obj):
+    if isinstance(obj, DailyLog):
+        # A log moved to another timesheet changes both timesheets.
+        history = inspect(obj).attrs.timesheet_id.history
+        return {timesheet_version_key(ts_id) for ts_id in chain(history.sum(), [obj.timesheet_id]) if ts_id is not None}
+    if isinstance(obj, Timesheet):
+        return {timesheet_version_key(obj.id)}
+    table = getattr(obj, '__table__', None)
+    return {table.name} if table is not None and table.name in VERSIONED_TABLES else set()
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_orm_writes(session, flush_context):
+    written = chain(session.new, session.deleted, (obj for obj in session.dirty if session.is_modified(obj)))
+    mark_versions_changed(session, set().union(*map(_version_keys, written)))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_statement_writes(orm_execute_state):
+    # Set-based daily_logs writes name their timesheets themselves; see
+    # services/daily_log_batch.py.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mark_tables_changed(orm_execute_state.session, {orm_execute_state.statement.table.name})
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_on_commit(session):
+    # Flush first so changes still pending at commit time are counted too.
+    session.flush()
+    tables = session.info.pop('changed_tables', None)
+    if tables:
+        # Bumped last, so the version rows are locked only for the commit itself.
+        bump_table_versions(session, tables)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop('changed_tables', None)
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from sqlalchemy import select, func
+from models.dailylogs import DailyLog
+from models.project import Project
+from models.timesheet import Timesheet
+from models.weekly_hours import WeeklyProjectHours, NO_PROJECT
+from services.hierarchy import get_subtree
+from services.weekly_hours import week_start as monday_of
+
+# Timesheet status for the requested week
+STATUS_MISSING = 'missing'        # no timesheet overlaps the week
+STATUS_EMPTY = 'empty'            # timesheet created, nothing logged yet
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_COMPLETE = 'complete'      # at least WORKING_DAYS distinct days logged
+
+WORKING_DAYS = 5
+
+
+def _timesheet_summaries(session, employee_ids, start, end):
+    """One grouped query: each employee's timesheets overlapping the week with log counts."""
+    result = session.execute(
+        select(
+            Timesheet.employee_id, Timesheet.id, Timesheet.start_date, Timesheet.end_date,
+            func.count(DailyLog.id).label('log_count'),
+            func.count(func.distinct(DailyLog.log_date)).label('days_logged'),
+        )
+        .outerjoin(DailyLog, (DailyLog.timesheet_id == Timesheet.id)
+                   & (DailyLog.log_date >= start) & (DailyLog.log_date <= end))
+        .where(Timesheet.employee_id.in_(employee_ids),
+               Timesheet.start_date <= end, Timesheet.end_date >= start)
+        .group_by(Timesheet.employee_id, Timesheet.id, Timesheet.start_date, Timesheet.end_date)
+        .order_by(Timesheet.employee_id, Timesheet.start_date)
+    )
+    summaries = {}
+    for row in result:
+        summary = summaries.setdefault(row.employee_id, {'timesheets': [], 'log_count': 0, 'days_logged': 0})
+        summary['timesheets'].append({
+            'id': row.id,
+            'start_date': row.start_date.isoformat(),
+            'end_date': row.end_date.isoformat(),
+        })
+        summary['log_count'] += row.log_count
+        summary['days_logged'] += row.days_logged
+    return summaries
+
+
+def _project_hours(session, employee_ids, start):
+    """One query against the weekly rollup: ``{employee_id: [project totals]}``."""
+    result = session.execute(
+        select(WeeklyProjectHours.employee_id, WeeklyProjectHours.project_id, Project.name,
+               WeeklyProjectHours.total_minutes, WeeklyProjectHours.log_count)
+        .outerjoin(Project, Project.id == WeeklyProjectHours.project_id)
+        .where(WeeklyProjectHours.employee_id.in_(employee_ids), WeeklyProjectHours.week_start == start)
+        .order_by(WeeklyProjectHours.employee_id, WeeklyProjectHours.project_id)
+    )
+    hours = {}
+    for row in result:
+        hours.setdefault(row.employee_id, []).append({
+            'project_id': None if row.project_id == NO_PROJECT else row.project_id,
+            'project_name': row.name,
+            'total_minutes': row.total_minutes,
+            'log_count': row.log_count,
+        })
+    return hours
+
+
+def _status(summary):
+    if summary is None:
+        return STATUS_MISSING
+    if not summary['log_count']:
+        return STATUS_EMPTY
+    return STATUS_COMPLETE if summary['days_logged'] >= WORKING_DAYS else STATUS_IN_PROGRESS
+
+
+def _hours(minutes):
+    return round(minutes / 60, 2)
+
+
+def team_dashboard(session, manager_id, day):
+    """Timesheet status and hours by project for every report under ``manager_id``.
+
+    Uses three queries regardless of team size: the subtree, the grouped
+    timesheet/log counts and the weekly rollup. Returns None when the manager
+    does not exist.
+    """
+    start = monday_of(day)
+    end = start + timedelta(days=6)
+    subtree = get_subtree(session, manager_id)
+    if not subtree:
+        return None
+    members = subtree[1:]
+    employee_ids = [member['id'] for member in members]
+    summaries = _timesheet_summaries(session, employee_ids, start, end) if employee_ids else {}
+    project_hours = _project_hours(session, employee_ids, start) if employee_ids else {}
+
+    team_projects = {}
+    status_counts = {}
+    team_minutes = 0
+    rows = []
+    for member in members:
+        summary = summaries.get(member['id'])
+        projects = project_hours.get(member['id'], [])
+        minutes = sum(p['total_minutes'] for p in projects)
+        status = _status(summary)
+        status_counts[status] = status_counts.get(status, 0) + 1
+        team_minutes += minutes
+        for p in projects:
+            total = team_projects.setdefault(p['project_id'], {
+                'project_id': p['project_id'], 'project_name': p['project_name'],
+                'total_minutes': 0, 'log_count': 0,
+            })
+            total['total_minutes'] += p['total_minutes']
+            total['log_count'] += p['log_count']
+        rows.append({
+            'id': member['id'],
+            'employee_name': member['employee_name'],
+            'email': member['email'],
+            'reports_to': member['reports_to_id'],
+            'depth': member['depth'],
+            'status': status,
+            'timesheets': summary['timesheets'] if summary else [],
+            'days_logged': summary['days_logged'] if summary else 0,
+            'total_hours': _hours(minutes),
+            'projects': [
+                {'project_id': p['project_id'], 'project_name': p['project_name'],
+                 'total_hours': _hours(p['total_minutes']), 'log_count': p['log_count']}
+                for p in projects
+            ],
+        })
+
+    return {
+        'manager_id': manager_id,
+        'week_start': start.isoformat(),
+        'week_end': end.isoformat(),
+        'members': rows,
+        'totals': {
+            'members': len(rows),
+            'total_hours': _hours(team_minutes),
+            'status_counts': status_counts,
+            'by_project': [
+                {'project_id': t['project_id'], 'project_name': t['project_name'],
+                 'total_hours': _hours(t['total_minutes']), 'log_count': t['log_count']}
+                for t in sorted(team_projects.values(), key=lambda t: -t['total_minutes'])
+            ],
+        },
+    }
@@ -0,0 +1,202 @@
+from collections import defaultdict
+from datetime import timedelta
+from sqlalchemy import delete, event, inspect, select, update, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from models.dailylogs import DailyLog
+from models.timesheet import Timesheet
+from models.weekly_hours import WeeklyProjectHours, NO_PROJECT
+
+REBUILD_BATCH_SIZE = 5000
+
+_ROLLUP_KEYS = ('employee_id', 'week_start', 'project_id')
+_TRACKED = ('timesheet_id', 'log_date', 'project_id', 'start_time', 'end_time')
+
+
+def week_start(day):
+    """Monday of the week containing ``day``."""
+    return day - timedelta(days=day.weekday())
+
+
+def log_minutes(start_time, end_time):
+    """Worked minutes between two times; an end before the start wraps past midnight."""
+    minutes = (end_time.hour * 60 + end_time.minute) - (start_time.hour * 60 + start_time.minute)
+    return minutes + 24 * 60 if minutes < 0 else minutes
+
+
+class WeeklyDeltas:
+    """Accumulates signed (minutes, count) changes per rollup key."""
+
+    def __init__(self):
+        self.changes = defaultdict(lambda: [0, 0])
+
+    def add(self, employee_id, log_date, project_id, start_time, end_time, sign=1):
+        key = (employee_id, week_start(log_date), project_id or NO_PROJECT)
+        change = self.changes[key]
+        change[0] += sign * log_minutes(start_time, end_time)
+        change[1] += sign
+
+    def rows(self):
+        return [
+            dict(zip(_ROLLUP_KEYS, key), total_minutes=minutes, log_count=count)
+            for key, (minutes, count) in self.changes.items()
+            if minutes or count
+        ]
+
+
+def _dialect(executor):
+    return executor.dialect if isinstance(executor, Connection) else executor.get_bind().dialect
+
+
+def _upsert_statement(dialect_name):
+    table = WeeklyProjectHours.__table__
+    if dialect_name in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table)
+        return stmt.on_duplicate_key_update(
+            total_minutes=table.c.total_minutes + stmt.inserted.total_minutes,
+            log_count=table.c.log_count + stmt.inserted.log_count,
+        )
+    if dialect_name in ('sqlite', 'postgresql'):
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        stmt = dialect_insert(table)
+        return stmt.on_conflict_do_update(
+            index_elements=list(_ROLLUP_KEYS),
+            set_={
+                'total_minutes': table.c.total_minutes + stmt.excluded.total_minutes,
+                'log_count': table.c.log_count + stmt.excluded.log_count,
+            },
+        )
+    return None
+
+
+def apply_weekly_deltas(executor, deltas):
+    """Add ``deltas`` to the rollup in the caller's transaction.
+
+    One upsert executemany for all keys, plus a cleanup of emptied rows when
+    anything was subtracted. ``executor`` is a Session or Connection.
+    """
+    rows = deltas.rows()
+    if not rows:
+        return
+    table = WeeklyProjectHours.__table__
+    stmt = _upsert_statement(_dialect(executor).name)
+    if stmt is not None:
+        executor.execute(stmt, rows)
+    else:
+        for row in rows:
+            key = [table.c[name] == row[name] for name in _ROLLUP_KEYS]
+            result = executor.execute(
+                update(table).where(*key).values(
+                    total_minutes=table.c.total_minutes + row['total_minutes'],
+                    log_count=table.c.log_count + row['log_count'],
+                )
+            )
+            if result.rowcount == 0:
+                executor.execute(insert(table), [row])
+    if any(row['log_count'] < 0 for row in rows):
+        executor.execute(
+            delete(table).where(
+                table.c.employee_id.in_({row['employee_id'] for row in rows}),
+                table.c.log_count <= 0,
+            )
+        )
+
+
+def rebuild_weekly_hours(executor, employee_ids=None):
+    """Recompute the rollup from ``daily_logs`` (all employees, or only ``employee_ids``).
+
+    Logs are streamed and folded in memory, so this works on any dialect.
+    Returns the number of rollup rows written.
+    """
+    table = WeeklyProjectHours.__table__
+    clear = delete(table)
+    source = (
+        select(Timesheet.employee_id, DailyLog.log_date, DailyLog.project_id,
+               DailyLog.start_time, DailyLog.end_time)
+        .join(Timesheet, Timesheet.id == DailyLog.timesheet_id)
+        .execution_options(stream_results=True, yield_per=REBUILD_BATCH_SIZE)
+    )
+    if employee_ids is not None:
+        clear = clear.where(table.c.employee_id.in_(employee_ids))
+        source = source.where(Timesheet.employee_id.in_(employee_ids))
+
+    deltas = WeeklyDeltas()
+    for row in executor.execute(source):
+        deltas.add(row.employee_id, row.log_date, row.project_id, row.start_time, row.end_time)
+    executor.execute(clear)
+    rows = deltas.rows()
+    for i in range(0, len(rows), REBUILD_BATCH_SIZE):
+        executor.execute(insert(table), rows[i:i + REBUILD_BATCH_SIZE])
+    return len(rows)
+
+
+def weekly_hours_report(session, start_date, end_date, employee_ids=None, project_id=None):
+    """Rollup rows whose week starts in ``[week_start(start_date), end_date]``."""
+    query = session.query(WeeklyProjectHours).filter(
+        WeeklyProjectHours.week_start >= week_start(start_date),
+        WeeklyProjectHours.week_start <= end_date,
+    )
+    if employee_ids is not None:
+        query = query.filter(WeeklyProjectHours.employee_id.in_(employee_ids))
+    if project_id is not None:
+        query = query.filter(WeeklyProjectHours.project_id == project_id)
+    query = query.order_by(
+        WeeklyProjectHours.employee_id, WeeklyProjectHours.week_start, WeeklyProjectHours.project_id
+    )
+    return [row.as_dict() for row in query]
+
+
+# ---------------- ORM writes ----------------
+# The batch save path issues Core statements and applies its own deltas; these
+# listeners cover DailyLog objects added, changed or deleted through a session.
+
+def _old_value(obj, key):
+    history = inspect(obj).attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, key)
+
+
+def _timesheet_employees(session, connection, timesheet_ids):
+    known = {}
+    for obj in list(session.identity_map.values()) + list(session.deleted) + list(session.new):
+        if isinstance(obj, Timesheet) and obj.id in timesheet_ids:
+            known[obj.id] = obj.employee_id
+    missing = set(timesheet_ids) - set(known)
+    if missing:
+        result = connection.execute(
+            select(Timesheet.id, Timesheet.employee_id).where(Timesheet.id.in_(missing))
+        )
+        known.update({row.id: row.employee_id for row in result})
+    return known
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_weekly_hours(session, flush_context):
+    added = [obj for obj in session.new if isinstance(obj, DailyLog)]
+    removed = [obj for obj in session.deleted if isinstance(obj, DailyLog)]
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, DailyLog) and any(inspect(obj).attrs[key].history.has_changes() for key in _TRACKED)
+    ]
+    if not (added or removed or changed):
+        return
+
+    entries = []
+    for obj in added + changed:
+        entries.append((1, obj.timesheet_id, obj.log_date, obj.project_id, obj.start_time, obj.end_time))
+    for obj in removed + changed:
+        entries.append((-1,) + tuple(_old_value(obj, key) for key in _TRACKED))
+
+    connection = session.connection()
+    employees = _timesheet_employees(session, connection, {entry[1] for entry in entries})
+    deltas = WeeklyDeltas()
+    for sign, timesheet_id, log_date, project_id, start_time, end_time in entries:
+        if employees.get(timesheet_id) is None:
+            continue  # timesheet already gone; a rebuild will square it up
+        deltas.add(employees.get(timesheet_id), log_date, project_id, start_time, end_time, sign)
+    apply_weekly_deltas(connection, deltas)
@@ -0,0 +1,84 @@
+"""Fixtures for the API tests: a scratch SQLite database and a Flask test client.
+
+Run from backend/ with ``python -m pytest``. The database URL and the cache
+backend are set before the app is imported, since config.config reads them
+at import time.
+"""
+import os
+import sys
+import tempfile
+from datetime import date, time
+
+_DB_DIR = tempfile.mkdtemp(prefix='tms-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_DB_DIR, 'test.db')
+os.environ.setdefault('CACHE_BACKEND', 'none')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import MetaData
+from appp import create_app
+from migrate import upgrade
+from models.department import Department
+from models.designation import Designation
+from models.employee import Employee
+from models.project import Project
+from models.timesheet import Timesheet
+from models.dailylogs import DailyLog
+from models.dailylogchanges import DailyLogChange
+from services.org_cache import invalidate_org_graph
+from utils.session_manager import SessionLocal, engine
+
+
+def seed(session):
+    """A small org: Boss <- Mid <- Low in one department, two projects and a week of logs for Low."""
+    department = Department(name='Engineering')
+    designation = Designation(title='Engineer', department=department)
+    session.add_all([department, designation])
+    session.flush()
+    boss = Employee(employee_name='Boss', email='boss@example.com', department=department, designation=designation)
+    session.add(boss)
+    session.flush()
+    mid = Employee(employee_name='Mid', email='mid@example.com', department=department,
+                   designation=designation, reports_to_id=boss.id)
+    session.add(mid)
+    session.flush()
+    low = Employee(employee_name='Low', email='low@example.com', department=department,
+                   designation=designation, reports_to_id=mid.id)
+    p1, p2 = Project(name='Payroll'), Project(name='Portal')
+    session.add_all([low, p1, p2])
+    session.flush()
+    timesheet = Timesheet(employee_id=low.id, start_date=date(2025, 1, 6), end_date=date(2025, 1, 12))
+    session.add(timesheet)
+    session.flush()
+    log = DailyLog(timesheet_id=timesheet.id, project_id=p1.id, log_date=date(2025, 1, 6),
+                   start_time=time(9), end_time=time(11), total_hours=2, task_description='Standup and review')
+    session.add(log)
+    session.flush()
+    session.add(DailyLogChange(daily_log_id=log.id, project_id=p1.id, new_description='Standup'))
+    session.commit()
+    return {
+        'department_id': department.id, 'designation_id': designation.id,
+        'boss_id': boss.id, 'mid_id': mid.id, 'low_id': low.id,
+        'project_id': p1.id, 'timesheet_id': timesheet.id, 'log_id': log.id,
+    }
+
+
+@pytest.fixture
+def ids():
+    """Migrate an empty database, seed it and return the ids of the seeded rows."""
+    existing = MetaData()
+    existing.reflect(engine)
+    existing.drop_all(engine)
+    upgrade(engine)
+    invalidate_org_graph()
+    session = SessionLocal()
+    try:
+        return seed(session)
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(ids):
+    return create_app().test_client()
@@ -0,0 +1,65 @@
+"""Overlap detection for POST /api/daily-logs/save."""
+from services.daily_log_batch import find_overlaps
+
+
+def entry(start, end, batch=True):
+    return {'start': start, 'end': end, 'batch': batch}
+
+
+def log(ids, log_date, start_time, end_time, **extra):
+    return dict({
+        'timesheet_id': ids['timesheet_id'], 'project_id': ids['project_id'], 'log_date': log_date,
+        'start_time': start_time, 'end_time': end_time, 'task_description': 'Work',
+    }, **extra)
+
+
+def test_find_overlaps_pairs_each_entry_with_the_furthest_reaching_one():
+    long, short, late, after = entry(0, 100), entry(10, 20), entry(50, 120), entry(120, 130)
+    assert find_overlaps([after, late, short, long]) == [(long, short), (long, late)]
+
+
+def test_find_overlaps_ignores_touching_ranges_and_stored_pairs():
+    assert find_overlaps([entry(0, 60), entry(60, 120)]) == []
+    assert find_overlaps([entry(0, 60, batch=False), entry(30, 90, batch=False)]) == []
+
+
+def test_overnight_log_overlaps_the_next_day(client, ids):
+    response = client.post('/api/daily-logs/save', json=[log(ids, '2025-01-07', '22:00', '02:00')])
+    assert response.status_code == 200
+    response = client.post('/api/daily-logs/save', json=[log(ids, '2025-01-08', '01:00', '03:00')])
+    assert response.status_code == 409
+
+
+def test_overnight_logs_in_one_batch(client, ids):
+    response = client.post('/api/daily-logs/save', json=[
+        log(ids, '2025-01-08', '01:00', '03:00'),
+        log(ids, '2025-01-07', '23:00', '01:30'),
+    ])
+    assert response.status_code == 409
+    assert response.get_json()['conflicts'] == [{
+        'timesheet_id': ids['timesheet_id'],
+        'log_date': '2025-01-08',
+        'log': {'index': 0, 'log_date': '2025-01-08', 'start_time': '01:00', 'end_time': '03:00'},
+        'overlaps': {'index': 1, 'log_date': '2025-01-07', 'start_time': '23:00', 'end_time': '01:30'},
+    }]
+
+
+def test_conflicts_payload_names_the_stored_log(client, ids):
+    response = client.post('/api/daily-logs/save', json=[log(ids, '2025-01-06', '10:00', '12:00')])
+    assert response.status_code == 409
+    body = response.get_json()
+    assert body['error'] == '1 daily log time range(s) overlap another log on the same timesheet.'
+    assert body['conflicts'] == [{
+        'timesheet_id': ids['timesheet_id'],
+        'log_date': '2025-01-06',
+        'log': {'index': 0, 'log_date': '2025-01-06', 'start_time': '10:00', 'end_time': '12:00'},
+        'overlaps': {'id': ids['log_id'], 'log_date': '2025-01-06', 'start_time': '09:00', 'end_time': '11:00'},
+    }]
+
+
+def test_moving_a_log_clears_its_old_slot(client, ids):
+    response = client.post('/api/daily-logs/save', json=[
+        log(ids, '2025-01-06', '10:00', '12:00', id=ids['log_id']),
+        log(ids, '2025-01-06', '08:00', '10:00'),
+    ])
+    assert response.status_code == 200, response.get_json()
@@ -0,0 +1,87 @@
+"""employee_closure stays consistent with employees.reports_to_id across every kind of write."""
+from sqlalchemy import insert
+from models.department import Department
+from models.employee import Employee
+from models.employee_closure import EmployeeClosure
+from services.employee_closure import check_employee_closure
+from utils.query_budget import assert_query_budget
+from utils.session_manager import SessionLocal, engine
+
+CLEAN = {'missing': [], 'extra': [], 'wrong_depth': []}
+
+
+def closure_problems():
+    with engine.connect() as conn:
+        return check_employee_closure(conn)
+
+
+def test_add_employee(client, ids):
+    response = client.post('/api/employees', json={
+        'employee_name': 'New', 'email': 'new@example.com', 'reports_to': ids['low_id'],
+        'designation_id': ids['designation_id'], 'department_id': ids['department_id'],
+    })
+    assert response.status_code == 201
+    assert closure_problems() == CLEAN
+    assert client.get(f"/api/employees/{ids['boss_id']}/subtree").get_json()['count'] == 4
+
+
+def test_orm_move(client, ids):
+    session = SessionLocal()
+    session.get(Employee, ids['low_id']).reports_to_id = ids['boss_id']
+    session.commit()
+    session.close()
+    assert closure_problems() == CLEAN
+    assert client.get(f"/api/employees/{ids['mid_id']}/subtree").get_json()['count'] == 1
+
+
+def test_orm_delete_detaches_reports(client, ids):
+    session = SessionLocal()
+    session.delete(session.get(Employee, ids['mid_id']))
+    session.commit()
+    assert session.get(Employee, ids['low_id']).reports_to_id is None
+    session.close()
+    assert closure_problems() == CLEAN
+    assert client.get(f"/api/employees/{ids['boss_id']}/subtree").get_json()['count'] == 1
+
+
+def test_bulk_reassign(client, ids):
+    response = client.post('/api/employees/reassign-managers', json=[
+        {'employee_id': ids['mid_id'], 'manager_id': None},
+        {'employee_id': ids['boss_id'], 'manager_id': ids['low_id']},
+    ])
+    assert response.status_code == 200, response.get_json()
+    assert closure_problems() == CLEAN
+    assert client.get(f"/api/employees/{ids['mid_id']}/subtree").get_json()['count'] == 3
+
+
+def test_subtree_survives_a_stray_closure_row(client, ids):
+    # An extra (Boss, Low) row with Mid moved out: Low's manager is missing from Boss's subtree.
+    session = SessionLocal()
+    session.get(Employee, ids['mid_id']).reports_to_id = None
+    session.commit()
+    session.execute(insert(EmployeeClosure).values(ancestor_id=ids['boss_id'], descendant_id=ids['low_id'], depth=2))
+    session.commit()
+    session.close()
+    response = client.get(f"/api/employees/{ids['boss_id']}/subtree")
+    assert response.status_code == 200
+    root = response.get_json()['root']
+    assert [node['id'] for node in root['subordinates']] == [ids['low_id']]
+
+
+def test_department_delete_detaches_reports_outside_it(client, ids):
+    # Boss and Low move to another department, leaving Mid between them in Engineering.
+    session = SessionLocal()
+    operations = Department(name='Operations')
+    session.add(operations)
+    session.flush()
+    for employee_id in (ids['boss_id'], ids['low_id']):
+        session.get(Employee, employee_id).department_id = operations.id
+    session.commit()
+    session.close()
+
+    response = assert_query_budget(client, 'DELETE', f"/api/departments/{ids['department_id']}")
+    assert response.status_code == 200
+    assert closure_problems() == CLEAN
+    subtree = client.get(f"/api/employees/{ids['boss_id']}/subtree?format=flat").get_json()
+    assert [row['id'] for row in subtree['employees']] == [ids['boss_id']]
+    assert client.get(f"/api/employees/{ids['low_id']}/subtree").get_json()['count'] == 1
@@ -0,0 +1,39 @@
+"""import_data.Importer: version stamps bumped after an import."""
+from datetime import date, time
+from sqlalchemy import select
+from import_data import Importer
+from models.dailylogs import DailyLog
+from models.table_version import TableVersion
+from models.timesheet import Timesheet
+from services.table_versions import timesheet_version_key
+from utils.session_manager import SessionLocal, engine
+
+
+def versions():
+    with engine.connect() as conn:
+        return dict(conn.execute(select(TableVersion.table_name, TableVersion.version)).all())
+
+
+def test_only_timesheets_with_imported_logs_are_bumped(ids, tmp_path):
+    session = SessionLocal()
+    other = Timesheet(employee_id=ids['mid_id'], start_date=date(2025, 1, 6), end_date=date(2025, 1, 12))
+    session.add(other)
+    session.flush()
+    session.add(DailyLog(timesheet_id=other.id, project_id=ids['project_id'], log_date=date(2025, 1, 6),
+                         start_time=time(9), end_time=time(10), total_hours=1, task_description='Existing'))
+    session.commit()
+    other_id = other.id
+    session.close()
+    (tmp_path / 'daily_logs.ndjson').write_text(
+        f'{{"id": 100, "timesheet_id": {ids["timesheet_id"]}, "project_id": {ids["project_id"]}, '
+        '"log_date": "2025-01-07", "start_time": "09:00", "end_time": "10:00", '
+        '"total_hours": 1, "task_description": "Imported"}\n'
+    )
+    before = versions()
+
+    Importer(engine, str(tmp_path), log=lambda message: None).run()
+
+    after = versions()
+    imported = timesheet_version_key(ids['timesheet_id'])
+    assert after[imported] == before.get(imported, 0) + 1
+    assert after.get(timesheet_version_key(other_id)) == before.get(timesheet_version_key(other_id))
@@ -0,0 +1,85 @@
+"""Every route that declares a @query_budget stays within it.
+
+Each case is a request on the seeded org from conftest.py that takes the
+route's full path (found rows, accepted writes), so the count is the one
+the budget has to cover.
+"""
+import pytest
+from utils.query_budget import assert_query_budget
+
+WEEK = 'start_date=2025-01-06&end_date=2025-01-12'
+
+# (method, path, request kwargs, expected status); paths are formatted with the seeded ids.
+CASES = [
+    ('GET', '/api/employees/profile-with-hierarchy?email=low@example.com', {}, 200),
+    ('GET', '/api/org/version', {}, 200),
+    ('GET', '/api/projects', {}, 200),
+    ('GET', '/api/projects?limit=1', {}, 200),
+    ('POST', '/api/timesheets', {'json': {
+        'employee_id': '{mid_id}', 'start_date': '2025-01-06', 'end_date': '2025-01-12'}}, 201),
+    ('GET', '/api/timesheets/by-employee-week?employee_id={low_id}&' + WEEK, {}, 200),
+    ('GET', '/api/timesheets/{timesheet_id}/daily-logs', {}, 200),
+    ('POST', '/api/daily-logs/save', {'json': [
+        {'id': '{log_id}', 'timesheet_id': '{timesheet_id}', 'project_id': '{project_id}',
+         'log_date': '2025-01-06', 'start_time': '09:00', 'end_time': '12:00', 'task_description': 'Review'},
+        {'timesheet_id': '{timesheet_id}', 'project_id': '{project_id}',
+         'log_date': '2025-01-07', 'start_time': '09:00', 'end_time': '17:00', 'task_description': 'Build'},
+    ]}, 200),
+    ('GET', '/api/employees/with-details', {}, 200),
+    ('GET', '/api/employees/with-details?limit=2&manager_id={boss_id}', {}, 200),
+    ('POST', '/api/employees', {'json': {
+        'employee_name': 'New', 'email': 'new@example.com', 'reports_to': '{mid_id}',
+        'designation_id': '{designation_id}', 'department_id': '{department_id}'}}, 201),
+    ('POST', '/api/employees/reassign-managers', {'json': [
+        {'employee_id': '{low_id}', 'manager_id': '{boss_id}'}]}, 200),
+    ('GET', '/api/daily-logs/{log_id}/changes', {}, 200),
+    ('GET', '/api/daily-logs/export?' + WEEK, {}, 200),
+    ('GET', '/api/reports/weekly-hours?' + WEEK + '&manager_id={boss_id}', {}, 200),
+    ('GET', '/api/managers/{boss_id}/team-dashboard?week_start=2025-01-06', {}, 200),
+    ('GET', '/api/reports/utilization?' + WEEK + '&manager_id={boss_id}', {}, 200),
+    ('GET', '/api/reports/project-distribution?' + WEEK, {}, 200),
+    ('GET', '/api/reports/weekday-heatmap?' + WEEK, {}, 200),
+    ('GET', '/api/employees/{boss_id}/subtree', {}, 200),
+    ('GET', '/api/departments', {}, 200),
+    ('POST', '/api/departments', {'json': {'name': 'Finance'}}, 201),
+    ('PUT', '/api/departments/{department_id}', {'json': {'name': 'Platform'}}, 200),
+    ('DELETE', '/api/departments/{department_id}', {}, 200),
+    ('GET', '/api/designations', {}, 200),
+    ('POST', '/api/designations', {'json': {'title': 'Analyst'}}, 201),
+    ('PUT', '/api/designations/{designation_id}', {'json': {'title': 'Senior Engineer'}}, 200),
+    ('DELETE', '/api/designations/{designation_id}', {}, 200),
+    ('GET', '/api/health/db-pool', {}, 200),
+    ('GET', '/api/health/ready', {}, 200),
+]
+
+
+def _fill(value, ids):
+    """Replace ``'{name}'`` placeholders in a request body with the seeded ids."""
+    if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
+        return ids[value[1:-1]]
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    return value
+
+
+@pytest.mark.parametrize('method, path, kwargs, status', CASES, ids=[f'{c[0]} {c[1]}' for c in CASES])
+def test_route_within_query_budget(client, ids, method, path, kwargs, status):
+    response = assert_query_budget(client, method, path.format(**ids), **_fill(kwargs, ids))
+    assert response.status_code == status, response.get_data(as_text=True)
+
+
+def test_every_budgeted_route_has_a_case(client, ids):
+    app = client.application
+    budgeted = {
+        (method, rule.endpoint) for rule in app.url_map.iter_rules()
+        if hasattr(app.view_functions[rule.endpoint], 'query_budget')
+        for method in rule.methods - {'HEAD', 'OPTIONS'}
+    }
+    adapter = app.url_map.bind('localhost')
+    covered = {
+        (method, adapter.match(path.format(**ids).split('?', 1)[0], method=method)[0])
+        for method, path, _, _ in CASES
+    }
+    assert budgeted <= covered, sorted(budgeted - covered)
@@ -0,0 +1,67 @@
+"""POST /api/employees/reassign-managers: validation, cycle rejection and the result diff."""
+from services.employee_closure import check_employee_closure
+from services.reassignment import find_cycles
+from utils.session_manager import engine
+
+
+def reassign(client, moves):
+    return client.post('/api/employees/reassign-managers', json=moves)
+
+
+def test_find_cycles_reports_each_loop_once():
+    reports_to = {1: None, 2: 3, 3: 2, 4: 2, 5: 6, 6: 5}
+    assert find_cycles(reports_to, [4, 2, 3, 5, 1]) == [[2, 3], [5, 6]]
+    assert find_cycles(reports_to, [1]) == []
+
+
+def test_cycle_is_rejected_and_nothing_changes(client, ids):
+    response = reassign(client, [{'employee_id': ids['mid_id'], 'manager_id': ids['low_id']}])
+    assert response.status_code == 400
+    assert response.get_json() == {'errors': [f"Cycle: {ids['mid_id']} -> {ids['low_id']} -> {ids['mid_id']}"]}
+    assert client.get(f"/api/employees/{ids['boss_id']}/subtree").get_json()['count'] == 3
+
+
+def test_invalid_moves_are_reported_together(client, ids):
+    response = reassign(client, [
+        {'employee_id': ids['low_id'], 'manager_id': ids['low_id']},
+        {'employee_id': ids['low_id'], 'manager_id': ids['boss_id']},
+        {'employee_id': 999, 'manager_id': 998},
+        {'employee_id': ids['mid_id']},
+    ])
+    assert response.status_code == 400
+    assert response.get_json() == {'errors': [
+        'Move 3: employee_id and manager_id are required (manager_id may be null).',
+    ]}
+    response = reassign(client, [
+        {'employee_id': ids['low_id'], 'manager_id': ids['low_id']},
+        {'employee_id': ids['low_id'], 'manager_id': ids['boss_id']},
+        {'employee_id': 999, 'manager_id': 998},
+    ])
+    assert response.status_code == 400
+    assert response.get_json() == {'errors': [
+        f"Move 0: employee {ids['low_id']} cannot report to themselves.",
+        f"Move 1: employee {ids['low_id']} is already moved by move 0.",
+        'Move 2: employee 999 not found.',
+        'Move 2: manager 998 not found.',
+    ]}
+
+
+def test_result_lists_moved_and_unchanged_and_refreshes_the_closure(client, ids):
+    response = reassign(client, [
+        {'employee_id': ids['low_id'], 'manager_id': ids['boss_id']},
+        {'employee_id': ids['mid_id'], 'manager_id': ids['boss_id']},
+    ])
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'moved': [{
+            'employee_id': ids['low_id'], 'employee_name': 'Low',
+            'from_manager_id': ids['mid_id'], 'to_manager_id': ids['boss_id'],
+        }],
+        'unchanged': [ids['mid_id']],
+        'affected': 1,
+    }
+    with engine.connect() as conn:
+        assert check_employee_closure(conn) == {'missing': [], 'extra': [], 'wrong_depth': []}
+    assert client.get(f"/api/employees/{ids['mid_id']}/subtree").get_json()['count'] == 1
+    details = {emp['id']: emp for emp in client.get('/api/employees/with-details').get_json()}
+    assert [m['id'] for m in details[ids['low_id']]['manager_hierarchy']] == [ids['boss_id']]
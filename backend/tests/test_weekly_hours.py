@@ -0,0 +1,90 @@
+"""weekly_project_hours follows daily_logs through saves, ORM edits and deletes, and matches a rebuild."""
+from datetime import date, time
+from sqlalchemy import select
+from models.dailylogs import DailyLog
+from models.project import Project
+from models.weekly_hours import WeeklyProjectHours
+from services.weekly_hours import rebuild_weekly_hours
+from utils.session_manager import SessionLocal, engine
+
+WEEK = date(2025, 1, 6)
+
+
+def rollup():
+    """``{(employee_id, week_start, project_id): (total_minutes, log_count)}``."""
+    with engine.connect() as conn:
+        return {
+            (row.employee_id, row.week_start, row.project_id): (row.total_minutes, row.log_count)
+            for row in conn.execute(select(WeeklyProjectHours.__table__))
+        }
+
+
+def rebuilt():
+    with engine.begin() as conn:
+        rebuild_weekly_hours(conn)
+    return rollup()
+
+
+def portal_id():
+    with engine.connect() as conn:
+        return conn.scalar(select(Project.id).where(Project.name == 'Portal'))
+
+
+def save(client, ids, log_date, start_time, end_time, **extra):
+    response = client.post('/api/daily-logs/save', json=[dict({
+        'timesheet_id': ids['timesheet_id'], 'project_id': ids['project_id'], 'log_date': log_date,
+        'start_time': start_time, 'end_time': end_time, 'task_description': 'Work',
+    }, **extra)])
+    assert response.status_code == 200
+    return response.get_json()[0]
+
+
+def test_seeded_log_is_rolled_up(ids):
+    assert rollup() == {(ids['low_id'], WEEK, ids['project_id']): (120, 1)}
+    assert rebuilt() == rollup()
+
+
+def test_insert_through_the_save_api(client, ids):
+    save(client, ids, '2025-01-07', '13:00', '14:30')
+    save(client, ids, '2025-01-08', '22:00', '01:00', project_id=portal_id())
+    assert rollup() == {
+        (ids['low_id'], WEEK, ids['project_id']): (210, 2),
+        (ids['low_id'], WEEK, portal_id()): (180, 1),
+    }
+    assert rebuilt() == rollup()
+
+
+def test_update_moves_minutes_between_projects(client, ids):
+    save(client, ids, '2025-01-06', '09:00', '10:00', id=ids['log_id'], project_id=portal_id())
+    assert rollup() == {(ids['low_id'], WEEK, portal_id()): (60, 1)}
+    assert rebuilt() == rollup()
+
+
+def test_orm_update_and_delete(ids):
+    session = SessionLocal()
+    log = session.get(DailyLog, ids['log_id'])
+    log.end_time = time(12)
+    session.add(DailyLog(timesheet_id=ids['timesheet_id'], project_id=None, log_date=date(2025, 1, 13),
+                         start_time=time(8), end_time=time(9), total_hours=1, task_description='Planning'))
+    session.commit()
+    assert rollup() == {
+        (ids['low_id'], WEEK, ids['project_id']): (180, 1),
+        (ids['low_id'], date(2025, 1, 13), 0): (60, 1),
+    }
+    assert rebuilt() == rollup()
+
+    session.delete(session.get(DailyLog, ids['log_id']))
+    session.commit()
+    session.close()
+    assert rollup() == {(ids['low_id'], date(2025, 1, 13), 0): (60, 1)}
+    assert rebuilt() == rollup()
+
+
+def test_manager_filter_covers_indirect_reports(client, ids):
+    params = {'start_date': '2025-01-06', 'end_date': '2025-01-12'}
+    for manager_id in (ids['boss_id'], ids['mid_id']):
+        response = client.get('/api/reports/weekly-hours', query_string=dict(params, manager_id=manager_id))
+        assert response.status_code == 200
+        assert [row['employee_id'] for row in response.get_json()] == [ids['low_id']]
+    response = client.get('/api/reports/weekly-hours', query_string=dict(params, manager_id=ids['low_id']))
+    assert response.get_json() == []
@@ -0,0 +1,314 @@
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, g, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from config.config import CACHE_BACKEND, CACHE_REDIS_URL, CACHE_DEFAULT_TTL, CACHE_MAX_ENTRIES
+from utils.request_session import wants_primary
+
+# Response headers that are stored with a cached body and replayed on hits.
+_REPLAYED_HEADERS = ('Content-Type', 'ETag', 'Cache-Control', 'X-Org-Version')
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class CacheBackend:
+    """Key/value store with per-entry TTL and tag-based invalidation.
+
+    Values are JSON-serializable dicts. Backends must be safe to share
+    between threads.
+    """
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl, tags=()):
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """Caching switched off: every lookup misses and nothing is stored."""
+
+    def get(self, key):
+        self.stats.misses += 1
+        return None
+
+    def set(self, key, value, ttl, tags=()):
+        pass
+
+    def invalidate_tags(self, tags):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    """In-process cache: least recently used entries are evicted past ``max_entries``.
+
+    Each worker process has its own copy, so an invalidation only reaches the
+    worker that handled the write. Views under ``conditional_get`` key their
+    entries by table version and see other workers' writes at once; the
+    rest catch up when the TTL expires.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}                # tag -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py calls ``RedisCache`` makes.
+
+    Lets the shared-store code path run locally without a Redis server.
+    """
+
+    def __init__(self):
+        self._data = {}   # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[1] if entry else None
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ex if ex else None, value.encode() if isinstance(value, str) else value)
+        return True
+
+    def delete(self, *keys):
+        with self._lock:
+            keys = [k.decode() if isinstance(k, bytes) else k for k in keys]
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def sadd(self, key, *members):
+        with self._lock:
+            entry = self._live(key)
+            members_set = entry[1] if entry else set()
+            members_set.update(m.encode() if isinstance(m, str) else m for m in members)
+            self._data[key] = (entry[0] if entry else None, members_set)
+
+    def smembers(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return set(entry[1]) if entry else set()
+
+    def expire(self, key, seconds):
+        with self._lock:
+            entry = self._live(key)
+            if entry:
+                self._data[key] = (time.monotonic() + seconds, entry[1])
+            return bool(entry)
+
+    def scan_iter(self, match):
+        prefix = match.rstrip('*').encode()
+        with self._lock:
+            keys = [k.encode() for k in self._data]
+        return [k for k in keys if k.startswith(prefix)]
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by every worker, stored in a Redis-style server.
+
+    Tags are Redis sets of cache keys; invalidating a tag deletes its members.
+    Tag sets live slightly longer than the entries they point at.
+    """
+
+    def __init__(self, client, prefix='tms:cache:'):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl, tags=()):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+        for tag in tags:
+            tag_key = f'{self.prefix}tag:{tag}'
+            self.client.sadd(tag_key, key)
+            self.client.expire(tag_key, ttl * 2)
+
+    def invalidate_tags(self, tags):
+        for tag in tags:
+            tag_key = f'{self.prefix}tag:{tag}'
+            keys = [self.prefix + (k.decode() if isinstance(k, bytes) else k) for k in self.client.smembers(tag_key)]
+            self.client.delete(tag_key, *keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_cache(backend=CACHE_BACKEND, redis_url=CACHE_REDIS_URL):
+    if backend == 'none':
+        return NullCache()
+    if backend == 'memory':
+        return LRUCache()
+    if backend == 'redis':
+        if not redis_url:
+            return RedisCache(FakeRedis())
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis with CACHE_REDIS_URL needs the 'redis' package installed.")
+        return RedisCache(redis.Redis.from_url(redis_url))
+    raise ValueError(f"Unknown CACHE_BACKEND {backend!r}; use memory, redis or none.")
+
+
+cache = create_cache()
+
+
+def cache_key(path, args, stamp=None):
+    """Path plus query params sorted by name, so param order does not matter.
+
+    ``stamp`` is the table-version stamp set by ``conditional_get``, if any.
+    """
+    query = '&'.join(f'{k}={v}' for k, v in sorted(args.items(multi=True)))
+    key = f'GET {path}?{query}'
+    return f'{key}|{stamp}' if stamp else key
+
+
+def cached(tags, ttl=CACHE_DEFAULT_TTL):
+    """Cache a GET view's 200 responses keyed by path and query params.
+
+    ``tags`` is a list of tag names, or a callable taking the view's kwargs and
+    returning one, e.g. ``lambda timesheet_id: [f"timesheet:{timesheet_id}"]``.
+    Writes evict entries through :func:`invalidate_on_commit`. Requests that
+    asked for primary reads (read-your-writes) bypass the cache.
+
+    Apply it inside ``conditional_get``: the current table versions then
+    become part of the key, so a write committed by another worker process
+    is never answered from this process's stale entry.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if wants_primary():
+                return view(*args, **kwargs)
+            key = cache_key(request.path, request.args, g.get('version_stamp'))
+            entry = cache.get(key)
+            if entry is not None:
+                etag = entry['headers'].get('ETag', '').strip('"')
+                if etag and etag in request.if_none_match:
+                    response = Response(status=304)
+                    response.headers['ETag'] = entry['headers']['ETag']
+                    return response
+                return Response(entry['body'], status=200, headers=entry['headers'])
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and 'Set-Cookie' not in response.headers and not response.is_streamed:
+                entry_tags = tags(**kwargs) if callable(tags) else tags
+                cache.set(key, {
+                    'body': response.get_data(as_text=True),
+                    'headers': {h: response.headers[h] for h in _REPLAYED_HEADERS if h in response.headers},
+                }, ttl, entry_tags)
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate_on_commit(session, *tags):
+    """Evict entries carrying any of ``tags`` once ``session`` commits (not on rollback)."""
+    session.info.setdefault('cache_tags', set()).update(tags)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    tags = session.info.pop('cache_tags', None)
+    if tags:
+        cache.invalidate_tags(tags)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_on_rollback(session, previous_transaction):
+    session.info.pop('cache_tags', None)
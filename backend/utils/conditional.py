@@ -0,0 +1,40 @@
+import functools
+import hashlib
+from flask import g, make_response, request
+from utils.request_session import db_session
+from services.table_versions import get_table_versions
+
+
+def conditional_get(*tables):
+    """Answer ``If-None-Match`` for a GET view whose output depends only on ``tables``.
+
+    ``tables`` are version keys (see services/table_versions.py), or a single
+    callable taking the view's kwargs and returning them, e.g.
+    ``lambda timesheet_id: [timesheet_version_key(timesheet_id)]``.
+
+    The ETag hashes the request path and query string with the current
+    version of each table, so checking it costs one small query; when it
+    matches, the view is not called and a 304 is returned.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = tables[0](**kwargs) if len(tables) == 1 and callable(tables[0]) else tables
+            versions = get_table_versions(db_session(), keys)
+            stamp = ','.join(f'{table}:{versions[table]}' for table in sorted(versions))
+            # Read by cached() below this decorator, so a version bumped by
+            # any worker also misses the response cache.
+            g.version_stamp = stamp
+            etag = hashlib.sha1(f'{request.full_path}|{stamp}'.encode()).hexdigest()
+            if etag in request.if_none_match:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # Let browsers keep the body but revalidate before every reuse.
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -33,16 +33,6 @@ def safe_close(session):
     except:
         pass
 
-    
-from datetime import timedelta
-
-def calculate_total_hours(morning_in, morning_out, afternoon_in, afternoon_out):
-    total = timedelta()
-    if morning_in and morning_out:
-        total += datetime.combine(date.min, morning_out) - datetime.combine(date.min, morning_in)
-    if afternoon_in and afternoon_out:
-        total += datetime.combine(date.min, afternoon_out) - datetime.combine(date.min, afternoon_in)
-    return total  # <-- Make sure this is a timedelta, not a string
 
 def format_timedelta_to_time(td):
     if not isinstance(td, timedelta):
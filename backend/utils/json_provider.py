@@ -0,0 +1,45 @@
+from flask.json.provider import DefaultJSONProvider
+from config.config import JSON_PROVIDER
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib provider is used without it
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Output matches the default provider: keys sorted and dates/datetimes
+    passed to Flask's own ``default`` (HTTP date strings), not orjson's RFC 3339.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return self._dump_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._dump_bytes(obj, orjson.OPT_INDENT_2 if indent else 0) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _dump_bytes(self, obj, option=0):
+        option |= orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+def init_json_provider(app, provider=JSON_PROVIDER):
+    """Install orjson as the app's JSON provider when available and not disabled."""
+    if provider == 'stdlib':
+        return
+    if orjson is None:
+        if provider == 'orjson':
+            raise RuntimeError("JSON_PROVIDER=orjson needs the 'orjson' package installed.")
+        return
+    app.json_provider_class = OrjsonProvider
+    app.json = OrjsonProvider(app)
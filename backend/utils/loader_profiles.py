@@ -0,0 +1,25 @@
+from sqlalchemy.orm import joinedload, selectinload
+from models.employee import Employee
+from models.timesheet import Timesheet
+from models.dailylogs import DailyLog
+
+# Named eager-loading profiles. Each one lists every relationship the
+# matching serializer touches, so as_dict() never triggers a lazy SELECT.
+LOADER_PROFILES = {
+    # Timesheet.as_dict() iterates daily_logs.
+    'timesheet': (selectinload(Timesheet.daily_logs),),
+    # Employee.as_dict() reads manager.employee_name.
+    'employee': (joinedload(Employee.manager),),
+    'employee_details': (
+        joinedload(Employee.manager),
+        joinedload(Employee.department),
+        joinedload(Employee.designation),
+    ),
+    'daily_log': (),
+    'daily_log_with_changes': (selectinload(DailyLog.daily_log_changes),),
+}
+
+
+def with_profile(query, name):
+    """Apply the named loader profile to an ORM query or select()."""
+    return query.options(*LOADER_PROFILES[name])
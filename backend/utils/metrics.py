@@ -0,0 +1,292 @@
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from flask import Response, g, request
+from config.config import METRICS_ENABLED, METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS
+from utils.cache import cache
+from utils.query_budget import query_budget
+from utils.session_manager import engine, replica_engines
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+_LABEL_SEP = '\x1f'
+
+
+class _Shard:
+    """One thread's samples. Only its own thread writes to it, so no locking is needed."""
+
+    def __init__(self):
+        self.values = {}      # (metric name, label key) -> float
+        self.histograms = {}  # (metric name, label key) -> [count per bucket..., +Inf count, sum]
+
+
+class Registry:
+    """Metric definitions plus per-thread sample shards.
+
+    Recording touches only the calling thread's shard. ``snapshot`` merges
+    the shards; reading one while its thread writes can be one sample behind,
+    which is fine for metrics.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._shards = []
+        self._local = threading.local()
+        self._shards_lock = threading.Lock()  # taken once per new thread
+
+    def shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        """This process's samples as ``{name: {label key: value}}``, histograms as lists."""
+        data = {name: {} for name in self.metrics}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for (name, key), value in list(shard.values.items()):
+                data[name][key] = data[name].get(key, 0) + value
+            for (name, key), counts in list(shard.histograms.items()):
+                merged = data[name].get(key)
+                data[name][key] = list(counts) if merged is None else [a + b for a, b in zip(merged, counts)]
+        for metric in self.metrics.values():
+            if metric.collect is not None:
+                for labels, value in metric.collect():
+                    data[metric.name][_LABEL_SEP.join(labels)] = value
+        return data
+
+
+class Metric:
+    """A metric family; ``kind`` is counter, gauge or histogram.
+
+    ``collect`` is an optional callable returning ``[(labels, value)]`` read
+    at snapshot time, for values that live elsewhere (pool, cache stats).
+    """
+
+    def __init__(self, registry, name, help, kind, labelnames=(), buckets=None, collect=None):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+        self.collect = collect
+        registry.register(self)
+
+    def inc(self, *labels, amount=1):
+        values = self.registry.shard().values
+        key = (self.name, _LABEL_SEP.join(labels))
+        values[key] = values.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def observe(self, value, *labels):
+        histograms = self.registry.shard().histograms
+        key = (self.name, _LABEL_SEP.join(labels))
+        counts = histograms.get(key)
+        if counts is None:
+            counts = histograms[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+def _pool_samples(attr):
+    def collect():
+        samples = []
+        for label, bind in [('primary', engine)] + [(f'replica{i}', e) for i, e in enumerate(replica_engines)]:
+            if hasattr(bind.pool, attr):
+                # QueuePool.overflow() counts up from -pool_size.
+                samples.append(((label,), max(0, getattr(bind.pool, attr)())))
+        return samples
+    return collect
+
+
+def _cache_samples(field):
+    return lambda: [((), getattr(cache.stats, field))]
+
+
+registry = Registry()
+
+REQUEST_LATENCY = Metric(
+    registry, 'tms_http_request_duration_seconds', 'Request latency by route.', 'histogram',
+    ('method', 'route', 'status'), LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Metric(registry, 'tms_http_requests_in_flight', 'Requests being handled.', 'gauge')
+POOL_CHECKED_OUT = Metric(
+    registry, 'tms_db_pool_checked_out', 'Connections checked out of the pool.', 'gauge',
+    ('engine',), collect=_pool_samples('checkedout'),
+)
+POOL_OVERFLOW = Metric(
+    registry, 'tms_db_pool_overflow', 'Connections opened beyond pool_size.', 'gauge',
+    ('engine',), collect=_pool_samples('overflow'),
+)
+CACHE_HITS = Metric(registry, 'tms_cache_hits_total', 'Response cache hits.', 'counter',
+                    collect=_cache_samples('hits'))
+CACHE_MISSES = Metric(registry, 'tms_cache_misses_total', 'Response cache misses.', 'counter',
+                      collect=_cache_samples('misses'))
+CACHE_EVICTIONS = Metric(registry, 'tms_cache_evictions_total', 'Response cache LRU evictions.', 'counter',
+                         collect=_cache_samples('evictions'))
+SAVE_BATCH_SIZE = Metric(
+    registry, 'tms_daily_log_save_batch_size', 'Daily logs per POST /api/daily-logs/save.', 'histogram',
+    buckets=BATCH_SIZE_BUCKETS,
+)
+
+
+# ---------------- Multiprocess aggregation ----------------
+
+def _process_file(directory, pid=None):
+    return os.path.join(directory, f'metrics_{pid or os.getpid()}.json')
+
+
+def write_process_file(directory=METRICS_MULTIPROC_DIR):
+    """Write this worker's snapshot where other workers can aggregate it."""
+    path = _process_file(directory)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as fh:
+        json.dump({'pid': os.getpid(), 'metrics': registry.snapshot()}, fh)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def aggregate(directory=METRICS_MULTIPROC_DIR):
+    """Sum every worker's snapshot.
+
+    Counters and histograms of exited workers still count (they are totals);
+    gauges only come from live workers.
+    """
+    if not directory:
+        return registry.snapshot()
+    write_process_file(directory)
+    totals = {name: {} for name in registry.metrics}
+    for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+        try:
+            with open(path) as fh:
+                worker = json.load(fh)
+        except (OSError, ValueError):
+            continue  # replaced or half-written by its worker right now
+        alive = worker['pid'] == os.getpid() or _pid_alive(worker['pid'])
+        for name, samples in worker['metrics'].items():
+            metric = registry.metrics.get(name)
+            if metric is None or (metric.kind == 'gauge' and not alive):
+                continue
+            for key, value in samples.items():
+                current = totals[name].get(key)
+                if current is None:
+                    totals[name][key] = value
+                elif metric.kind == 'histogram':
+                    totals[name][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    totals[name][key] = current + value
+    return totals
+
+
+# ---------------- Exposition ----------------
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key.split(_LABEL_SEP))) if labelnames else []
+    pairs.extend(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render(totals):
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name, metric in registry.metrics.items():
+        lines.append(f'# HELP {name} {metric.help}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        samples = totals.get(name, {})
+        if not samples and metric.kind != 'histogram' and not metric.labelnames:
+            samples = {'': 0}
+        for key, value in sorted(samples.items()):
+            if metric.kind != 'histogram':
+                lines.append(f'{name}{_label_text(metric.labelnames, key)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + ('+Inf',), value[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(bound)
+                lines.append(f'{name}_bucket{_label_text(metric.labelnames, key, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_label_text(metric.labelnames, key)} {_number(value[-1])}')
+            lines.append(f'{name}_count{_label_text(metric.labelnames, key)} {cumulative}')
+    hits = sum(totals.get(CACHE_HITS.name, {}).values())
+    misses = sum(totals.get(CACHE_MISSES.name, {}).values())
+    lines.append('# HELP tms_cache_hit_ratio Response cache hits / lookups since start.')
+    lines.append('# TYPE tms_cache_hit_ratio gauge')
+    lines.append(f'tms_cache_hit_ratio {_number(hits / (hits + misses)) if hits + misses else 0}')
+    return '\n'.join(lines) + '\n'
+
+
+def init_metrics(app, enabled=METRICS_ENABLED, multiproc_dir=METRICS_MULTIPROC_DIR):
+    """Record request metrics and serve them at ``GET /metrics``.
+
+    With ``multiproc_dir`` set (one directory shared by all gunicorn workers
+    of a node, emptied when the master starts), each worker writes its
+    samples there at most every METRICS_FLUSH_SECONDS and at exit, and
+    ``/metrics`` on any worker reports the sum over all of them.
+
+    Call this first of the ``init_*`` hooks so the latency covers the commit.
+    """
+    if not enabled:
+        return
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        atexit.unregister(write_process_file)
+        atexit.register(write_process_file, multiproc_dir)
+    last_flush = [0.0]
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_LATENCY.observe(time.perf_counter() - started, request.method, route, str(response.status_code))
+        if multiproc_dir and time.monotonic() - last_flush[0] >= METRICS_FLUSH_SECONDS:
+            last_flush[0] = time.monotonic()
+            write_process_file(multiproc_dir)
+        return response
+
+    @app.teardown_request
+    def _end_request_metrics(exc):
+        REQUESTS_IN_FLIGHT.dec()
+
+    @app.route('/metrics', methods=['GET'])
+    @query_budget(0)
+    def metrics():
+        return Response(render(aggregate(multiproc_dir)), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,129 @@
+import base64
+import json
+from bisect import bisect_right
+from datetime import date, datetime
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    """Raised for malformed limit/after/with_total or filter query params."""
+
+
+class PageRequest:
+    def __init__(self, limit, after, with_total):
+        self.limit = limit
+        self.after = after
+        self.with_total = with_total
+
+
+def encode_cursor(values):
+    """Opaque cursor for the sort key of the last row on a page."""
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise PaginationError('Invalid cursor.')
+    if not isinstance(values, list):
+        raise PaginationError('Invalid cursor.')
+    return values
+
+
+def int_args(args, *names):
+    """Integer filter params ``names`` from ``args``, None where absent or empty."""
+    values = []
+    for name in names:
+        raw = args.get(name)
+        if raw in (None, ''):
+            values.append(None)
+            continue
+        try:
+            values.append(int(raw))
+        except ValueError:
+            raise PaginationError(f'{name} must be an integer.')
+    return values[0] if len(names) == 1 else tuple(values)
+
+
+def page_request_from_args(args):
+    """Build a PageRequest from query params, or None when the caller asked for no paging.
+
+    Listing endpoints keep returning a plain list when neither ``limit`` nor
+    ``after`` is given, so existing clients are unaffected.
+    """
+    if 'limit' not in args and 'after' not in args:
+        return None
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise PaginationError('limit must be an integer.')
+    if limit < 1:
+        raise PaginationError('limit must be positive.')
+    after = decode_cursor(args['after']) if args.get('after') else None
+    with_total = args.get('with_total', 'true').lower() not in ('0', 'false', 'no')
+    return PageRequest(min(limit, MAX_PAGE_SIZE), after, with_total)
+
+
+def _coerce(python_type, value):
+    """Cursor value checked against its sort key's type; anything else is a bad cursor."""
+    try:
+        if python_type is int and isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if python_type is str and isinstance(value, str):
+            return value
+        if python_type is date and isinstance(value, str):
+            return date.fromisoformat(value)
+        if python_type is datetime and isinstance(value, str):
+            return datetime.fromisoformat(value)
+    except ValueError:
+        pass
+    raise PaginationError('Invalid cursor.')
+
+
+def paginate_query(query, sort_columns, page):
+    """Apply keyset ordering to ``query`` and return ``(rows, next_cursor, total)``.
+
+    ``sort_columns`` must end in a unique column (normally the primary key) so
+    the key is a strict total order. ``total`` is None when not requested.
+    """
+    values = None
+    if page.after is not None:
+        if len(page.after) != len(sort_columns):
+            raise PaginationError('Invalid cursor.')
+        values = [_coerce(col.type.python_type, v) for col, v in zip(sort_columns, page.after)]
+    total = query.order_by(None).count() if page.with_total else None
+    query = query.order_by(*sort_columns)
+    if values is not None:
+        query = query.filter(tuple_(*sort_columns) > tuple_(*values))
+    rows = query.limit(page.limit + 1).all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, col.key) for col in sort_columns])
+    return rows, next_cursor, total
+
+
+def paginate_ids(sorted_ids, page):
+    """Keyset pagination over an already sorted list of integer ids held in memory."""
+    total = len(sorted_ids) if page.with_total else None
+    start = 0
+    if page.after is not None:
+        if len(page.after) != 1:
+            raise PaginationError('Invalid cursor.')
+        start = bisect_right(sorted_ids, _coerce(int, page.after[0]))
+    ids = sorted_ids[start:start + page.limit]
+    next_cursor = encode_cursor([ids[-1]]) if start + page.limit < len(sorted_ids) else None
+    return ids, next_cursor, total
+
+
+def page_response(items, next_cursor, total):
+    body = {'items': items, 'next_cursor': next_cursor}
+    if total is not None:
+        body['total'] = total
+    return body
@@ -0,0 +1,74 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block or endpoint issues more SQL statements than declared."""
+
+
+class QueryCounter:
+    """Count statements executed on any engine by the current thread.
+
+    Usage::
+
+        with QueryCounter() as counter:
+            client.get('/api/projects')
+        assert counter.count <= 2
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+        self._thread_id = None
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread_id:
+            self.count += 1
+            self.statements.append(statement)
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        event.listen(Engine, 'before_cursor_execute', self._before_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(Engine, 'before_cursor_execute', self._before_execute)
+        return False
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of SQL statements a view may issue.
+
+    The budget is stored on the view as ``query_budget`` and checked by
+    :func:`assert_query_budget`; it has no effect on normal requests.
+    """
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def assert_query_budget(client, method, path, **kwargs):
+    """Issue a request through a Flask test client and fail if the view exceeds its budget.
+
+    The body is read before the count is taken, so queries of streamed
+    responses count too. Returns the response so callers can make further
+    assertions on it.
+    """
+    app = client.application
+    adapter = app.url_map.bind('localhost')
+    endpoint, _ = adapter.match(path.split('?', 1)[0], method=method.upper())
+    budget = getattr(app.view_functions[endpoint], 'query_budget', None)
+    if budget is None:
+        raise QueryBudgetExceeded(f'{endpoint} declares no query budget.')
+    with QueryCounter() as counter:
+        response = client.open(path, method=method.upper(), **kwargs)
+        # A streamed body runs its queries as it is read.
+        response.get_data()
+    if counter.count > budget:
+        raise QueryBudgetExceeded(
+            f'{method.upper()} {path} issued {counter.count} queries, budget is {budget}:\n'
+            + '\n'.join(counter.statements)
+        )
+    return response
@@ -0,0 +1,58 @@
+from sqlalchemy import inspect, select, text
+from sqlalchemy.orm import configure_mappers
+from migrate import discover_migrations, schema_migrations
+from utils.session_manager import engine, replica_engines
+
+
+def _check_routes(app, blueprint):
+    count = sum(1 for rule in app.url_map.iter_rules() if rule.endpoint.startswith(blueprint + '.'))
+    if not count:
+        raise RuntimeError(f"no routes registered for blueprint {blueprint!r}")
+    return f"{count} routes"
+
+
+def _check_models():
+    # Importing the models happens with the app; this resolves every
+    # relationship now instead of on the first request that needs it.
+    configure_mappers()
+    return "mappers configured"
+
+
+def _check_engine(bind):
+    with bind.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    return "connected"
+
+
+def _check_migrations(bind=engine):
+    expected = [version for version, _ in discover_migrations()]
+    with bind.connect() as conn:
+        if not inspect(conn).has_table('schema_migrations'):
+            raise RuntimeError("schema_migrations is missing; run python migrate.py")
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+    pending = [version for version in expected if version not in applied]
+    if pending:
+        raise RuntimeError(f"pending migrations {', '.join(pending)}; run python migrate.py")
+    return f"at {expected[-1]}" if expected else "no migrations"
+
+
+def check_ready(app, blueprint='api', database=True):
+    """Run the startup checks and return ``(ok, {check: message})``.
+
+    Checks that the API routes are registered, the ORM mappers configure,
+    and, with ``database``, that the primary and every replica accept a
+    connection and no migration is pending.
+    """
+    checks = [('routes', lambda: _check_routes(app, blueprint)), ('models', _check_models)]
+    if database:
+        checks.append(('database', lambda: _check_engine(engine)))
+        checks.extend((f'replica{i}', lambda e=e: _check_engine(e)) for i, e in enumerate(replica_engines))
+        checks.append(('migrations', _check_migrations))
+    results, ok = {}, True
+    for name, check in checks:
+        try:
+            results[name] = check()
+        except Exception as e:
+            results[name] = f"failed: {e}"
+            ok = False
+    return ok, results
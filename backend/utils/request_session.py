@@ -0,0 +1,106 @@
+import functools
+import time
+from flask import g, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import scoped_session, Session
+from werkzeug.exceptions import HTTPException
+from config.config import READ_AFTER_WRITE_SECONDS
+from utils.session_manager import SessionLocal, replica_engines, mark_replica_down
+
+
+def _app_context_id():
+    return id(g._get_current_object())
+
+
+# One session per Flask app context (i.e. per request); handlers call
+# ``db_session()`` and never commit, roll back or close it themselves.
+db_session = scoped_session(SessionLocal, scopefunc=_app_context_id)
+
+
+PRIMARY_COOKIE = 'tms_primary_until'
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def wants_primary():
+    """True for read-your-writes requests: explicit header or a recent write by this client."""
+    if request.headers.get('X-Consistency', '').lower() == 'primary':
+        return True
+    try:
+        return float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_only(view):
+    """Run the view in a read-only transaction that is never committed.
+
+    The session is flagged with ``info['read_only']`` so the connection is
+    opened READ ONLY and routed to a replica when any are configured. If the
+    replica cannot be reached it is skipped for a while and the view is
+    retried once on the primary.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        session = db_session()
+        session.info['read_only'] = True
+        if wants_primary():
+            session.info['force_primary'] = True
+        try:
+            return view(*args, **kwargs)
+        except OperationalError:
+            replica = session.info.get('replica')
+            if replica is None or session.info.get('force_primary'):
+                raise
+            mark_replica_down(replica)
+            session.close()
+            session.info['force_primary'] = True
+            return view(*args, **kwargs)
+    return wrapper
+
+
+@event.listens_for(Session, 'after_begin')
+def _start_read_only_transaction(session, transaction, connection):
+    if session.info.get('read_only') and connection.dialect.name in ('mysql', 'mariadb'):
+        # pymysql begins transactions implicitly, so this applies to the one about to start.
+        connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+
+def init_request_session(app):
+    """Commit after successful write requests, roll back otherwise, and close at teardown."""
+
+    @app.after_request
+    def _finish_transaction(response):
+        if not db_session.registry.has():
+            return response
+        session = db_session()
+        if session.info.get('read_only') or response.status_code >= 400:
+            session.rollback()
+            return response
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            response = jsonify({'error': str(e)})
+            response.status_code = 500
+            return response
+        if replica_engines and request.method not in _SAFE_METHODS:
+            # Keep this client's reads on the primary until replicas catch up.
+            response.set_cookie(
+                PRIMARY_COOKIE, str(time.time() + READ_AFTER_WRITE_SECONDS),
+                max_age=READ_AFTER_WRITE_SECONDS, httponly=True,
+            )
+        return response
+
+    @app.teardown_appcontext
+    def _remove_session(exc):
+        if db_session.registry.has():
+            if exc is not None:
+                db_session.rollback()
+            db_session.remove()
+
+    @app.errorhandler(Exception)
+    def _unhandled_error(e):
+        if isinstance(e, HTTPException):
+            return e
+        return jsonify({'error': str(e)}), 500
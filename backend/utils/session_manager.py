@@ -1,10 +1,78 @@
+import itertools
+import time
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from config.config import SQLALCHEMY_DATABASE_URI
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.engine import make_url
+from config.config import (
+    SQLALCHEMY_DATABASE_URI, SQLALCHEMY_REPLICA_URIS, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, REPLICA_RETRY_SECONDS,
+)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def create_db_engine(uri=SQLALCHEMY_DATABASE_URI):
+    """Create the application's engine with pool settings from config.
+
+    SQLite keeps SQLAlchemy's default pool since it has no server connections.
+    """
+    if make_url(uri).get_backend_name() == 'sqlite':
+        return create_engine(uri)
+    return create_engine(
+        uri,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+engine = create_db_engine()
+replica_engines = [create_db_engine(uri) for uri in SQLALCHEMY_REPLICA_URIS]
+
+_replica_turn = itertools.count()
+_replica_down_until = {}
+
+
+def choose_replica():
+    """Round-robin over replicas that are not marked down; None means use the primary."""
+    now = time.monotonic()
+    healthy = [e for e in replica_engines if _replica_down_until.get(e, 0) <= now]
+    if not healthy:
+        return None
+    return healthy[next(_replica_turn) % len(healthy)]
+
+
+def mark_replica_down(replica):
+    _replica_down_until[replica] = time.monotonic() + REPLICA_RETRY_SECONDS
+
+
+class RoutingSession(Session):
+    """Send read-only sessions to a replica and everything else to the primary.
+
+    A session picks its replica once, on first use, so all statements in a
+    request see the same snapshot. ``info['force_primary']`` overrides it.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get('read_only') and not self.info.get('force_primary'):
+            if 'replica' not in self.info:
+                self.info['replica'] = choose_replica()
+            if self.info['replica'] is not None:
+                return self.info['replica']
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 def get_session():
     """Utility function to get a new SQLAlchemy session."""
-    return SessionLocal()
\ No newline at end of file
+    return SessionLocal()
+
+def get_pool_stats(bind=None):
+    """Return checked-in/checked-out/overflow counts for the engine's pool."""
+    pool = (bind or SessionLocal.kw['bind']).pool
+    stats = {'pool_class': type(pool).__name__, 'status': pool.status()}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
@@ -0,0 +1,104 @@
+import logging
+import time
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from config.config import SQL_TIMING, SLOW_REQUEST_MS, SLOW_REQUEST_MAX_STATEMENTS
+from utils.session_manager import engine, replica_engines
+
+slow_request_log = logging.getLogger('tms.slow_requests')
+
+
+class RequestSqlStats:
+    """SQL statements issued while handling one request."""
+
+    def __init__(self, keep_statements=SLOW_REQUEST_MAX_STATEMENTS):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = None
+        self.statements = []  # (seconds, statement), first ``keep_statements`` only
+        self.keep_statements = keep_statements
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if len(self.statements) < self.keep_statements:
+            self.statements.append((seconds, statement))
+
+    def server_timing(self, request_seconds):
+        """``Server-Timing`` header value: total DB time, slowest statement and the whole request."""
+        return (
+            f'db;dur={self.total_seconds * 1000:.2f};desc="{self.count} queries", '
+            f'db-slowest;dur={self.slowest_seconds * 1000:.2f}, '
+            f'app;dur={request_seconds * 1000:.2f}'
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and 'sql_stats' in g:
+        conn.info.setdefault('sql_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('sql_started')
+    if started and has_app_context() and 'sql_stats' in g:
+        g.sql_stats.record(statement, time.perf_counter() - started.pop())
+
+
+def _discard_failed_statement(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('sql_started'):
+        conn.info['sql_started'].pop()
+
+
+def _log_slow_request(response, stats, request_seconds):
+    lines = [
+        f'{request.method} {request.full_path.rstrip("?")} -> {response.status_code} '
+        f'in {request_seconds * 1000:.1f} ms; {stats.count} queries, {stats.total_seconds * 1000:.1f} ms in SQL'
+    ]
+    for seconds, statement in stats.statements:
+        lines.append(f'  {seconds * 1000:8.2f} ms  {" ".join(statement.split())}')
+    if stats.count > len(stats.statements):
+        lines.append(f'  ... {stats.count - len(stats.statements)} more')
+    slow_request_log.warning('\n'.join(lines))
+
+
+def init_sql_timing(app, enabled=SQL_TIMING, slow_request_ms=SLOW_REQUEST_MS, engines=None):
+    """Time every SQL statement per request and report it on the response.
+
+    Adds a ``Server-Timing`` header (DB total, slowest statement, request
+    total) and logs requests slower than ``slow_request_ms`` with their SQL
+    to the ``tms.slow_requests`` logger. When disabled nothing is registered,
+    so requests and statements pay nothing.
+
+    Call this before :func:`init_request_session` so its after_request hook
+    runs after the commit and the commit's statements are included.
+    """
+    if not enabled:
+        return
+    for bind in engines or [engine, *replica_engines]:
+        # Engines are shared by every app built in the process; listen once.
+        if not event.contains(bind, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(bind, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(bind, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(bind, 'handle_error', _discard_failed_statement)
+
+    @app.before_request
+    def _start_sql_timing():
+        g.sql_stats = RequestSqlStats()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _report_sql_timing(response):
+        stats = g.pop('sql_stats', None)
+        if stats is None:
+            return response
+        request_seconds = time.perf_counter() - g.request_started
+        response.headers['Server-Timing'] = stats.server_timing(request_seconds)
+        if request_seconds * 1000 >= slow_request_ms:
+            _log_slow_request(response, stats, request_seconds)
+        return response
@@ -0,0 +1,24 @@
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py            # settings in gunicorn.conf.py / env
+    gunicorn wsgi:app                       # plain gunicorn defaults
+
+The app is built once at import. With ``preload_app`` that happens in the
+gunicorn master, which then forks the workers, so a failed startup check
+stops the server before any worker takes traffic.
+"""
+import os
+from appp import create_app
+from utils.readiness import check_ready
+from utils.session_manager import engine, replica_engines
+
+app = create_app()
+
+if os.getenv('SKIP_STARTUP_CHECK', 'false').lower() not in ('1', 'true', 'yes'):
+    ok, checks = check_ready(app)
+    if not ok:
+        raise RuntimeError("Startup check failed: " + "; ".join(f"{k}: {v}" for k, v in checks.items()))
+
+# Connections opened by the check must not be shared with forked workers.
+for bind in (engine, *replica_engines):
+    bind.dispose()
@@ -108,7 +108,7 @@ export default function AdminPage() {
       const deptRes = await fetch(`${BASE_URL}/api/departments`, {
         method: "GET",
         headers: { "Content-Type": "application/json" },
-        cache: "no-store",
+        cache: "no-cache",
       });
       if (!deptRes.ok) throw new Error(`Failed to fetch departments: ${deptRes.statusText}`);
       setDepartments(await deptRes.json());
@@ -116,7 +116,7 @@ export default function AdminPage() {
       const desRes = await fetch(`${BASE_URL}/api/designations`, {
         method: "GET",
         headers: { "Content-Type": "application/json" },
-        cache: "no-store",
+        cache: "no-cache",
       });
       if (!desRes.ok) throw new Error(`Failed to fetch designations: ${desRes.statusText}`);
       setDesignations(await desRes.json());
@@ -170,7 +170,7 @@ export default function AdminPage() {
       const res = await fetch(`${BASE_URL}/api/timesheets/${ts.id}/daily-logs`, {
         method: "GET",
         headers: { "Content-Type": "application/json" },
-        cache: "no-store",
+        cache: "no-cache",
       });
       if (!res.ok) throw new Error(`Failed to fetch daily logs: ${res.statusText}`);
       let data = await res.json();
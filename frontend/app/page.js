@@ -477,7 +477,7 @@ export default function Home() {
         const projectsRes = await fetch(`${BASE_URL}/api/projects`, {
           method: "GET",
           headers: { "Content-Type": "application/json" },
-          cache: "no-store",
+          cache: "no-cache",
         });
         if (!projectsRes.ok) throw new Error("Failed to fetch projects");
         setProjects(await projectsRes.json());
@@ -554,7 +554,7 @@ export default function Home() {
       const logsRes = await fetch(logsUrl, {
         method: "GET",
         headers: { "Content-Type": "application/json" },
-        cache: "no-store",
+        cache: "no-cache",
       });
       let logsData = [];
       if (logsRes.ok) logsData = await logsRes.json();
@@ -649,8 +649,9 @@ export default function Home() {
       const logsUrl = `${BASE_URL}/api/timesheets/${timesheetId}/daily-logs`;
       const logsRes = await fetch(logsUrl, {
         method: "GET",
-        headers: { "Content-Type": "application/json" },
-        cache: "no-store",
+        // Read our own write from the primary, not a lagging replica.
+        headers: { "Content-Type": "application/json", "X-Consistency": "primary" },
+        cache: "no-cache",
       });
       if (!logsRes.ok) throw new Error("Failed to fetch logs.");
       const logsData = await logsRes.json();